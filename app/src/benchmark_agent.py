@@ -8,38 +8,70 @@ Reduced from ~540 lines to ~250 lines by:
 """
 import os
 import time
+import hashlib
+import atexit
 import threading
 import random
-from dataclasses import dataclass
-from typing import Any, Dict, Callable, List
+from functools import partial
+from dataclasses import dataclass, replace
+from types import MappingProxyType
+from typing import Any, Dict, Callable, List, Mapping
 import boto3
 
 from bedrock_agentcore.runtime import BedrockAgentCoreApp
 
 # Handle imports for both local and Docker environments
 try:
-    from src.rlm_agent import RLMAgent
-    from src.datasets import load_trec_entries, load_codeqa_entries, load_browsecomp_sample
+    from src.rlm_agent import RLMAgent, EventSink
+    from src.progress import ProgressLog
+    from src.memory_monitor import PeakMemory
+    from src.job_scheduler import JobScheduler, QueueFull
+    from src.result_store import ResultStore, spill_path_from_env
+    from src.result_uploader import ResultUploader, read_results
+    from src.context_profile import profile_context
+    from src.context_index import ContextIndex
+    from src.response_cache import get_response_cache, cache_enabled_by_default
+    from src.bounded_cache import BoundedCache, estimate_size
+    from src.mapped_context import is_mapped
+    from src.datasets import dataset_cache, load_trec_entries, load_codeqa_entries, load_browsecomp_sample
     from src.context_builders import (
+        FrozenChunks,
+        freeze_context,
+        build_haystack_context,
         build_trec_context,
         build_browsecomp_context,
         build_codeqa_context,
     )
     from src.experiments import (
+        SNIAH_CONFIGS,
         validate_needle,
         validate_label_counts,
         validate_id_pairs,
         validate_multiple_choice,
     )
 except ImportError:
-    from rlm_agent import RLMAgent
-    from datasets import load_trec_entries, load_codeqa_entries, load_browsecomp_sample
+    from rlm_agent import RLMAgent, EventSink
+    from progress import ProgressLog
+    from memory_monitor import PeakMemory
+    from job_scheduler import JobScheduler, QueueFull
+    from result_store import ResultStore, spill_path_from_env
+    from result_uploader import ResultUploader, read_results
+    from context_profile import profile_context
+    from context_index import ContextIndex
+    from response_cache import get_response_cache, cache_enabled_by_default
+    from bounded_cache import BoundedCache, estimate_size
+    from mapped_context import is_mapped
+    from datasets import dataset_cache, load_trec_entries, load_codeqa_entries, load_browsecomp_sample
     from context_builders import (
+        FrozenChunks,
+        freeze_context,
+        build_haystack_context,
         build_trec_context,
         build_browsecomp_context,
         build_codeqa_context,
     )
     from experiments import (
+        SNIAH_CONFIGS,
         validate_needle,
         validate_label_counts,
         validate_id_pairs,
@@ -52,13 +84,40 @@ app = BedrockAgentCoreApp(debug=True)
 s3_client = boto3.client("s3")
 S3_BUCKET = os.environ.get("S3_RESULTS_BUCKET", "rlm-benchmark-results-local")
 
-# Async task storage
-benchmark_results: Dict[str, Dict[str, Any]] = {}
+# Results are uploaded in gzip JSON-lines batches off the worker threads, and flushed at exit
+uploader = ResultUploader(s3_client, S3_BUCKET)
+atexit.register(uploader.close)
 
+# Run model-written REPL code in an isolated worker process by default
+REPL_SANDBOX = os.environ.get("REPL_SANDBOX", "false").lower() in ("1", "true", "yes")
 
-@dataclass
+# Built contexts and payloads shared across runs; read-only, so REPL code cannot mutate the cached copy
+CONTEXT_CACHE_MAX_MB = int(os.environ.get("CONTEXT_CACHE_MAX_MB", "512"))
+context_cache = BoundedCache("contexts", CONTEXT_CACHE_MAX_MB * 1024 * 1024)
+
+# Runs are queued and executed by a bounded worker pool (BENCHMARK_WORKERS, BENCHMARK_MEMORY_BUDGET_MB)
+scheduler = JobScheduler()
+# Context characters assumed for admission control before a payload is built
+CONTEXT_CHAR_ESTIMATES = {
+    "oolong": 400_000,
+    "oolong-pairs": 400_000,
+    "browsecomp-1k": 5_000_000,
+    "codeqa": 2_000_000,
+}
+# Per-run memory: context copies (REPL, profile, index, prompts) plus agent/client overhead
+CONTEXT_MEMORY_FACTOR = 4
+RUN_OVERHEAD_BYTES = 64 * 1024 * 1024
+
+# Longest a check_status call may block waiting for a change (`wait_seconds` in the payload)
+STATUS_MAX_WAIT_SECONDS = float(os.environ.get("STATUS_MAX_WAIT_SECONDS", "30"))
+
+# Payload fields forwarded to RLMAgent as sub-call budget limits
+BUDGET_FIELDS = ("max_sub_calls", "max_sub_input_tokens", "max_sub_output_tokens", "max_sub_cost_usd")
+
+
+@dataclass(frozen=True)
 class ExperimentPayload:
-    """Experiment data"""
+    """Experiment data (shared between runs once memoized, so never mutated)"""
     name: str
     query: str
     context: Any
@@ -68,28 +127,28 @@ class ExperimentPayload:
 
 
 def session_seed(session_id: str) -> int:
-    """Generate deterministic seed from session ID"""
-    return hash(session_id) % (2**31)
+    """Generate deterministic seed from session ID (stable across processes, unlike hash())"""
+    return int.from_bytes(hashlib.sha256(session_id.encode("utf-8")).digest()[:4], "big") % (2**31)
 
 
 def context_stats(context: Any) -> Dict[str, int]:
     """Get context statistics"""
-    if isinstance(context, str):
-        return {"chunks": 1, "characters": len(context)}
-    if isinstance(context, list):
-        total_chars = sum(len(str(c)) for c in context)
-        return {"chunks": len(context), "characters": total_chars}
-    return {"chunks": 0, "characters": 0}
+    return profile_context(context).stats()
 
 
 # ============================================================================
 # Payload Builders
 # ============================================================================
 
-def build_oolong_payload() -> ExperimentPayload:
+def load_trec_context() -> FrozenChunks:
+    """TREC context blocks, built once and shared by the OOLONG experiments"""
+    return context_cache.get_or_load("trec", lambda: freeze_context(build_trec_context(load_trec_entries())))
+
+
+def build_oolong_payload(seed: int | None = None) -> ExperimentPayload:
     """Build OOLONG label counting experiment"""
     entries = load_trec_entries()
-    context = build_trec_context(entries)
+    context = load_trec_context()
     
     # Count labels
     label_counts = {}
@@ -109,10 +168,10 @@ def build_oolong_payload() -> ExperimentPayload:
     )
 
 
-def build_oolong_pairs_payload() -> ExperimentPayload:
+def build_oolong_pairs_payload(seed: int | None = None) -> ExperimentPayload:
     """Build OOLONG pairs experiment"""
     entries = load_trec_entries()
-    context = build_trec_context(entries)
+    context = load_trec_context()
     
     # Find HUM/LOC pairs
     hum_entries = [e for e in entries if e["label"] == "HUM"]
@@ -140,10 +199,9 @@ def build_oolong_pairs_payload() -> ExperimentPayload:
     )
 
 
-def build_browsecomp_payload(session_id: str, doc_target: int = 1000) -> ExperimentPayload:
+def build_browsecomp_payload(seed: int, doc_target: int = 1000) -> ExperimentPayload:
     """Build BrowseComp+ experiment"""
     sample = load_browsecomp_sample()
-    seed = session_seed(session_id)
     
     context = build_browsecomp_context(sample, doc_target, seed)
     query = sample["query"]
@@ -159,10 +217,9 @@ def build_browsecomp_payload(session_id: str, doc_target: int = 1000) -> Experim
     )
 
 
-def build_codeqa_payload(session_id: str) -> ExperimentPayload:
+def build_codeqa_payload(seed: int) -> ExperimentPayload:
     """Build CodeQA experiment"""
     entries = load_codeqa_entries()
-    seed = session_seed(session_id)
     rng = random.Random(seed)
     
     entry = rng.choice(entries)
@@ -185,12 +242,107 @@ def build_codeqa_payload(session_id: str) -> ExperimentPayload:
     )
 
 
+def build_sniah_payload(seed: int, name: str) -> ExperimentPayload:
+    """Build S-NIAH experiment from its SNIAH_CONFIGS entry"""
+    config = SNIAH_CONFIGS[name]
+    
+    context = build_haystack_context(
+        config["total_chars"],
+        config["needle"],
+        seed,
+        mapped=config.get("mapped", False),
+    )
+    
+    return ExperimentPayload(
+        name=name,
+        query=config["query"],
+        context=context,
+        expected=config["expected"],
+        description=config["description"],
+        validator=validate_needle,
+    )
+
+
+def freeze_value(value: Any) -> Any:
+    """Read-only copy of an expected value: mappings become proxies, lists tuples"""
+    if isinstance(value, Mapping):
+        return MappingProxyType({k: freeze_value(v) for k, v in value.items()})
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_value(v) for v in value)
+    return value
+
+
+def plain_value(value: Any) -> Any:
+    """Top-level inverse of freeze_value, so results render as before"""
+    if isinstance(value, Mapping):
+        return dict(value)
+    if isinstance(value, tuple):
+        return list(value)
+    return value
+
+
+def payload_size(payload: ExperimentPayload, shared_context: bool = False) -> int:
+    """Estimated bytes a cached payload pins; a mapped context is charged its spill file size.
+
+    Evicting a payload drops the cache's reference, and the spill file is
+    unlinked as soon as the last run still using it lets go of the mapping.
+    A shared context is cached and charged under its own key, so only the
+    expected value counts here.
+    """
+    context = payload.context
+    if shared_context:
+        return estimate_size(payload.expected)
+    if is_mapped(context):
+        return estimate_size(payload.expected) + os.path.getsize(context.path)
+    return profile_context(context).total_chars + estimate_size(payload.expected)
+
+
+def memoized(
+    experiment: str,
+    build: Callable[..., ExperimentPayload],
+    seeded: bool = True,
+    shared_context: bool = False,
+    **params: Any,
+) -> Callable[[str], ExperimentPayload]:
+    """Payload builder cached by (experiment, seed, params); the payload and its context are immutable"""
+    key_params = tuple(sorted(params.items()))
+    size = partial(payload_size, shared_context=shared_context)
+    
+    def builder(seed: int) -> ExperimentPayload:
+        seed = seed if seeded else None
+        
+        def build_frozen() -> ExperimentPayload:
+            payload = build(seed, **params)
+            return replace(payload, context=freeze_context(payload.context), expected=freeze_value(payload.expected))
+        
+        return context_cache.get_or_load(("payload", experiment, seed, key_params), build_frozen, size=size)
+    
+    return builder
+
+
+def load_context_index(context: Any) -> ContextIndex:
+    """ctx_index for a memoized context, built once and cached next to it.
+
+    The entry keeps its context alive, so the id in the key cannot be reused
+    while it is cached; the TREC context shared by the OOLONG experiments
+    gets a single index.
+    """
+    _, index = context_cache.get_or_load(
+        ("index", id(context)),
+        lambda: (context, ContextIndex(context)),
+        size=lambda entry: entry[1].nbytes,
+    )
+    return index
+
+
 # Experiment registry
-EXPERIMENT_BUILDERS: Dict[str, Callable[[str], ExperimentPayload]] = {
-    "oolong": lambda sid: build_oolong_payload(),
-    "oolong-pairs": lambda sid: build_oolong_pairs_payload(),
-    "browsecomp-1k": lambda sid: build_browsecomp_payload(sid, doc_target=1000),
-    "codeqa": lambda sid: build_codeqa_payload(sid),
+EXPERIMENT_BUILDERS: Dict[str, Callable[[int], ExperimentPayload]] = {
+    # Both share the context cached under "trec" (load_trec_context)
+    "oolong": memoized("oolong", build_oolong_payload, seeded=False, shared_context=True),
+    "oolong-pairs": memoized("oolong-pairs", build_oolong_pairs_payload, seeded=False, shared_context=True),
+    "browsecomp-1k": memoized("browsecomp-1k", build_browsecomp_payload, doc_target=1000),
+    "codeqa": memoized("codeqa", build_codeqa_payload),
+    **{name: memoized(name, build_sniah_payload, name=name) for name in SNIAH_CONFIGS},
 }
 
 
@@ -203,9 +355,17 @@ def execute_benchmark(
     model_name: str,
     sub_model_name: str,
     session_id: str,
+    budget: Dict[str, Any] | None = None,
+    use_cache: bool | None = None,
+    on_event: EventSink | None = None,
+    cancel_event: threading.Event | None = None,
+    build_index: bool = False,
+    sandbox: bool = False,
+    seed: int | None = None,
 ) -> Dict[str, Any]:
-    """Execute a benchmark experiment"""
+    """Execute a benchmark experiment; `seed` defaults to one derived from the session"""
     start_time = time.time()
+    seed = session_seed(session_id) if seed is None else seed
     
     try:
         # Build payload
@@ -213,12 +373,32 @@ def execute_benchmark(
         if not builder:
             raise ValueError(f"Unknown experiment: {experiment_name}")
         
-        payload = builder(session_id)
-        stats = context_stats(payload.context)
-        
-        # Run RLM agent
-        agent = RLMAgent(model_name=model_name, sub_model_name=sub_model_name)
-        output = agent(payload.query, payload.context)
+        memory = PeakMemory()
+        with memory:
+            payload = builder(seed)
+            profile = profile_context(payload.context)
+            stats = profile.stats()
+            # The sandbox worker builds its own index next to its copy of the context
+            index = load_context_index(payload.context) if build_index and not sandbox else None
+            build_seconds = time.time() - start_time
+            
+            # Run RLM agent
+            if use_cache is None:
+                use_cache = cache_enabled_by_default()
+            cache = get_response_cache() if use_cache else None
+            agent = RLMAgent(
+                model_name=model_name,
+                sub_model_name=sub_model_name,
+                response_cache=cache,
+                on_event=on_event,
+                cancel_event=cancel_event,
+                build_index=build_index,
+                sandbox=sandbox,
+                **(budget or {}),
+            )
+            run_started = time.time()
+            output = agent(payload.query, payload.context, profile=profile, index=index)
+            run_seconds = time.time() - run_started
         
         # Validate (returns tuple: (passed, reason))
         validation_result = payload.validator(output, payload)
@@ -234,11 +414,35 @@ def execute_benchmark(
             "session_id": session_id,
             "model": model_name,
             "sub_model": sub_model_name,
+            "seed": seed,
             "passed": passed,
             "validation_reason": reason,
             "output": output,
-            "expected": str(payload.expected),
+            "expected": str(plain_value(payload.expected)),
             "context_stats": stats,
+            "sub_calls": agent.budget.snapshot(),
+            "root_usage": agent.root_usage,
+            "context_index": agent.context_index.stats() if agent.context_index else None,
+            "repl": {"sandbox": sandbox, "restarts": agent.repl_restarts},
+            "response_cache": {
+                "enabled": cache is not None,
+                "hits": agent.budget.cache_hits,
+                "misses": agent.budget.cache_misses,
+                **({"store": cache.snapshot()} if cache is not None else {}),
+            },
+            "caches": {
+                "datasets": dataset_cache.snapshot(),
+                "contexts": context_cache.snapshot(),
+                "results": result_store.snapshot(),
+                "uploads": uploader.snapshot(),
+            },
+            "scaling": {
+                "context_chars": stats["characters"],
+                "build_seconds": round(build_seconds, 2),
+                "latency_seconds": round(run_seconds, 2),
+                "sub_calls": agent.budget.calls,
+                **memory.snapshot(),
+            },
             "elapsed_seconds": round(time.time() - start_time, 2),
         }
     
@@ -252,22 +456,111 @@ def execute_benchmark(
         }
 
 
-def save_result_to_s3(result: dict, session_id: str):
-    """Save result to S3"""
+def save_result_to_s3(result: dict, session_id: str, task_id: Any):
+    """Queue result for upload; the stored task gets its s3_key (or s3_error) once the batch is written"""
+    def on_uploaded(key: str | None, error: str | None) -> None:
+        if error is None:
+            result_store.update(task_id, s3_key=key, s3_upload="uploaded")
+        else:
+            result_store.update(task_id, s3_error=f"Failed to save to S3: {error}", s3_upload="failed")
+    
     try:
-        timestamp = int(time.time())
-        key = f"results/{result['experiment']}/{session_id}/{timestamp}.json"
-        
-        import json
-        s3_client.put_object(
-            Bucket=S3_BUCKET,
-            Key=key,
-            Body=json.dumps(result, indent=2),
-            ContentType="application/json",
-        )
-        result["s3_key"] = key
-    except Exception as exc:
-        result["s3_error"] = f"Failed to save to S3: {exc}"
+        uploader.submit(result, session_id, on_uploaded)
+    except Exception as exc:  # pylint: disable=broad-except
+        result_store.update(task_id, s3_error=f"Failed to save to S3: {exc}", s3_upload="failed")
+
+
+def load_result_from_s3(experiment: str, session_id: str, task_id: Any = None) -> Dict[str, Any] | None:
+    """Latest persisted result of a session (or the one for task_id), once it has left the result store"""
+    prefix = f"results/{experiment}/{session_id}/"
+    try:
+        objects = []
+        for page in s3_client.get_paginator("list_objects_v2").paginate(Bucket=S3_BUCKET, Prefix=prefix):
+            objects.extend(page.get("Contents", []))
+        for obj in sorted(objects, key=lambda o: (o["LastModified"], o["Key"]), reverse=True):
+            body = s3_client.get_object(Bucket=S3_BUCKET, Key=obj["Key"])["Body"].read()
+            # Batches append in completion order, so the newest result is last
+            for result in reversed(read_results(body, obj["Key"])):
+                if task_id is None or result.get("task_id") == task_id:
+                    result.setdefault("status", "completed")
+                    result.setdefault("s3_key", obj["Key"])
+                    return result
+    except Exception as exc:  # pylint: disable=broad-except
+        print(f"[Handler] S3 result lookup failed for {prefix}: {type(exc).__name__}: {exc}")
+    return None
+
+
+def estimate_run_bytes(experiment: str) -> int:
+    """Rough peak memory of one run, used for scheduler admission control"""
+    config = SNIAH_CONFIGS.get(experiment)
+    if config is not None:
+        # Mapped haystacks live in the page cache, not on the heap
+        chars = 0 if config.get("mapped") else config["total_chars"]
+    else:
+        chars = CONTEXT_CHAR_ESTIMATES.get(experiment, 1_000_000)
+    return RUN_OVERHEAD_BYTES + CONTEXT_MEMORY_FACTOR * chars
+
+
+def status_view(entry: Dict[str, Any], events_since: int = 0) -> Dict[str, Any]:
+    """JSON-serializable copy of a task entry with its progress events and queue state"""
+    view = {k: v for k, v in entry.items() if k not in ("progress", "cancel_event")}
+    progress = entry.get("progress")
+    if isinstance(progress, ProgressLog):
+        view["progress"] = progress.snapshot(since=events_since)
+    elif progress is not None:
+        # Finished entries keep the rendered snapshot of their whole run
+        view["progress"] = {**progress, "events": [e for e in progress["events"] if e["seq"] > events_since]}
+    if entry.get("status") == "queued":
+        view["queue_position"] = scheduler.position(entry.get("task_id"))
+        view["queued_seconds"] = round(time.time() - entry["submitted_at"], 1)
+        view["scheduler"] = scheduler.snapshot()
+    return view
+
+
+# Async task storage, keyed by task_id (RESULT_TTL_SECONDS, RESULT_STORE_MAX_MB, RESULT_SPILL)
+result_store = ResultStore(status_view, spill_path=spill_path_from_env())
+
+
+def task_key(value: Any) -> Any:
+    """task_id from a request payload (clients may send it as a string)"""
+    if isinstance(value, str) and value.isdigit():
+        return int(value)
+    return value
+
+
+def find_task(payload: Dict[str, Any], session_id: str) -> Any:
+    """task_id named in the payload, else the latest task of the session"""
+    task_id = task_key(payload.get("task_id"))
+    return task_id if task_id is not None else result_store.latest(session_id)
+
+
+def number_field(payload: Dict[str, Any], name: str, kind: Callable[[Any], Any]) -> Any:
+    """Optional numeric payload field; None when absent or null, ValueError when malformed"""
+    value = payload.get(name)
+    if value is None:
+        return None
+    try:
+        return kind(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Invalid '{name}': expected a number, got {value!r}") from None
+
+
+def wait_for_change(task_id: Any, payload: Dict[str, Any], events_since: int | None) -> Dict[str, Any] | None:
+    """Long-poll: block up to `wait_seconds` until the task's status moves past `known_status`
+    (default: its current status) or, with `events_since`, a newer progress event arrives"""
+    wait_seconds = min(number_field(payload, "wait_seconds", float) or 0, STATUS_MAX_WAIT_SECONDS)
+    entry = result_store.get(task_id)
+    if entry is None or wait_seconds <= 0 or entry.get("status") not in ("queued", "running"):
+        return entry
+    known_status = payload.get("known_status") or entry["status"]
+    
+    def changed(current: Dict[str, Any]) -> bool:
+        if current.get("status") != known_status:
+            return True
+        progress = current.get("progress")
+        return events_since is not None and isinstance(progress, ProgressLog) and progress.last_seq > events_since
+    
+    return result_store.wait(task_id, changed, wait_seconds) or result_store.get(task_id)
 
 
 @app.entrypoint
@@ -283,17 +576,40 @@ def benchmark_handler(payload, context=None):
     # Check status of async task
     if payload.get("check_status"):
         session_id = payload.get("session_id", "default")
-        task_id = payload.get("task_id")
+        task_id = find_task(payload, session_id)
+        try:
+            events_since = number_field(payload, "events_since", int)
+            number_field(payload, "wait_seconds", float)
+        except ValueError as exc:
+            return {"error": str(exc), "status_code": 400}
+        
+        print(f"[Handler] Status check for session_id: {session_id}, task_id: {task_id}")
         
-        print(f"[Handler] Status check for session_id: {session_id}")
-        print(f"[Handler] Available sessions: {list(benchmark_results.keys())}")
+        entry = wait_for_change(task_id, payload, events_since) if task_id is not None else None
+        if entry is not None:
+            return status_view(entry, events_since or 0)
         
-        if session_id in benchmark_results:
-            print(f"[Handler] Found result for {session_id}")
-            return benchmark_results[session_id]
+        # Expired from the store: fall back to the result persisted in S3
+        stored = load_result_from_s3(experiment, session_id, task_key(payload.get("task_id")))
+        if stored is not None:
+            print(f"[Handler] Loaded result for {session_id} from {stored['s3_key']}")
+            return {**stored, "source": "s3"}
         
         print(f"[Handler] Session {session_id} not found")
-        return {"status": "not_found", "session_id": session_id}
+        return {"status": "not_found", "session_id": session_id, "task_id": task_id}
+    
+    # Cancel a queued or running task; the agent stops at its next token, tool call or sub-call
+    if payload.get("cancel"):
+        session_id = payload.get("session_id", "default")
+        task_id = find_task(payload, session_id)
+        entry = result_store.get(task_id) if task_id is not None else None
+        if not entry or entry.get("status") not in ("queued", "running"):
+            return {"status": "not_running", "session_id": session_id, "task_id": task_id}
+        entry["cancel_event"].set()
+        if entry["status"] == "queued" and scheduler.cancel(task_id):
+            result_store.put(task_id, session_id, {**entry, "status": "cancelled"})
+            return {"status": "cancelled", "session_id": session_id, "task_id": task_id}
+        return {"status": "cancelling", "session_id": session_id, "task_id": task_id}
     
     # Start new async task
     session_id = payload.get("session_id", f"session-{int(time.time())}")
@@ -303,19 +619,53 @@ def benchmark_handler(payload, context=None):
     
     model_name = payload.get("model_name", "amazon.nova-pro-v1:0")
     sub_model_name = payload.get("sub_model_name", "amazon.nova-micro-v1:0")
+    budget = {key: payload[key] for key in BUDGET_FIELDS if payload.get(key) is not None}
+    use_cache = payload.get("response_cache")
+    build_index = bool(payload.get("context_index", False))
+    sandbox = bool(payload.get("sandbox", REPL_SANDBOX))
+    seed = int(payload["seed"]) if payload.get("seed") is not None else None
+    
+    priority = int(payload.get("priority", 0))
+    
+    progress = ProgressLog(on_append=result_store.notify)
+    cancel_event = threading.Event()
+    entry = {
+        "status": "queued",
+        "task_id": task_id,
+        "progress": progress,
+        "cancel_event": cancel_event,
+        "submitted_at": time.time(),
+    }
     
     def run_benchmark():
-        result = execute_benchmark(experiment, model_name, sub_model_name, session_id)
-        save_result_to_s3(result, session_id)
-        benchmark_results[session_id] = {"status": "completed", **result}
+        if cancel_event.is_set():
+            # Cancelled after the worker took the job but before it ran: nobody else finishes the entry
+            result_store.put(task_id, session_id, {**entry, "status": "cancelled"})
+            return
+        queue_wait = round(time.time() - entry["submitted_at"], 2)
+        result_store.update(task_id, status="running", queue_wait_seconds=queue_wait)
+        result = execute_benchmark(
+            experiment, model_name, sub_model_name, session_id, budget, use_cache,
+            on_event=progress, cancel_event=cancel_event, build_index=build_index, sandbox=sandbox, seed=seed,
+        )
+        status = "cancelled" if cancel_event.is_set() else "completed"
+        result.update(queue_wait_seconds=queue_wait, task_id=task_id, status=status)
+        # Complete as soon as the result exists locally; the upload finishes in the background
+        result_store.put(task_id, session_id, {**result, "progress": progress, "s3_upload": "pending"})
+        save_result_to_s3(result, session_id, task_id)
     
-    benchmark_results[session_id] = {"status": "running", "task_id": task_id}
-    threading.Thread(target=run_benchmark, daemon=True).start()
+    result_store.put(task_id, session_id, entry)
+    try:
+        scheduler.submit(task_id, run_benchmark, estimate_run_bytes(experiment), priority)
+    except QueueFull as exc:
+        result_store.discard(task_id)
+        return {"status": "rejected", "session_id": session_id, "experiment": experiment, "error": str(exc)}
     
     return {
         "status": "started",
         "task_id": task_id,
         "session_id": session_id,
         "experiment": experiment,
-        "message": "Benchmark started. Poll with the same session_id and check_status=true",
+        "queue_position": scheduler.position(task_id),
+        "message": "Benchmark queued. Poll with this task_id (or the same session_id) and check_status=true",
     }
@@ -0,0 +1,152 @@
+"""Thread-safe, size-aware LRU cache with single-flight loading
+
+`benchmark_handler` runs every task on its own thread, so several tasks can
+ask for the same cold dataset at once. `SingleFlight` runs the loader once per
+key and hands its result (or exception) to every concurrent caller.
+`BoundedCache` keeps loaded values under a memory budget, evicting the least
+recently used, and counts hits, misses, coalesced waits and evictions.
+"""
+from __future__ import annotations
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+try:
+    from src.context_profile import approx_str_len
+except ImportError:
+    from context_profile import approx_str_len
+
+
+def estimate_size(value: Any) -> int:
+    """Approximate heap bytes of a value; containers are measured by their rendered length"""
+    if isinstance(value, (str, bytes, list, tuple, dict)):
+        return sys.getsizeof(value) + (len(value) if isinstance(value, bytes) else approx_str_len(value))
+    return sys.getsizeof(value)
+
+
+class _Flight:
+    __slots__ = ("done", "value", "error")
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Deduplicates concurrent calls for the same key"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[Hashable, _Flight] = {}
+
+    def do(self, key: Hashable, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """Run func once for concurrent callers of `key`; returns (value, shared)"""
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.value, True
+        try:
+            flight.value = func()
+        except BaseException as exc:
+            flight.error = exc
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.value, False
+
+
+class BoundedCache:
+    """LRU cache bounded by the estimated size of its values"""
+
+    def __init__(self, name: str, max_bytes: int, sizeof: Callable[[Any], int] = estimate_size):
+        self.name = name
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[Hashable, Tuple[Any, int]] = OrderedDict()
+        self._bytes = 0
+        self._flights = SingleFlight()
+        self.hits = 0
+        self.misses = 0
+        self.waits = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return default
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int | None = None) -> None:
+        size = self._sizeof(value) if size is None else size
+        with self._lock:
+            self._discard(key)
+            if size > self.max_bytes:
+                # Larger than the whole budget: serve it, never keep it
+                return
+            self._entries[key] = (value, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+                self.evictions += 1
+
+    def _discard(self, key: Hashable) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[1]
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], size: Callable[[Any], int] | None = None) -> Any:
+        """Cached value for key, loading it at most once across concurrent callers"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+
+        def load() -> Any:
+            # A caller that raced past the miss above may find the value already stored
+            with self._lock:
+                entry = self._entries.get(key)
+            if entry is not None:
+                return entry[0]
+            value = loader()
+            self.put(key, value, size(value) if size else None)
+            return value
+
+        value, shared = self._flights.do(key, load)
+        if shared:
+            with self._lock:
+                self.waits += 1
+        return value
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._entries
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "waits": self.waits,
+                "evictions": self.evictions,
+            }
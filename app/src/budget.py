@@ -0,0 +1,164 @@
+"""Thread-safe accounting and limits for sub-model calls"""
+from __future__ import annotations
+
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Tuple
+
+# Approximate on-demand Bedrock prices in USD per 1K tokens: (input, output).
+# Keys are matched against the model id with any region prefix removed.
+MODEL_PRICING: Dict[str, Tuple[float, float]] = {
+    "amazon.nova-micro": (0.000035, 0.00014),
+    "amazon.nova-lite": (0.00006, 0.00024),
+    "amazon.nova-pro": (0.0008, 0.0032),
+    "amazon.nova-premier": (0.0025, 0.0125),
+    "anthropic.claude-haiku-4-5": (0.001, 0.005),
+    "anthropic.claude-sonnet-4-5": (0.003, 0.015),
+    "anthropic.claude-opus-4-5": (0.005, 0.025),
+    "openai.gpt-oss-20b": (0.00007, 0.0003),
+    "openai.gpt-oss-120b": (0.00015, 0.0006),
+    "deepseek.r1": (0.00135, 0.0054),
+    "deepseek.v3": (0.00058, 0.00168),
+}
+
+# Rough characters-per-token ratio used to reserve input tokens before a call
+CHARS_PER_TOKEN = 4
+# Output tokens held per in-flight call when the sub-model has no max_tokens set
+OUTPUT_RESERVE_TOKENS = int(os.environ.get("SUB_CALL_OUTPUT_RESERVE_TOKENS", "1024"))
+
+
+class BudgetExceeded(RuntimeError):
+    """Raised when a sub-call would exceed one of the budget limits"""
+
+
+def model_pricing(model_id: str) -> Tuple[float, float]:
+    """Look up (input, output) USD per 1K tokens for a model id, (0, 0) if unknown"""
+    normalized = model_id.split(".", 1)[1] if model_id.startswith(("us.", "eu.", "apac.", "global.")) else model_id
+    for prefix, price in MODEL_PRICING.items():
+        if normalized.startswith(prefix):
+            return price
+    return (0.0, 0.0)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate for budget reservations"""
+    return max(1, len(text) // CHARS_PER_TOKEN)
+
+
+@dataclass
+class BudgetLimits:
+    """Per-run sub-call limits; None means unlimited"""
+    max_calls: int | None = 50
+    max_input_tokens: int | None = None
+    max_output_tokens: int | None = None
+    max_cost_usd: float | None = None
+
+
+class SubCallBudget:
+    """Atomic per-run tracker of sub-call count, token usage and estimated cost.
+
+    Callers `reserve()` before invoking the sub-model and `record()` the actual
+    usage afterwards. Reservations hold an estimate of the input tokens and
+    `output_reserve` output tokens (the sub-model's max_tokens) so that
+    concurrent calls cannot jointly overshoot a token or cost limit. A call
+    whose output exceeds its reservation can still overshoot by the difference.
+    """
+
+    def __init__(self, model_id: str, limits: BudgetLimits | None = None, output_reserve: int = OUTPUT_RESERVE_TOKENS):
+        self.model_id = model_id
+        self.limits = limits or BudgetLimits()
+        self.output_reserve = output_reserve
+        self._input_price, self._output_price = model_pricing(model_id)
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Clear all counters for a new run"""
+        with self._lock:
+            self.calls = 0
+            self.in_flight = 0
+            self.input_tokens = 0
+            self.output_tokens = 0
+            self.rejected = 0
+            self.cache_hits = 0
+            self.cache_misses = 0
+            self._reserved_input_tokens = 0
+            self._reserved_output_tokens = 0
+
+    def _cost(self, input_tokens: int, output_tokens: int) -> float:
+        return (input_tokens * self._input_price + output_tokens * self._output_price) / 1000
+
+    @property
+    def cost_usd(self) -> float:
+        return self._cost(self.input_tokens, self.output_tokens)
+
+    def reserve(self, prompt: str) -> Tuple[int, int]:
+        """Claim budget for one call; returns the reserved (input, output) token estimates"""
+        limits = self.limits
+        estimate = estimate_tokens(prompt)
+        output_estimate = self.output_reserve
+        if limits.max_output_tokens is not None:
+            # A fresh budget always admits one call, however small its output limit
+            output_estimate = min(output_estimate, limits.max_output_tokens)
+        with self._lock:
+            pending_input = self.input_tokens + self._reserved_input_tokens + estimate
+            pending_output = self.output_tokens + self._reserved_output_tokens + output_estimate
+            error = None
+            if limits.max_calls is not None and self.calls >= limits.max_calls:
+                error = f"Max sub-calls ({limits.max_calls}) reached"
+            elif limits.max_input_tokens is not None and pending_input > limits.max_input_tokens:
+                error = f"Sub-call input token budget ({limits.max_input_tokens:,}) exhausted"
+            elif limits.max_output_tokens is not None and pending_output > limits.max_output_tokens:
+                error = f"Sub-call output token budget ({limits.max_output_tokens:,}) exhausted"
+            elif (
+                limits.max_cost_usd is not None
+                and self._cost(pending_input, pending_output) > limits.max_cost_usd
+            ):
+                error = f"Sub-call cost budget (${limits.max_cost_usd:g}) exhausted"
+            if error:
+                self.rejected += 1
+                raise BudgetExceeded(error)
+            self.calls += 1
+            self.in_flight += 1
+            self._reserved_input_tokens += estimate
+            self._reserved_output_tokens += output_estimate
+        return estimate, output_estimate
+
+    def record(self, reserved: Tuple[int, int], input_tokens: int | None, output_tokens: int | None) -> None:
+        """Settle a reservation with the usage reported by the model"""
+        reserved_input, reserved_output = reserved
+        with self._lock:
+            self.in_flight -= 1
+            self._reserved_input_tokens -= reserved_input
+            self._reserved_output_tokens -= reserved_output
+            self.input_tokens += reserved_input if input_tokens is None else input_tokens
+            self.output_tokens += output_tokens or 0
+
+    def record_cache_lookup(self, hit: bool) -> None:
+        """Count a response-cache lookup made on behalf of this run"""
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Consistent view of the counters for reporting"""
+        with self._lock:
+            return {
+                "model": self.model_id,
+                "calls": self.calls,
+                "rejected": self.rejected,
+                "input_tokens": self.input_tokens,
+                "output_tokens": self.output_tokens,
+                "estimated_cost_usd": round(self.cost_usd, 6),
+                "cache_hits": self.cache_hits,
+                "cache_misses": self.cache_misses,
+                "limits": {
+                    "max_calls": self.limits.max_calls,
+                    "max_input_tokens": self.limits.max_input_tokens,
+                    "max_output_tokens": self.limits.max_output_tokens,
+                    "max_cost_usd": self.limits.max_cost_usd,
+                },
+            }
@@ -1,6 +1,11 @@
 """Context builders for different experiment types"""
 import random
-from typing import List, Dict, Any
+from typing import Iterator, List, Dict, Any, Optional, Sequence, Tuple, Union
+
+try:
+    from src.mapped_context import MappedChunks
+except ImportError:
+    from mapped_context import MappedChunks
 
 # Filler text for synthetic haystacks
 FILLER_SENTENCES = [
@@ -11,38 +16,114 @@ FILLER_SENTENCES = [
     "Customer satisfaction scores reached an all-time high this quarter. ",
 ]
 
+class FrozenChunks(tuple):
+    """Immutable context chunks that can be shared by concurrent runs.
 
-def build_haystack_context(total_chars: int, needle: str, seed: int) -> List[str]:
-    """Build synthetic haystack with embedded needle"""
-    rng = random.Random(seed)
-    chunk_target = max(200_000, total_chars // 16)
+    Unlike a plain tuple it can carry the cached context profile.
+    """
+
+
+def freeze_context(context: Any) -> Any:
+    """Read-only form of a built context; str and memory-mapped contexts already are"""
+    if isinstance(context, (list, tuple)) and not isinstance(context, FrozenChunks):
+        return FrozenChunks(context)
+    return context
+
+
+# Haystacks are tiled from a seeded pool of pre-joined filler blocks
+BLOCK_SENTENCES = 256
+POOL_BLOCKS = 64
+
+
+def _filler_blocks(rng: random.Random) -> List[str]:
+    """Seeded pool of filler blocks, built from one array of sentence indices"""
+    indices = rng.choices(range(len(FILLER_SENTENCES)), k=BLOCK_SENTENCES * POOL_BLOCKS)
+    sentences = [FILLER_SENTENCES[i] for i in indices]
+    return ["".join(sentences[i:i + BLOCK_SENTENCES]) for i in range(0, len(sentences), BLOCK_SENTENCES)]
+
+
+def _needle_offsets(
+    total_chars: int,
+    needles: Sequence[str],
+    positions: Optional[Sequence[float]],
+) -> List[Tuple[int, str]]:
+    """(filler offset, needle) pairs sorted by offset; positions are depths in [0, 1]"""
+    if positions is None:
+        positions = [(i + 1) / (len(needles) + 1) for i in range(len(needles))]
+    if len(positions) != len(needles):
+        raise ValueError("positions must have one depth per needle")
+    placed = []
+    for depth, needle in zip(positions, needles):
+        if not 0.0 <= depth <= 1.0:
+            raise ValueError(f"Needle depth must be within [0, 1], got {depth}")
+        placed.append((int(depth * total_chars), needle))
+    return sorted(placed, key=lambda item: item[0])
+
+
+def _insert_at_sentence(chunk: str, offset: int, needle: str) -> str:
+    """Insert needle at the sentence boundary at or before offset"""
+    boundary = chunk.rfind(". ", 0, offset)
+    at = boundary + 2 if boundary >= 0 else 0
+    if not needle.endswith(" "):
+        needle += " "
+    return chunk[:at] + needle + chunk[at:]
+
+
+def iter_haystack_chunks(
+    total_chars: int,
+    needles: Union[str, Sequence[str]],
+    seed: int,
+    positions: Optional[Sequence[float]] = None,
+    chunk_chars: Optional[int] = None,
+) -> Iterator[str]:
+    """Lazily yield haystack chunks totalling `total_chars` filler characters
     
-    # Generate haystack chunks
-    chunks: List[str] = []
-    remaining = total_chars
-    needle_inserted = False
+    Output is deterministic for a given seed. Each needle is placed at its depth
+    (fraction of the haystack, evenly spaced by default), snapped back to the
+    start of a sentence.
+    """
+    needles = [needles] if isinstance(needles, str) else list(needles)
+    pending = _needle_offsets(total_chars, needles, positions)
+    rng = random.Random(seed)
+    blocks = _filler_blocks(rng)
+    min_block = min(len(b) for b in blocks)
+    chunk_target = chunk_chars or max(200_000, total_chars // 16)
     
-    while remaining > 0:
-        target = min(chunk_target, remaining)
-        buffer: List[str] = []
-        current = 0
+    start = 0
+    while start < total_chars or pending:
+        target = min(chunk_target, max(0, total_chars - start))
+        picks = rng.choices(range(len(blocks)), k=target // min_block + 1)
+        chunk = "".join([blocks[i] for i in picks])[:target]
+        end = start + target
+        last = end >= total_chars
         
-        while current < target:
-            sentence = rng.choice(FILLER_SENTENCES)
-            buffer.append(sentence)
-            current += len(sentence)
+        # Insert back to front so earlier offsets in this chunk stay valid
+        here = [item for item in pending if item[0] < end or last]
+        pending = pending[len(here):]
+        for offset, needle in reversed(here):
+            chunk = _insert_at_sentence(chunk, offset - start, needle)
         
-        chunk = "".join(buffer)[:target]
-        
-        # Insert needle in middle chunk
-        if not needle_inserted and len(chunks) >= 8:
-            chunk = chunk[:len(chunk)//2] + needle + chunk[len(chunk)//2:]
-            needle_inserted = True
-        
-        chunks.append(chunk)
-        remaining -= target
+        yield chunk
+        start = end
+
+
+def build_haystack_context(
+    total_chars: int,
+    needle: Union[str, Sequence[str]],
+    seed: int,
+    mapped: bool = False,
+    positions: Optional[Sequence[float]] = None,
+    chunk_chars: Optional[int] = None,
+) -> Union[List[str], MappedChunks]:
+    """Build synthetic haystack with embedded needle(s)
     
-    return chunks
+    With `mapped=True` the chunks are streamed to a memory-mapped file instead of
+    being kept on the heap, which is what multi-GB haystacks need.
+    """
+    chunks = iter_haystack_chunks(total_chars, needle, seed, positions, chunk_chars)
+    if mapped:
+        return MappedChunks.write(chunks)
+    return list(chunks)
 
 
 def build_trec_context(entries: List[Dict[str, str]], block_size: int = 200) -> List[str]:
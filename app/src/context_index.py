@@ -0,0 +1,195 @@
+"""Precomputed lookup index over an RLM context
+
+Built once per context (benchmark runs reuse it from the context cache) and
+exposed to the REPL as `ctx_index`, so the root model can jump straight to
+needles, question IDs or documents instead of scanning the context or paying
+for sub-LLM calls:
+
+- chunk offsets: where each chunk starts in the concatenated context
+- line table: (chunk, start, end) of every line, without copying line text
+- inverted index: lower-cased word token -> ids of the lines containing it
+- document table: `Document ID: <id>` headers and `<ID>: ...` line prefixes
+"""
+from __future__ import annotations
+
+import re
+import sys
+import time
+from array import array
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, List, Tuple
+
+try:
+    from src.mapped_context import MappedChunks, MappedText
+except ImportError:
+    from mapped_context import MappedChunks, MappedText
+
+TOKEN_RE = re.compile(r"\w+")
+DOC_HEADER_RE = re.compile(r"Document ID:\s*(\S+)")
+LINE_ID_RE = re.compile(r"([A-Z]+\d+):")
+SNIPPET_RADIUS = 80
+
+
+class ContextIndex:
+    """Read-only index over a str, MappedText, sequence or mapping context"""
+
+    def __init__(self, context: Any):
+        started = time.time()
+        self._chunks, self._names = self._split(context)
+        self.chunk_offsets: List[int] = []
+        self._line_chunk = array("q")
+        self._line_start = array("q")
+        self._line_end = array("q")
+        self._postings: Dict[str, array] = {}
+        self._docs: Dict[str, Tuple[int, int]] = {}
+        self._chunk_lines: List[Tuple[int, int]] = []
+
+        total = 0
+        for chunk_id, chunk in enumerate(self._chunks):
+            self.chunk_offsets.append(total)
+            total += len(chunk)
+            first_line = len(self._line_start)
+            self._index_chunk(chunk_id, chunk)
+            self._chunk_lines.append((first_line, len(self._line_start)))
+        for name, chunk_id in self._names.items():
+            self._docs.setdefault(name, self._chunk_lines[chunk_id])
+        self.total_chars = total
+        self.build_seconds = round(time.time() - started, 3)
+
+    @staticmethod
+    def _split(context: Any) -> Tuple[List[Any], Dict[str, int]]:
+        """Chunks to index (str or MappedText, never copied) plus names for mapping keys"""
+        if isinstance(context, (str, MappedText)):
+            return [context], {}
+        if isinstance(context, MappedChunks):
+            return [context.view(i) for i in range(len(context))], {}
+        if isinstance(context, Mapping):
+            keys = list(context.keys())
+            chunks = [v if isinstance(v, (str, MappedText)) else str(v) for v in context.values()]
+            return chunks, {str(k): i for i, k in enumerate(keys)}
+        if isinstance(context, Sequence):
+            return [c if isinstance(c, (str, MappedText)) else str(c) for c in context], {}
+        return [str(context)], {}
+
+    def _index_chunk(self, chunk_id: int, chunk: Any) -> None:
+        size = len(chunk)
+        start = 0
+        current_doc: str | None = None
+        doc_first_line = 0
+        while start <= size:
+            end = chunk.find("\n", start)
+            if end < 0:
+                end = size
+            line_id = len(self._line_start)
+            self._line_chunk.append(chunk_id)
+            self._line_start.append(start)
+            self._line_end.append(end)
+            line = chunk[start:end]
+
+            for token in set(TOKEN_RE.findall(line.lower())):
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = array("q")
+                postings.append(line_id)
+
+            header = DOC_HEADER_RE.match(line)
+            if header:
+                if current_doc is not None:
+                    self._docs.setdefault(current_doc, (doc_first_line, line_id))
+                current_doc, doc_first_line = header.group(1), line_id
+            else:
+                prefix = LINE_ID_RE.match(line)
+                if prefix:
+                    self._docs.setdefault(prefix.group(1), (line_id, line_id + 1))
+            if end == size:
+                break
+            start = end + 1
+        if current_doc is not None:
+            self._docs.setdefault(current_doc, (doc_first_line, len(self._line_start)))
+
+    def _line_text(self, line_id: int) -> str:
+        chunk = self._chunks[self._line_chunk[line_id]]
+        return chunk[self._line_start[line_id]:self._line_end[line_id]]
+
+    @property
+    def num_lines(self) -> int:
+        return len(self._line_start)
+
+    def search(self, term: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """Case-insensitive lookup of `term`; returns hits with line number, chunk, offset and snippet"""
+        needle = term.lower()
+        tokens = set(TOKEN_RE.findall(needle))
+        if not tokens:
+            return []
+        postings = sorted((self._postings.get(t, array("q")) for t in tokens), key=len)
+        candidates = set(postings[0])
+        for other in postings[1:]:
+            candidates.intersection_update(other)
+
+        hits: List[Dict[str, Any]] = []
+        for line_id in sorted(candidates):
+            line = self._line_text(line_id)
+            lowered = line.lower()
+            position = lowered.find(needle)
+            while position >= 0:
+                chunk_id = self._line_chunk[line_id]
+                offset = self._line_start[line_id] + position
+                lo = max(0, position - SNIPPET_RADIUS)
+                hi = position + len(needle) + SNIPPET_RADIUS
+                hits.append({
+                    "line": line_id,
+                    "chunk": chunk_id,
+                    "offset": offset,
+                    "global_offset": self.chunk_offsets[chunk_id] + offset,
+                    "snippet": line[lo:hi],
+                })
+                if len(hits) >= limit:
+                    return hits
+                position = lowered.find(needle, position + 1)
+        return hits
+
+    def count(self, term: str) -> int:
+        """Number of lines containing every word token of `term` (upper bound on hits)"""
+        tokens = set(TOKEN_RE.findall(term.lower()))
+        if not tokens:
+            return 0
+        postings = [set(self._postings.get(t, ())) for t in tokens]
+        return len(set.intersection(*postings))
+
+    def lines(self, start: int, end: int | None = None) -> str:
+        """Lines [start, end) of the whole context joined with newlines"""
+        end = start + 1 if end is None else end
+        lo, hi, _ = slice(start, end).indices(self.num_lines)
+        return "\n".join(self._line_text(i) for i in range(lo, hi))
+
+    def doc(self, doc_id: str) -> str | None:
+        """Text of a document by `Document ID:` header, line ID prefix (e.g. Q0001) or mapping key"""
+        span = self._docs.get(str(doc_id))
+        if span is None:
+            return None
+        return self.lines(*span)
+
+    def doc_ids(self) -> List[str]:
+        return list(self._docs)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate heap bytes of the tables; the context chunks they point into are not counted"""
+        arrays = (self._line_chunk, self._line_start, self._line_end, *self._postings.values())
+        tables = sum(sys.getsizeof(a) for a in arrays)
+        keys = sum(sys.getsizeof(k) for k in self._postings) + sum(sys.getsizeof(k) + 64 for k in self._docs)
+        return tables + keys + sys.getsizeof(self._postings) + sys.getsizeof(self._docs)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "chunks": len(self._chunks),
+            "lines": self.num_lines,
+            "tokens": len(self._postings),
+            "documents": len(self._docs),
+            "characters": self.total_chars,
+            "build_seconds": self.build_seconds,
+        }
+
+    def __repr__(self) -> str:
+        s = self.stats()
+        return f"ContextIndex({s['chunks']} chunks, {s['lines']:,} lines, {s['tokens']:,} tokens, {s['documents']:,} docs)"
@@ -0,0 +1,130 @@
+"""Shared, cached size profile of an RLM context
+
+Both the RLM system prompt and the benchmark result's `context_stats` need the
+per-chunk character lengths. They are computed once here without serializing
+the context: strings report `len()`, mapped contexts read their offset tables,
+and nested values are measured by walking them. Very long sequences of
+non-string items are sampled and extrapolated.
+"""
+from __future__ import annotations
+
+import os
+from collections.abc import Mapping, Sequence
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+try:
+    from src.mapped_context import MappedChunks, MappedText
+except ImportError:
+    from mapped_context import MappedChunks, MappedText
+
+# Sequences of non-str items longer than this are sampled
+SAMPLE_THRESHOLD = int(os.environ.get("CONTEXT_PROFILE_SAMPLE_THRESHOLD", "10000"))
+SAMPLE_SIZE = 1000
+# Chunk lengths listed in the system prompt
+DISPLAY_CHUNKS = 20
+# Attribute used to cache the profile on context objects that allow it
+PROFILE_ATTR = "_rlm_context_profile"
+
+
+@dataclass(frozen=True)
+class ContextProfile:
+    """Character-length summary of a context"""
+    type: str
+    num_chunks: int
+    total_chars: int
+    leading_lengths: Tuple[int, ...]
+    sampled: bool = False
+
+    def prompt_summary(self) -> Dict[str, Any]:
+        """Fields used by RLMAgent._build_system_prompt"""
+        sample = ", ".join(f"{n:,}" for n in self.leading_lengths)
+        if self.num_chunks > len(self.leading_lengths):
+            sample += ", ..."
+        return {
+            "type": self.type,
+            "total": self.total_chars,
+            "chunk_lengths": sample or "n/a",
+            "num_chunks": self.num_chunks,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """`context_stats` block of a benchmark result"""
+        stats: Dict[str, Any] = {"chunks": self.num_chunks, "characters": self.total_chars}
+        if self.sampled:
+            stats["estimated"] = True
+        return stats
+
+
+def approx_str_len(value: Any) -> int:
+    """Estimated length of str(value) for common containers, computed without building the string.
+
+    Strings and mapped text are exact. Inside containers a string's repr is
+    counted as its length plus two quotes, so escaped (newline, quote, control)
+    characters are undercounted by their escape sequences.
+    """
+    if isinstance(value, (str, MappedText)):
+        return len(value)
+    if isinstance(value, Mapping):
+        # "{" + "k: v" items joined by ", " + "}"; keys/values rendered with repr
+        items = sum(_approx_repr_len(k) + 2 + _approx_repr_len(v) for k, v in value.items())
+        return 2 + items + 2 * max(0, len(value) - 1)
+    if isinstance(value, (list, tuple)):
+        items = sum(_approx_repr_len(v) for v in value)
+        return 2 + items + 2 * max(0, len(value) - 1) + (1 if isinstance(value, tuple) and len(value) == 1 else 0)
+    return len(str(value))
+
+
+def _approx_repr_len(value: Any) -> int:
+    if isinstance(value, str):
+        # Quotes only; escapes are not counted (repr() would copy the string)
+        return len(value) + 2
+    if isinstance(value, (Mapping, list, tuple)):
+        return approx_str_len(value)
+    return len(repr(value))
+
+
+def _sequence_lengths(items: Sequence[Any]) -> Tuple[List[int], int, bool]:
+    """(leading lengths, total, sampled) for a sequence of chunks"""
+    count = len(items)
+    if count <= SAMPLE_THRESHOLD or _all_str(items):
+        lengths = [approx_str_len(item) for item in items]
+        return lengths[:DISPLAY_CHUNKS], sum(lengths), False
+    step = count / SAMPLE_SIZE
+    sample = [approx_str_len(items[int(i * step)]) for i in range(SAMPLE_SIZE)]
+    leading = [approx_str_len(items[i]) for i in range(DISPLAY_CHUNKS)]
+    return leading, round(sum(sample) / len(sample) * count), True
+
+
+def _all_str(items: Sequence[Any]) -> bool:
+    return all(isinstance(item, str) for item in items)
+
+
+def _compute(context: Any) -> ContextProfile:
+    if isinstance(context, (str, MappedText)):
+        return ContextProfile("string", 1, len(context), (len(context),))
+    if isinstance(context, MappedChunks):
+        lengths = context.chunk_lengths()
+        return ContextProfile(f"sequence[{len(lengths)}]", len(lengths), sum(lengths), tuple(lengths[:DISPLAY_CHUNKS]))
+    if isinstance(context, Mapping):
+        leading, total, sampled = _sequence_lengths(list(context.values()))
+        return ContextProfile(f"mapping[{len(context)}]", len(context), total, tuple(leading), sampled)
+    if isinstance(context, Sequence):
+        leading, total, sampled = _sequence_lengths(context)
+        return ContextProfile(f"sequence[{len(context)}]", len(context), total, tuple(leading), sampled)
+    length = approx_str_len(context)
+    return ContextProfile(type(context).__name__, 1, length, (length,))
+
+
+def profile_context(context: Any) -> ContextProfile:
+    """Profile a context, reusing the copy cached on the object when possible"""
+    cached = getattr(context, PROFILE_ATTR, None)
+    if isinstance(cached, ContextProfile):
+        return cached
+    profile = _compute(context)
+    try:
+        object.__setattr__(context, PROFILE_ATTR, profile)
+    except (AttributeError, TypeError):
+        # Built-in str/list/dict cannot carry attributes; callers pass the profile along instead
+        pass
+    return profile
@@ -0,0 +1,142 @@
+"""Pre-parsed, memory-mapped dataset cache
+
+Parsing `longbench_codeqa.json` / `browsecomp_plus_sample.json` with
+`json.load` on every cold start costs seconds and a large memory spike. The
+first load writes each entry as its own pickle (protocol 5) into a
+`<source>.entries` file with an offset table; later loads map that file and
+unpickle only the entries that are actually read.
+
+Layout: MAGIC, entry blobs back to back, offset table (count + 1 little-endian
+int64), JSON metadata, then a trailer of (metadata length, count, MAGIC). The
+metadata records the source file's size and mtime, so editing or re-downloading
+the source invalidates the cache.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import pickle
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable
+
+MAGIC = b"RLMDSET1"
+FORMAT_VERSION = 1
+TRAILER = struct.Struct("<QQ8s")
+CACHE_SUFFIX = ".entries"
+CACHE_ENABLED = os.environ.get("DATASET_PARSED_CACHE", "true").lower() in ("1", "true", "yes")
+
+
+def _source_stamp(source: Path) -> Dict[str, int]:
+    stat = source.stat()
+    return {"source_size": stat.st_size, "source_mtime_ns": stat.st_mtime_ns}
+
+
+def _offsets_array(data: bytes | memoryview) -> array:
+    offsets = array("q")
+    offsets.frombytes(data)
+    if sys.byteorder != "little":
+        offsets.byteswap()
+    return offsets
+
+
+class EntryStore(Sequence):
+    """Read-only sequence of dataset entries, unpickled lazily from a mapped cache file"""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            self._mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            meta_len, count, magic = TRAILER.unpack_from(self._mm, len(self._mm) - TRAILER.size)
+            if self._mm[:len(MAGIC)] != MAGIC or magic != MAGIC:
+                raise ValueError(f"{self.path} is not a dataset cache file")
+            meta_end = len(self._mm) - TRAILER.size
+            table_end = meta_end - meta_len
+            table_start = table_end - (count + 1) * 8
+            self.meta: Dict[str, Any] = json.loads(self._mm[table_end:meta_end])
+            self._offsets = _offsets_array(self._mm[table_start:table_end])
+        except (ValueError, struct.error):
+            self._mm.close()
+            raise
+
+    @classmethod
+    def build(cls, path: str | os.PathLike, entries: Iterable[Any], source: Path | None = None) -> "EntryStore":
+        """Write entries to a cache file (atomically) and map it"""
+        path = Path(path)
+        tmp_path = path.with_name(f"{path.name}.tmp-{os.getpid()}")
+        offsets = array("q", [len(MAGIC)])
+        with tmp_path.open("wb") as handle:
+            handle.write(MAGIC)
+            for entry in entries:
+                blob = pickle.dumps(entry, protocol=5)
+                handle.write(blob)
+                offsets.append(offsets[-1] + len(blob))
+            if sys.byteorder != "little":
+                offsets.byteswap()
+            handle.write(offsets.tobytes())
+            meta = {"version": FORMAT_VERSION, **(_source_stamp(source) if source else {})}
+            meta_bytes = json.dumps(meta).encode("utf-8")
+            handle.write(meta_bytes)
+            handle.write(TRAILER.pack(len(meta_bytes), len(offsets) - 1, MAGIC))
+        os.replace(tmp_path, path)
+        return cls(path)
+
+    @classmethod
+    def open(cls, path: str | os.PathLike, source: Path | None = None) -> "EntryStore | None":
+        """Map an existing cache; None if it is missing, unreadable or stale for `source`"""
+        try:
+            store = cls(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        expected = {"version": FORMAT_VERSION, **(_source_stamp(source) if source else {})}
+        if any(store.meta.get(k) != v for k, v in expected.items()):
+            store.close()
+            return None
+        return store
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("EntryStore index out of range")
+        return pickle.loads(self._mm[self._offsets[index]:self._offsets[index + 1]])
+
+    @property
+    def nbytes(self) -> int:
+        return len(self._mm)
+
+    def close(self) -> None:
+        self._mm.close()
+
+    def __repr__(self) -> str:
+        return f"EntryStore({str(self.path)!r}, {len(self)} entries, {self.nbytes:,} bytes)"
+
+
+def cached_entries(
+    source: Path,
+    parse: Callable[[Path], Iterable[Any]],
+    uncached: Callable[[Path], Sequence] | None = None,
+) -> Sequence:
+    """Entries of `source`, served from its pre-parsed cache (built with `parse` when stale).
+
+    `parse` may yield entries one at a time, so building the cache never holds
+    the whole dataset. With the cache disabled, `uncached(source)` (or a list of
+    the parsed entries) is returned instead.
+    """
+    if not CACHE_ENABLED:
+        return uncached(source) if uncached else list(parse(source))
+    cache_path = source.with_name(source.name + CACHE_SUFFIX)
+    store = EntryStore.open(cache_path, source)
+    if store is None:
+        store = EntryStore.build(cache_path, parse(source), source)
+    return store
@@ -1,9 +1,20 @@
 """Dataset loading utilities for benchmarks"""
-import json
 from pathlib import Path
-from typing import Dict, List, Any
+from typing import Dict, Iterator, Any, Sequence
 import boto3
 import os
+import sys
+
+try:
+    from src.bounded_cache import BoundedCache, SingleFlight
+    from src.dataset_cache import cached_entries
+    from src.json_entries import JsonArrayEntries, iter_json_entries
+    from src.s3_download import download_object, gunzip_file, is_missing
+except ImportError:
+    from bounded_cache import BoundedCache, SingleFlight
+    from dataset_cache import cached_entries
+    from json_entries import JsonArrayEntries, iter_json_entries
+    from s3_download import download_object, gunzip_file, is_missing
 
 s3_client = boto3.client("s3")
 S3_BUCKET = os.environ.get("S3_RESULTS_BUCKET", "rlm-benchmark-results-local")
@@ -11,82 +22,102 @@ DATASET_PREFIX = os.environ.get("DATASET_PREFIX", "datasets")
 LOCAL_DATASET_DIR = Path(os.environ.get("DATASET_CACHE_DIR", "/tmp/rlm_datasets"))
 LOCAL_DATASET_DIR.mkdir(parents=True, exist_ok=True)
 
-# Caches
-_trec_cache: List[Dict[str, str]] | None = None
-_codeqa_cache: List[Dict[str, Any]] | None = None
-_browsecomp_cache: Dict[str, Any] | None = None
+DATASET_CACHE_MAX_MB = int(os.environ.get("DATASET_CACHE_MAX_MB", "1024"))
+
+# Loaded datasets, shared by all handler threads; concurrent cold loads and downloads run once
+dataset_cache = BoundedCache("datasets", DATASET_CACHE_MAX_MB * 1024 * 1024)
+_downloads = SingleFlight()
+
 
+def _mapped_size(entries: Sequence[Any]) -> int:
+    """Heap footprint of a lazily decoded, memory-mapped entry sequence (offset table only)"""
+    return sys.getsizeof(entries) + 16 * len(entries)
 
-def get_dataset_path(relative_key: str) -> Path:
-    """Get local path to dataset, downloading from S3 if needed"""
+
+def get_dataset_path(relative_key: str, client: Any = None) -> Path:
+    """Get local path to dataset, downloading from S3 if needed
+    
+    A `<key>.gz` object is preferred when it exists and is decompressed locally.
+    Files only appear under their final name once complete and verified, so an
+    existing path is always safe to use. `client` overrides the S3 client.
+    """
     normalized = relative_key.replace("\\", "/").lstrip("/")
     local_path = LOCAL_DATASET_DIR / normalized
     
     if local_path.exists():
         return local_path
     
+    _downloads.do(normalized, lambda: _download_dataset(normalized, local_path, client or s3_client))
+    return local_path
+
+
+def _download_dataset(normalized: str, local_path: Path, client: Any) -> None:
+    if local_path.exists():
+        return
     if not S3_BUCKET:
         raise RuntimeError(f"S3_RESULTS_BUCKET is not configured. Current value: {S3_BUCKET}")
     
-    local_path.parent.mkdir(parents=True, exist_ok=True)
     prefix = DATASET_PREFIX.strip("/")
     s3_key = "/".join(filter(None, [prefix, normalized]))
     
+    compressed_path: Path | None = local_path.with_name(local_path.name + ".gz")
     try:
-        s3_client.download_file(S3_BUCKET, s3_key, str(local_path))
+        # A complete .gz left by an interrupted decompression is reused
+        if not compressed_path.exists():
+            try:
+                download_object(client, S3_BUCKET, f"{s3_key}.gz", compressed_path)
+            except Exception as exc:  # pylint: disable=broad-except
+                if not is_missing(exc):
+                    raise
+                compressed_path = None
+        if compressed_path is None:
+            download_object(client, S3_BUCKET, s3_key, local_path)
+        else:
+            gunzip_file(compressed_path, local_path)
+            compressed_path.unlink(missing_ok=True)
     except Exception as exc:
         raise RuntimeError(
             f"Failed to download dataset asset {normalized} from s3://{S3_BUCKET}/{s3_key}. "
             f"Error: {type(exc).__name__}: {exc}"
         ) from exc
-    
-    return local_path
 
 
-def load_trec_entries() -> List[Dict[str, str]]:
-    """Load TREC dataset with caching"""
-    global _trec_cache
-    if _trec_cache is not None:
-        return _trec_cache
-    
-    dataset_path = get_dataset_path("trec/train_5500.label")
-    entries: List[Dict[str, str]] = []
-    
-    with dataset_path.open("r", encoding="latin-1") as infile:
+def _parse_trec(path: Path) -> Iterator[Dict[str, str]]:
+    with path.open("r", encoding="latin-1") as infile:
         for idx, line in enumerate(infile):
             if not line.strip():
                 continue
             label, question = line.strip().split(" ", 1)
             coarse = label.split(":")[0]
-            entries.append({"id": f"Q{idx:04d}", "label": coarse, "text": question})
-    
-    _trec_cache = entries
-    return entries
+            yield {"id": f"Q{idx:04d}", "label": coarse, "text": question}
 
 
-def load_codeqa_entries() -> List[Dict[str, Any]]:
-    """Load CodeQA dataset with caching"""
-    global _codeqa_cache
-    if _codeqa_cache is not None:
-        return _codeqa_cache
-    
-    dataset_path = get_dataset_path("longbench_codeqa.json")
-    with dataset_path.open("r", encoding="utf-8") as infile:
-        _codeqa_cache = json.load(infile)
-    
-    return _codeqa_cache
+def load_trec_entries() -> Sequence[Dict[str, str]]:
+    """Load TREC dataset with caching"""
+    # Small enough to keep decoded; the pre-parsed cache still skips re-splitting lines
+    return dataset_cache.get_or_load(
+        "trec",
+        lambda: list(cached_entries(get_dataset_path("trec/train_5500.label"), _parse_trec)),
+    )
+
+
+def load_codeqa_entries() -> Sequence[Dict[str, Any]]:
+    """Load CodeQA dataset with caching (entries are decoded on access)"""
+    return dataset_cache.get_or_load(
+        "codeqa",
+        lambda: cached_entries(
+            get_dataset_path("longbench_codeqa.json"), iter_json_entries, uncached=JsonArrayEntries,
+        ),
+        size=_mapped_size,
+    )
 
 
 def load_browsecomp_sample() -> Dict[str, Any]:
     """Load BrowseComp+ dataset with caching"""
-    global _browsecomp_cache
-    if _browsecomp_cache is not None:
-        return _browsecomp_cache
-    
-    dataset_path = get_dataset_path("browsecomp_plus_sample.json")
-    with dataset_path.open("r", encoding="utf-8") as infile:
-        data = json.load(infile)
-        # Return first sample if data is a list
-        _browsecomp_cache = data[0] if isinstance(data, list) else data
-    
-    return _browsecomp_cache
+    # First sample only; the remaining entries are never decoded
+    return dataset_cache.get_or_load(
+        "browsecomp",
+        lambda: cached_entries(
+            get_dataset_path("browsecomp_plus_sample.json"), iter_json_entries, uncached=JsonArrayEntries,
+        )[0],
+    )
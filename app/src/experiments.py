@@ -62,21 +62,36 @@ def validate_multiple_choice(output: str, payload: Any) -> tuple[bool, str]:
     return False, f"Expected answer '{payload.expected}' not found in output"
 
 
-# S-NIAH experiment configs
+# S-NIAH experiment configs (~4 characters per token)
 SNIAH_CONFIGS = {
     "s-niah-50k": {
         "total_chars": 200_000,
         "needle": "The magic number is 73628.",
+        "query": "What is the magic number mentioned in the context?",
+        "expected": "73628",
         "description": "Single Needle in a 50K-token haystack",
     },
     "s-niah-200k": {
         "total_chars": 800_000,
         "needle": "The secret code is ALPHA-DELTA-GAMMA-9527.",
+        "query": "What is the secret code mentioned in the context?",
+        "expected": "ALPHA-DELTA-GAMMA-9527",
         "description": "Single Needle in a 200K-token haystack",
     },
     "s-niah-1m": {
         "total_chars": 4_000_000,
         "needle": "The hidden identifier is ZETA-OMEGA-42-PRIME.",
+        "query": "What is the hidden identifier mentioned in the context?",
+        "expected": "ZETA-OMEGA-42-PRIME",
         "description": "Single Needle in a 1M-token haystack",
     },
+    "s-niah-10m": {
+        "total_chars": 40_000_000,
+        "needle": "The vault passphrase is CRIMSON-HARBOR-8841.",
+        "query": "What is the vault passphrase mentioned in the context?",
+        "expected": "CRIMSON-HARBOR-8841",
+        "description": "Single Needle in a 10M-token haystack",
+        # Too large to keep on the heap; streamed to a memory-mapped file
+        "mapped": True,
+    },
 }
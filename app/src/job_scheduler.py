@@ -0,0 +1,131 @@
+"""Bounded benchmark job scheduler
+
+`benchmark_handler` used to start one thread per request, so a burst of
+submissions ran every context and root-model loop at once. `JobScheduler`
+queues jobs instead:
+
+- a fixed pool of worker threads runs at most `workers` jobs at a time
+- the queue is ordered by priority (higher first), then submission order
+- admission control: a job starts only while the estimated memory of running
+  jobs plus its own stays within the budget (a job larger than the whole
+  budget still runs, alone)
+- at most `max_queued` jobs wait; further submissions are rejected
+"""
+from __future__ import annotations
+
+import heapq
+import itertools
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List
+
+WORKERS = int(os.environ.get("BENCHMARK_WORKERS", "2"))
+MAX_QUEUED = int(os.environ.get("BENCHMARK_MAX_QUEUED", "32"))
+MEMORY_BUDGET_MB = int(os.environ.get("BENCHMARK_MEMORY_BUDGET_MB", "4096"))
+
+
+class QueueFull(RuntimeError):
+    """The scheduler already holds `max_queued` waiting jobs"""
+
+
+@dataclass(order=True)
+class Job:
+    sort_key: tuple
+    task_id: Any = field(compare=False)
+    run: Callable[[], None] = field(compare=False)
+    estimated_bytes: int = field(compare=False, default=0)
+    priority: int = field(compare=False, default=0)
+    submitted_at: float = field(compare=False, default_factory=time.time)
+    started_at: float | None = field(compare=False, default=None)
+
+
+class JobScheduler:
+    """Priority queue plus worker pool with memory-based admission control"""
+
+    def __init__(self, workers: int = WORKERS, max_queued: int = MAX_QUEUED,
+                 memory_budget_bytes: int = MEMORY_BUDGET_MB * 1024 * 1024):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.memory_budget_bytes = memory_budget_bytes
+        self._queue: List[Job] = []
+        self._running: Dict[Any, Job] = {}
+        self._running_bytes = 0
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+        self.completed = 0
+
+    def _ensure_workers(self) -> None:
+        while len(self._threads) < self.workers:
+            thread = threading.Thread(target=self._worker, name=f"benchmark-worker-{len(self._threads)}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+
+    def submit(self, task_id: Any, run: Callable[[], None], estimated_bytes: int = 0, priority: int = 0) -> Job:
+        """Queue a job; raises QueueFull when the queue is at capacity"""
+        with self._cond:
+            if len(self._queue) >= self.max_queued:
+                raise QueueFull(f"Benchmark queue is full ({self.max_queued} jobs waiting)")
+            job = Job((-priority, next(self._seq)), task_id, run, estimated_bytes, priority)
+            heapq.heappush(self._queue, job)
+            self._ensure_workers()
+            self._cond.notify_all()
+            return job
+
+    def _admissible(self, job: Job) -> bool:
+        if not self._running:
+            return True
+        return self._running_bytes + job.estimated_bytes <= self.memory_budget_bytes
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                # Strict queue order: the head waits for memory rather than being overtaken
+                while not self._queue or not self._admissible(self._queue[0]):
+                    self._cond.wait()
+                job = heapq.heappop(self._queue)
+                job.started_at = time.time()
+                self._running[job.task_id] = job
+                self._running_bytes += job.estimated_bytes
+            try:
+                job.run()
+            except Exception as exc:  # pylint: disable=broad-except
+                print(f"[Scheduler] Job {job.task_id} failed: {type(exc).__name__}: {exc}")
+            finally:
+                with self._cond:
+                    self._running.pop(job.task_id, None)
+                    self._running_bytes -= job.estimated_bytes
+                    self.completed += 1
+                    self._cond.notify_all()
+
+    def cancel(self, task_id: Any) -> bool:
+        """Drop a job that has not started yet"""
+        with self._cond:
+            for index, job in enumerate(self._queue):
+                if job.task_id == task_id:
+                    self._queue.pop(index)
+                    heapq.heapify(self._queue)
+                    self._cond.notify_all()
+                    return True
+        return False
+
+    def position(self, task_id: Any) -> int | None:
+        """1-based place in the queue, or None if the job is not waiting"""
+        with self._cond:
+            for place, job in enumerate(sorted(self._queue), 1):
+                if job.task_id == task_id:
+                    return place
+        return None
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "workers": self.workers,
+                "running": len(self._running),
+                "queued": len(self._queue),
+                "running_mb": round(self._running_bytes / 2**20, 1),
+                "memory_budget_mb": round(self.memory_budget_bytes / 2**20, 1),
+                "completed": self.completed,
+            }
@@ -0,0 +1,99 @@
+"""Per-entry access to large JSON array files
+
+`json.load` of a dataset file materializes every entry (CodeQA: every
+repository's full source) just to use one. `scan_entry_spans` finds the byte
+span of each top-level element with a single regex pass over the memory-mapped
+file (strings are skipped whole, so brackets inside them are ignored), and
+`JsonArrayEntries` parses only the element that is indexed. Peak memory scales
+with one entry, not the file.
+
+Elements must be objects or arrays; a file holding a single top-level object
+is treated as a one-entry array.
+"""
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+from array import array
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Iterator, Tuple
+
+# A complete string literal, or one structural bracket
+TOKEN_RE = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"|[\[\]{}]', re.S)
+OPEN_BRACKETS = (ord("["), ord("{"))
+CLOSE_BRACKETS = (ord("]"), ord("}"))
+
+
+def scan_entry_spans(buffer: Any) -> array:
+    """Flat array of (start, end) byte offsets of each top-level entry"""
+    spans = array("q")
+    depth = 0
+    entry_depth = 2
+    entry_start = 0
+    for match in TOKEN_RE.finditer(buffer):
+        char = buffer[match.start()]
+        if char in OPEN_BRACKETS:
+            depth += 1
+            if depth == 1 and char == ord("{"):
+                # Single top-level object: the whole document is the entry
+                entry_depth = 1
+            if depth == entry_depth:
+                entry_start = match.start()
+        elif char in CLOSE_BRACKETS:
+            if depth == entry_depth:
+                spans.extend((entry_start, match.end()))
+            depth -= 1
+    if depth != 0:
+        raise ValueError("Unbalanced JSON document")
+    return spans
+
+
+class JsonArrayEntries(Sequence):
+    """Read-only sequence over the entries of a JSON array file, parsed on access"""
+
+    def __init__(self, path: str | os.PathLike):
+        self.path = Path(path)
+        with self.path.open("rb") as handle:
+            # mmap cannot map an empty file
+            self._mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if os.fstat(handle.fileno()).st_size else b""
+        self._spans = scan_entry_spans(self._mm)
+
+    def __len__(self) -> int:
+        return len(self._spans) // 2
+
+    def span(self, index: int) -> Tuple[int, int]:
+        """(start, end) byte offsets of one entry"""
+        return self._spans[2 * index], self._spans[2 * index + 1]
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("JsonArrayEntries index out of range")
+        start, end = self.span(index)
+        return json.loads(self._mm[start:end])
+
+    def __iter__(self) -> Iterator[Any]:
+        for index in range(len(self)):
+            yield self[index]
+
+    def close(self) -> None:
+        if isinstance(self._mm, mmap.mmap):
+            self._mm.close()
+
+    def __repr__(self) -> str:
+        return f"JsonArrayEntries({str(self.path)!r}, {len(self)} entries)"
+
+
+def iter_json_entries(path: str | os.PathLike) -> Iterator[Any]:
+    """Parse the entries of a JSON array file one at a time"""
+    entries = JsonArrayEntries(path)
+    try:
+        yield from entries
+    finally:
+        entries.close()
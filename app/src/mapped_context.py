@@ -0,0 +1,263 @@
+"""Memory-mapped, zero-copy context types for very large haystacks
+
+A `str` or `list[str]` context keeps the whole haystack on the Python heap, and
+every `str(value)` made while describing it adds another copy. These types keep
+the text in a file mapped with mmap, so the page cache holds a single copy and
+the REPL only materializes the slices it actually reads.
+
+Offsets are byte offsets into the UTF-8 file. For ASCII content (the synthetic
+haystacks, TREC) they are identical to character offsets; for other text a slice
+that splits a multi-byte character decodes it as U+FFFD.
+"""
+from __future__ import annotations
+
+import mmap
+import os
+import tempfile
+import weakref
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any, Iterable, Iterator, List
+
+SPILL_DIR = Path(os.environ.get(
+    "CONTEXT_SPILL_DIR",
+    os.path.join(os.environ.get("DATASET_CACHE_DIR", "/tmp/rlm_datasets"), "contexts"),
+))
+ENCODING = "utf-8"
+
+
+class _MappedFile:
+    """Shared read-only mapping of one file; unlinks it on close when `delete` is set"""
+
+    def __init__(self, path: Path, delete: bool = False):
+        self.path = Path(path)
+        self.size = self.path.stat().st_size
+        with self.path.open("rb") as handle:
+            # mmap cannot map an empty file
+            self.mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if self.size else b""
+        self._finalizer = weakref.finalize(self, _MappedFile._release, self.mm, str(self.path), delete)
+
+    @staticmethod
+    def _release(mm: Any, path: str, delete: bool) -> None:
+        if isinstance(mm, mmap.mmap):
+            mm.close()
+        if delete:
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+
+    def close(self) -> None:
+        self._finalizer()
+
+
+def _spill_path(suffix: str) -> Path:
+    SPILL_DIR.mkdir(parents=True, exist_ok=True)
+    fd, name = tempfile.mkstemp(prefix="ctx-", suffix=suffix, dir=SPILL_DIR)
+    os.close(fd)
+    return Path(name)
+
+
+class MappedText:
+    """Read-only, str-like view over a byte range of a memory-mapped file.
+
+    Supports `len()`, indexing and slicing (returning `str`), `find`/`rfind`/
+    `count`, `in`, and `iter_chunks()` without copying the whole text. Any other
+    `str` method falls back to materializing the view.
+    """
+
+    def __init__(self, path: str | os.PathLike, start: int = 0, end: int | None = None,
+                 *, delete: bool = False, _file: _MappedFile | None = None):
+        self._file = _file or _MappedFile(Path(path), delete=delete)
+        size = self._file.size
+        self._start = max(0, min(start, size))
+        self._end = size if end is None else max(self._start, min(end, size))
+
+    @classmethod
+    def from_text(cls, text: str, path: str | os.PathLike | None = None) -> "MappedText":
+        """Write `text` to disk (a temporary spill file by default) and map it"""
+        delete = path is None
+        target = _spill_path(".txt") if path is None else Path(path)
+        target.write_bytes(text.encode(ENCODING))
+        return cls(target, delete=delete)
+
+    @property
+    def path(self) -> Path:
+        return self._file.path
+
+    @property
+    def offsets(self) -> tuple[int, int]:
+        """(start, end) byte range of this view inside the mapped file"""
+        return self._start, self._end
+
+    def view(self, start: int = 0, end: int | None = None) -> "MappedText":
+        """Zero-copy sub-view; `start`/`end` are relative to this view"""
+        lo, hi, _ = slice(start, end).indices(len(self))
+        return MappedText(self.path, self._start + lo, self._start + max(lo, hi), _file=self._file)
+
+    def _decode(self, lo: int, hi: int) -> str:
+        return bytes(self._file.mm[self._start + lo:self._start + hi]).decode(ENCODING, errors="replace")
+
+    def __len__(self) -> int:
+        return self._end - self._start
+
+    def __getitem__(self, key: int | slice) -> str:
+        if isinstance(key, slice):
+            lo, hi, step = key.indices(len(self))
+            if step == 1:
+                return self._decode(lo, max(lo, hi))
+            return str(self)[key]
+        index = key + len(self) if key < 0 else key
+        if not 0 <= index < len(self):
+            raise IndexError("MappedText index out of range")
+        return self._decode(index, index + 1)
+
+    def _bounds(self, start: int | None, end: int | None) -> tuple[int, int]:
+        lo, hi, _ = slice(start, end).indices(len(self))
+        return self._start + lo, self._start + max(lo, hi)
+
+    def find(self, sub: str, start: int | None = None, end: int | None = None) -> int:
+        lo, hi = self._bounds(start, end)
+        found = self._file.mm.find(sub.encode(ENCODING), lo, hi)
+        return found - self._start if found >= 0 else -1
+
+    def rfind(self, sub: str, start: int | None = None, end: int | None = None) -> int:
+        lo, hi = self._bounds(start, end)
+        found = self._file.mm.rfind(sub.encode(ENCODING), lo, hi)
+        return found - self._start if found >= 0 else -1
+
+    def index(self, sub: str, start: int | None = None, end: int | None = None) -> int:
+        found = self.find(sub, start, end)
+        if found < 0:
+            raise ValueError("substring not found")
+        return found
+
+    def count(self, sub: str, start: int | None = None, end: int | None = None) -> int:
+        needle = sub.encode(ENCODING)
+        lo, hi = self._bounds(start, end)
+        if not needle:
+            return hi - lo + 1
+        total = 0
+        pos = self._file.mm.find(needle, lo, hi)
+        while pos >= 0:
+            total += 1
+            pos = self._file.mm.find(needle, pos + len(needle), hi)
+        return total
+
+    def iter_chunks(self, size: int = 1_000_000) -> Iterator[str]:
+        """Yield consecutive decoded chunks of at most `size` characters"""
+        for lo in range(0, len(self), size):
+            yield self._decode(lo, min(lo + size, len(self)))
+
+    def __contains__(self, sub: object) -> bool:
+        return isinstance(sub, str) and self.find(sub) >= 0
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def __str__(self) -> str:
+        return self._decode(0, len(self))
+
+    def __repr__(self) -> str:
+        return f"MappedText({str(self.path)!r}, {len(self):,} chars)"
+
+    def __format__(self, spec: str) -> str:
+        return format(str(self), spec)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, MappedText):
+            other = str(other)
+        return str(self) == other if isinstance(other, str) else NotImplemented
+
+    def __hash__(self) -> int:
+        return hash(str(self))
+
+    def __add__(self, other: str) -> str:
+        return str(self) + str(other)
+
+    def __radd__(self, other: str) -> str:
+        return str(other) + str(self)
+
+    def __getattr__(self, name: str) -> Any:
+        # Remaining str API (split, lower, splitlines, ...) works on a materialized copy
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return getattr(str(self), name)
+
+
+class MappedChunks(Sequence):
+    """Sequence of text chunks stored back to back in one memory-mapped file.
+
+    Indexing returns a decoded `str` for that chunk only; `view(i)` returns a
+    zero-copy `MappedText`. Chunk lengths are known without decoding anything.
+    """
+
+    def __init__(self, path: str | os.PathLike, offsets: List[int], char_lengths: List[int] | None = None,
+                 *, delete: bool = False):
+        self._file = _MappedFile(Path(path), delete=delete)
+        self._offsets = list(offsets)
+        self._char_lengths = list(char_lengths) if char_lengths is not None else [
+            hi - lo for lo, hi in zip(self._offsets, self._offsets[1:])
+        ]
+
+    @classmethod
+    def write(cls, chunks: Iterable[str], path: str | os.PathLike | None = None) -> "MappedChunks":
+        """Stream chunks to disk (a temporary spill file by default) and map them"""
+        delete = path is None
+        target = _spill_path(".chunks") if path is None else Path(path)
+        offsets = [0]
+        char_lengths: List[int] = []
+        with target.open("wb") as handle:
+            for chunk in chunks:
+                data = chunk.encode(ENCODING)
+                handle.write(data)
+                offsets.append(offsets[-1] + len(data))
+                char_lengths.append(len(chunk))
+        return cls(target, offsets, char_lengths, delete=delete)
+
+    @property
+    def path(self) -> Path:
+        return self._file.path
+
+    @property
+    def offsets(self) -> List[int]:
+        return list(self._offsets)
+
+    def chunk_lengths(self) -> List[int]:
+        """Character length of every chunk, without decoding"""
+        return list(self._char_lengths)
+
+    def view(self, index: int) -> MappedText:
+        """Zero-copy view of one chunk"""
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("MappedChunks index out of range")
+        return MappedText(self.path, self._offsets[index], self._offsets[index + 1], _file=self._file)
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        return str(self.view(index))
+
+    def __repr__(self) -> str:
+        return f"MappedChunks({str(self.path)!r}, {len(self)} chunks, {sum(self._char_lengths):,} chars)"
+
+
+def is_mapped(context: Any) -> bool:
+    return isinstance(context, (MappedText, MappedChunks))
+
+
+def map_context(context: Any) -> Any:
+    """Spill a `str` or sequence-of-`str` context to a mapped file; other values pass through"""
+    if is_mapped(context):
+        return context
+    if isinstance(context, str):
+        return MappedText.from_text(context)
+    if isinstance(context, Sequence) and all(isinstance(item, str) for item in context):
+        return MappedChunks.write(context)
+    return context
@@ -0,0 +1,81 @@
+"""Peak resident memory of the process during a benchmark run
+
+`ru_maxrss` is a high-water mark for the whole process lifetime, so it cannot
+attribute memory to one run. `PeakMemory` samples the current RSS from /proc in
+a background thread while the run is in progress and reports the peak and the
+growth over the starting RSS. Concurrent runs in the same process share these
+numbers.
+"""
+from __future__ import annotations
+
+import resource
+import sys
+import threading
+from typing import Any, Dict
+
+SAMPLE_INTERVAL = 0.05
+
+
+def current_rss_bytes() -> int | None:
+    """Resident set size of this process (Linux)"""
+    try:
+        with open("/proc/self/status", "r", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def max_rss_bytes() -> int:
+    """Lifetime peak RSS of this process"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class PeakMemory:
+    """Context manager that tracks peak RSS while its block runs"""
+
+    def __init__(self, interval: float = SAMPLE_INTERVAL):
+        self.interval = interval
+        self.start_bytes = 0
+        self.peak_bytes = 0
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def _sample(self) -> None:
+        rss = current_rss_bytes()
+        if rss is not None and rss > self.peak_bytes:
+            self.peak_bytes = rss
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self._sample()
+
+    def __enter__(self) -> "PeakMemory":
+        rss = current_rss_bytes()
+        if rss is None:
+            # No /proc: fall back to the process-lifetime peak
+            self.start_bytes = self.peak_bytes = max_rss_bytes()
+            return self
+        self.start_bytes = self.peak_bytes = rss
+        self._thread = threading.Thread(target=self._run, name="peak-memory", daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._sample()
+        else:
+            self.peak_bytes = max_rss_bytes()
+
+    def snapshot(self) -> Dict[str, float]:
+        return {
+            "start_rss_mb": round(self.start_bytes / 2**20, 1),
+            "peak_rss_mb": round(self.peak_bytes / 2**20, 1),
+            "peak_growth_mb": round(max(0, self.peak_bytes - self.start_bytes) / 2**20, 1),
+        }
@@ -0,0 +1,97 @@
+"""Process-wide pools of Bedrock models and sub-call agents
+
+Building a BedrockModel creates a boto client (credential resolution, TLS
+setup); building a Strands Agent per sub-call repeats tool registry and
+metrics setup. Both are reused here across sub-calls and benchmark runs.
+"""
+from __future__ import annotations
+
+import os
+import queue
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Tuple
+
+from botocore.config import Config as BotocoreConfig
+from strands import Agent
+from strands.models import BedrockModel
+from strands.telemetry.metrics import EventLoopMetrics
+
+# Concurrent sub-calls per sub-model; also sizes the boto connection pool
+SUB_CALL_POOL_SIZE = int(os.environ.get("SUB_CALL_POOL_SIZE", "16"))
+
+_models: Dict[Tuple[str, int, int], BedrockModel] = {}
+_executors: Dict[Tuple[str, int, int], "SubCallExecutor"] = {}
+_lock = threading.Lock()
+
+
+def get_bedrock_model(model_id: str, max_pool_connections: int = 10, max_retries: int = 3) -> BedrockModel:
+    """Shared BedrockModel whose boto client keeps up to `max_pool_connections` sockets"""
+    key = (model_id, max_pool_connections, max_retries)
+    with _lock:
+        model = _models.get(key)
+        if model is None:
+            boto_config = BotocoreConfig(
+                retries={"max_attempts": max_retries, "mode": "standard"},
+                connect_timeout=10,
+                read_timeout=300,
+                max_pool_connections=max_pool_connections,
+            )
+            model = BedrockModel(model_id=model_id, boto_client_config=boto_config)
+            _models[key] = model
+        return model
+
+
+class SubCallExecutor:
+    """Bounded pool of stateless Strands agents sharing one BedrockModel.
+
+    Strands agents are not re-entrant, so each concurrent call checks out its
+    own agent; conversation history and metrics are cleared between calls.
+    """
+
+    def __init__(self, model: BedrockModel, pool_size: int = SUB_CALL_POOL_SIZE):
+        self.model = model
+        self.pool_size = max(1, pool_size)
+        self._idle: "queue.LifoQueue[Agent]" = queue.LifoQueue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _checkout(self) -> Iterator[Agent]:
+        agent = None
+        try:
+            agent = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                if self._created < self.pool_size:
+                    self._created += 1
+                    agent = Agent(model=self.model, callback_handler=None)
+            if agent is None:
+                agent = self._idle.get()
+        try:
+            agent.messages = []
+            agent.event_loop_metrics = EventLoopMetrics()
+            yield agent
+        finally:
+            self._idle.put(agent)
+
+    def invoke(self, prompt: str) -> Any:
+        """Run one stateless sub-call and return the Strands AgentResult"""
+        with self._checkout() as agent:
+            return agent(prompt)
+
+
+def get_sub_call_executor(
+    model_id: str,
+    pool_size: int = SUB_CALL_POOL_SIZE,
+    max_retries: int = 3,
+) -> SubCallExecutor:
+    """Shared executor for a sub-model, sized for `pool_size` concurrent calls"""
+    key = (model_id, pool_size, max_retries)
+    model = get_bedrock_model(model_id, max_pool_connections=pool_size, max_retries=max_retries)
+    with _lock:
+        executor = _executors.get(key)
+        if executor is None:
+            executor = SubCallExecutor(model, pool_size)
+            _executors[key] = executor
+        return executor
@@ -0,0 +1,87 @@
+"""Bounded progress event log for running benchmarks"""
+from __future__ import annotations
+
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Deque, Dict, List
+
+# Events kept per run; older events are dropped but still counted
+DEFAULT_MAX_EVENTS = 200
+# Longest text kept in a single event (REPL output, coalesced root tokens)
+MAX_EVENT_TEXT = 2_000
+
+
+class ProgressLog:
+    """Thread-safe ring buffer of RLM events with running counters.
+
+    Consecutive `root_token` events are coalesced into one `root_text` event so
+    token streaming does not flush the tool and sub-call events out of the buffer.
+    Once a snapshot has handed out the last event, further tokens start a new
+    `root_text` event, so clients polling with `since` never miss appended text.
+    `on_append` is called (outside the lock) whenever a new event is stored,
+    e.g. to wake long-polling status checks; tokens merged into an existing
+    event do not call it.
+    """
+
+    def __init__(self, max_events: int = DEFAULT_MAX_EVENTS, on_append: Callable[[], None] | None = None):
+        self._events: Deque[Dict[str, Any]] = deque(maxlen=max_events)
+        self._lock = threading.Lock()
+        self._seq = 0
+        # Highest seq returned by a snapshot; events up to it are no longer extended
+        self._observed_seq = 0
+        self._on_append = on_append
+        self.started_at = time.time()
+        self.counters: Dict[str, int] = {}
+
+    def __call__(self, event: Dict[str, Any]) -> None:
+        self.append(event)
+
+    def append(self, event: Dict[str, Any]) -> None:
+        if self._append(event) and self._on_append is not None:
+            self._on_append()
+
+    def _append(self, event: Dict[str, Any]) -> bool:
+        """Store an event; False if it was merged into the last one without a new seq"""
+        kind = event.get("type", "event")
+        with self._lock:
+            self.counters[kind] = self.counters.get(kind, 0) + 1
+            if kind == "root_token":
+                last = self._events[-1] if self._events else None
+                if (
+                    last is not None
+                    and last["type"] == "root_text"
+                    and last["seq"] > self._observed_seq
+                    and len(last["text"]) < MAX_EVENT_TEXT
+                ):
+                    last["text"] += event.get("text", "")
+                    last["t"] = event.get("t", time.time())
+                    return False
+                event = {**event, "type": "root_text"}
+            self._seq += 1
+            stored = {"seq": self._seq, **event}
+            for key, value in stored.items():
+                if isinstance(value, str) and len(value) > MAX_EVENT_TEXT:
+                    stored[key] = value[:MAX_EVENT_TEXT] + f"... [{len(value) - MAX_EVENT_TEXT:,} chars truncated]"
+            self._events.append(stored)
+            return True
+
+    @property
+    def last_seq(self) -> int:
+        with self._lock:
+            return self._seq
+
+    def snapshot(self, since: int = 0, limit: int | None = None) -> Dict[str, Any]:
+        """JSON-serializable progress view with events newer than `since`"""
+        with self._lock:
+            events: List[Dict[str, Any]] = [dict(e) for e in self._events if e["seq"] > since]
+            last_seq = self._observed_seq = self._seq
+            counters = dict(self.counters)
+        if limit is not None:
+            events = events[-limit:]
+        return {
+            "elapsed_seconds": round(time.time() - self.started_at, 1),
+            "last_seq": last_seq,
+            "counters": counters,
+            "events": events,
+        }
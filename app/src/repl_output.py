@@ -0,0 +1,175 @@
+"""Bounded stdout capture for REPL executions
+
+`BoundedOutput` is a write-only text sink that keeps just the tail of what the
+code prints (last N lines, at most M characters) while it runs, and counts
+everything it dropped so the model can be told what it missed. A single huge
+print is trimmed to its tail before being split, so an accidental
+`print(context)` costs one bounded copy rather than several full ones.
+
+`capture_stdout()` routes `print()` from the current thread only, so concurrent
+runs (and the handler's own logging) do not leak into each other's output.
+Threads started by the executed code have no sink of their own; `repl_print()`
+is installed as `print` in the REPL globals so their prints still reach the
+run's output instead of the container's stdout.
+"""
+from __future__ import annotations
+
+import builtins
+import io
+import os
+import sys
+import threading
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterator
+
+MAX_LINES = int(os.environ.get("REPL_OUTPUT_MAX_LINES", "100"))
+MAX_CHARS = int(os.environ.get("REPL_OUTPUT_MAX_CHARS", "50000"))
+
+
+class BoundedOutput(io.TextIOBase):
+    """Ring buffer of the last `max_lines` lines / `max_chars` characters written"""
+
+    def __init__(self, max_lines: int = MAX_LINES, max_chars: int = MAX_CHARS):
+        super().__init__()
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self._lines: Deque[str] = deque()
+        self._kept_chars = 0
+        self._partial = ""
+        self.total_chars = 0
+        self.total_lines = 0
+        # Threads started by the REPL code may print concurrently
+        self._lock = threading.Lock()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        size = len(text)
+        if not size:
+            return 0
+        with self._lock:
+            self.total_chars += size
+            self.total_lines += text.count("\n")
+            if size >= self.max_chars:
+                # The tail alone fills the budget (one char is left for its newline),
+                # so everything before it is dropped unseen
+                self._lines.clear()
+                self._kept_chars = 0
+                self._partial = ""
+                text = text[size - self.max_chars + 1:]
+            pieces = text.split("\n")
+            self._partial += pieces[0]
+            for piece in pieces[1:]:
+                self._push(self._partial)
+                self._partial = piece
+            if len(self._partial) >= self.max_chars:
+                self._partial = self._partial[len(self._partial) - self.max_chars + 1:]
+            self._trim()
+        return size
+
+    def _push(self, line: str) -> None:
+        self._lines.append(line)
+        self._kept_chars += len(line) + 1
+
+    def _trim(self) -> None:
+        budget = self.max_chars - len(self._partial)
+        max_lines = self.max_lines - (1 if self._partial else 0)
+        while self._lines and (len(self._lines) > max_lines or self._kept_chars > budget):
+            if len(self._lines) == 1 and max_lines >= 1 and budget > 1:
+                # Never drop the newest line outright: keep as much of its tail as fits
+                line = self._lines.pop()
+                self._kept_chars = 0
+                self._push(line[-(budget - 1):])
+                return
+            self._kept_chars -= len(self._lines.popleft()) + 1
+
+    @property
+    def kept_chars(self) -> int:
+        return self._kept_chars + len(self._partial)
+
+    @property
+    def truncated(self) -> bool:
+        return self.kept_chars < self.total_chars
+
+    def getvalue(self) -> str:
+        """Retained tail of the output"""
+        with self._lock:
+            text = "\n".join(self._lines)
+            if self._lines:
+                text += "\n"
+            return text + self._partial
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "total_chars": self.total_chars,
+            "total_lines": self.total_lines + (1 if self._partial else 0),
+            "kept_chars": self.kept_chars,
+            "truncated": self.truncated,
+        }
+
+    def render(self) -> str:
+        """Retained output, prefixed with a note on what was dropped"""
+        text = self.getvalue().rstrip()
+        if not self.truncated:
+            return text
+        kept_lines = len(text.splitlines())
+        stats = self.stats()
+        note = (
+            f"[Output truncated: showing the last {kept_lines:,} lines ({stats['kept_chars']:,} chars) "
+            f"of {stats['total_lines']:,} lines / {stats['total_chars']:,} chars printed. "
+            "Print less, or slice and summarize the data to see the rest.]"
+        )
+        return f"{note}\n{text}"
+
+
+class _StdoutRouter(io.TextIOBase):
+    """sys.stdout replacement that sends each thread's writes to its registered sink"""
+
+    def __init__(self, default: Any):
+        super().__init__()
+        self.default = default
+        self.sinks: Dict[int, Any] = {}
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, text: str) -> int:
+        return self.sinks.get(threading.get_ident(), self.default).write(text)
+
+    def flush(self) -> None:
+        sink = self.sinks.get(threading.get_ident(), self.default)
+        if hasattr(sink, "flush"):
+            sink.flush()
+
+
+_router_lock = threading.Lock()
+
+
+@contextmanager
+def capture_stdout(sink: Any) -> Iterator[Any]:
+    """Redirect print() output of the calling thread to `sink`"""
+    with _router_lock:
+        router = sys.stdout
+        if not isinstance(router, _StdoutRouter):
+            router = sys.stdout = _StdoutRouter(sys.stdout)
+    ident = threading.get_ident()
+    previous = router.sinks.get(ident)
+    router.sinks[ident] = sink
+    try:
+        yield sink
+    finally:
+        if previous is None:
+            router.sinks.pop(ident, None)
+        else:
+            router.sinks[ident] = previous
+
+
+def repl_print(active_sink: Callable[[], Any]) -> Callable[..., None]:
+    """print() for REPL globals that writes to `active_sink()` from any thread (stdout when it returns None)"""
+    def _print(*values: Any, sep: str | None = " ", end: str | None = "\n", file: Any = None, flush: bool = False) -> None:
+        if file is None:
+            file = active_sink() or sys.stdout
+        builtins.print(*values, sep=sep, end=end, file=file, flush=flush)
+    return _print
@@ -0,0 +1,299 @@
+"""Out-of-process REPL for RLM code execution
+
+`exec()` of model-written code inside the agent thread means one infinite loop
+or runaway allocation stalls or OOMs the whole container. `ReplWorker` runs the
+REPL in a child process instead:
+
+- the context is handed over once, as a memory-mapped file (str and list[str]
+  contexts) or a single pickle (anything else), never per execution
+- each execution has a wall-clock timeout and an anonymous-RSS cap; breaching
+  either kills the worker and starts a fresh one (REPL state is lost). The
+  child's data segment is also limited (RLIMIT_DATA), so one huge allocation
+  fails with a MemoryError instead of growing past the cap between samples
+- `llm_query` / `llm_query_batch` inside the child are proxied to the parent,
+  which owns the Bedrock clients and the sub-call budget
+
+The child is a plain `python -m` run of this module over a socketpair, not a
+multiprocessing spawn, which would re-import the agent's `__main__` (strands,
+boto3) in every worker. This module must stay free of strands/boto.
+"""
+from __future__ import annotations
+
+import itertools
+import os
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+from multiprocessing.connection import Connection
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+try:
+    from src.context_index import ContextIndex
+    from src.mapped_context import MappedChunks, MappedText, map_context
+    from src.repl_output import BoundedOutput, capture_stdout, repl_print
+except ImportError:
+    from context_index import ContextIndex
+    from mapped_context import MappedChunks, MappedText, map_context
+    from repl_output import BoundedOutput, capture_stdout, repl_print
+
+DEFAULT_TIMEOUT = float(os.environ.get("REPL_TIMEOUT_SECONDS", "120"))
+DEFAULT_MAX_MEMORY_MB = int(os.environ.get("REPL_MAX_MEMORY_MB", "2048"))
+# How often the parent samples the worker's memory while code runs
+POLL_INTERVAL = 0.1
+
+
+def _context_spec(context: Any) -> Tuple[Any, Tuple[Any, ...]]:
+    """(object to keep alive in the parent, picklable description for the child)"""
+    mapped = map_context(context)
+    if isinstance(mapped, MappedText):
+        start, end = mapped.offsets
+        return mapped, ("text", str(mapped.path), start, end)
+    if isinstance(mapped, MappedChunks):
+        return mapped, ("chunks", str(mapped.path), mapped.offsets, mapped.chunk_lengths())
+    return None, ("object", context)
+
+
+def _load_context(spec: Tuple[Any, ...]) -> Any:
+    kind = spec[0]
+    if kind == "text":
+        _, path, start, end = spec
+        return MappedText(path, start, end)
+    if kind == "chunks":
+        _, path, offsets, char_lengths = spec
+        return MappedChunks(path, offsets, char_lengths)
+    return spec[1]
+
+
+def _anon_rss_bytes(pid: int) -> int | None:
+    """Anonymous resident memory of a process (Linux); file-backed mmap pages of the context are excluded"""
+    try:
+        with open(f"/proc/{pid}/status", "r", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("RssAnon:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+# ----------------------------------------------------------------------------
+# Child process
+# ----------------------------------------------------------------------------
+
+def _limit_memory(max_memory_bytes: int | None) -> None:
+    """Cap the data segment so oversized allocations raise MemoryError in the REPL code"""
+    if not max_memory_bytes:
+        return
+    _, hard = resource.getrlimit(resource.RLIMIT_DATA)
+    if hard != resource.RLIM_INFINITY:
+        max_memory_bytes = min(max_memory_bytes, hard)
+    resource.setrlimit(resource.RLIMIT_DATA, (max_memory_bytes, hard))
+
+
+def _worker_main(conn: Connection, spec: Tuple[Any, ...], build_index: bool, max_memory_bytes: int | None) -> None:
+    _limit_memory(max_memory_bytes)
+    context = _load_context(spec)
+    request_ids = itertools.count(1)
+    request_lock = threading.Lock()
+    active: Dict[str, BoundedOutput | None] = {"output": None}
+
+    def _request(kind: str, *args: Any) -> Any:
+        # One outstanding proxy request at a time, even if model code uses threads
+        with request_lock:
+            request_id = next(request_ids)
+            conn.send((kind, request_id, *args))
+            reply_kind, reply_id, value = conn.recv()
+            if reply_kind != "llm_result" or reply_id != request_id:
+                raise RuntimeError(f"Unexpected reply from parent: {reply_kind}")
+            return value
+
+    def llm_query(prompt: str) -> str:
+        return _request("llm_query", str(prompt))
+
+    def llm_query_batch(prompts: Sequence[str], max_concurrency: int | None = None) -> List[str]:
+        return _request("llm_query_batch", [str(p) for p in prompts], max_concurrency)
+
+    repl_globals: Dict[str, Any] = {
+        "__builtins__": __builtins__,
+        "context": context,
+        "llm_query": llm_query,
+        "llm_query_batch": llm_query_batch,
+        "print": repl_print(lambda: active["output"]),
+    }
+    if build_index:
+        repl_globals["ctx_index"] = ContextIndex(context)
+    conn.send(("ready",))
+
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            return
+        if message[0] == "close":
+            return
+        if message[0] != "exec":
+            continue
+        output = active["output"] = BoundedOutput()
+        error = None
+        try:
+            with capture_stdout(output):
+                exec(message[1], repl_globals)
+        except MemoryError:
+            error = "MemoryError: REPL worker memory limit reached"
+        except Exception as exc:  # pylint: disable=broad-except
+            error = f"{type(exc).__name__}: {exc}"
+        finally:
+            active["output"] = None
+        conn.send(("done", output.render(), output.stats(), error))
+
+
+# ----------------------------------------------------------------------------
+# Parent side
+# ----------------------------------------------------------------------------
+
+class WorkerFailure(RuntimeError):
+    """The worker was killed (timeout, memory cap, crash); its REPL state is gone"""
+
+
+class ReplWorker:
+    """Parent-side handle to a sandboxed REPL process"""
+
+    def __init__(
+        self,
+        context: Any,
+        llm_query: Callable[[str], str],
+        llm_query_batch: Callable[[Sequence[str], int | None], List[str]],
+        timeout: float = DEFAULT_TIMEOUT,
+        max_memory_mb: int | None = DEFAULT_MAX_MEMORY_MB,
+        build_index: bool = False,
+        cancelled: threading.Event | None = None,
+    ):
+        self._llm_query = llm_query
+        self._llm_query_batch = llm_query_batch
+        self.timeout = timeout
+        self.max_memory_bytes = max_memory_mb * 1024 * 1024 if max_memory_mb else None
+        self.build_index = build_index
+        self._cancelled = cancelled or threading.Event()
+        # Keeps the spill file mapped (and undeleted) while workers use it
+        self._mapped, self._spec = _context_spec(context)
+        self.restarts = 0
+        self._process: subprocess.Popen | None = None
+        self._conn: Connection | None = None
+        self._start()
+
+    def _start(self) -> None:
+        parent_sock, child_sock = socket.socketpair()
+        try:
+            process = subprocess.Popen(
+                [sys.executable, "-m", __spec__.name, str(child_sock.fileno())],
+                pass_fds=(child_sock.fileno(),),
+                stdin=subprocess.DEVNULL,
+                # The child resolves `src.` / flat imports the same way this process did
+                env={**os.environ, "PYTHONPATH": os.pathsep.join(path for path in sys.path if path)},
+            )
+        finally:
+            child_sock.close()
+        parent_conn = Connection(parent_sock.detach())
+        self._process, self._conn = process, parent_conn
+        # Context loading and index building happen before the first execution
+        try:
+            parent_conn.send((self._spec, self.build_index, self.max_memory_bytes))
+            if not parent_conn.poll(max(self.timeout, 60)):
+                raise EOFError
+            parent_conn.recv()
+        except (EOFError, OSError):
+            self._kill()
+            raise WorkerFailure("REPL worker did not start") from None
+
+    def _kill(self) -> None:
+        if self._process is not None and self._process.poll() is None:
+            self._process.kill()
+            self._wait(5)
+        if self._conn is not None:
+            self._conn.close()
+        self._process, self._conn = None, None
+
+    def _wait(self, timeout: float) -> None:
+        try:
+            self._process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            pass
+
+    def _restart(self, reason: str) -> WorkerFailure:
+        self._kill()
+        self.restarts += 1
+        self._start()
+        return WorkerFailure(f"{reason}; the REPL was restarted and earlier variables are lost")
+
+    def execute(self, code: str) -> Tuple[str, Dict[str, Any], str | None]:
+        """Run code in the worker; returns (stdout, output stats, error) or raises WorkerFailure"""
+        if self._conn is None:
+            self._start()
+        conn, process = self._conn, self._process
+        conn.send(("exec", code))
+        # Time spent serving sub-calls for the child does not count against the timeout
+        budget = self.timeout
+        while True:
+            waited = time.monotonic()
+            ready = conn.poll(POLL_INTERVAL)
+            budget -= time.monotonic() - waited
+            if self._cancelled.is_set():
+                self._kill()
+                raise WorkerFailure("Run cancelled")
+            if not ready:
+                if process.poll() is not None:
+                    raise self._restart(f"REPL worker crashed (exit code {process.returncode})")
+                if budget <= 0:
+                    raise self._restart(f"Execution timed out after {self.timeout:g}s")
+                rss = _anon_rss_bytes(process.pid) if self.max_memory_bytes else None
+                if rss is not None and rss > self.max_memory_bytes:
+                    raise self._restart(
+                        f"REPL worker exceeded its memory cap ({rss // 2**20:,} MB > {self.max_memory_bytes // 2**20:,} MB)"
+                    )
+                continue
+            try:
+                message = conn.recv()
+            except (EOFError, OSError):
+                raise self._restart(f"REPL worker crashed (exit code {process.poll()})") from None
+            kind = message[0]
+            if kind == "done":
+                return message[1], message[2], message[3]
+            if kind == "llm_query":
+                _, request_id, prompt = message
+                conn.send(("llm_result", request_id, self._serve(self._llm_query, prompt)))
+            elif kind == "llm_query_batch":
+                _, request_id, prompts, max_concurrency = message
+                conn.send(("llm_result", request_id, self._serve(self._llm_query_batch, prompts, max_concurrency)))
+
+    @staticmethod
+    def _serve(func: Callable[..., Any], *args: Any) -> Any:
+        try:
+            return func(*args)
+        except Exception as exc:  # pylint: disable=broad-except
+            return f"Error: {type(exc).__name__}: {exc}"
+
+    def close(self) -> None:
+        if self._conn is not None:
+            try:
+                self._conn.send(("close",))
+            except (OSError, BrokenPipeError):
+                pass
+            if self._process is not None:
+                self._wait(2)
+        self._kill()
+        self._mapped = None
+
+    def __enter__(self) -> "ReplWorker":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+
+if __name__ == "__main__":
+    # Worker process started by ReplWorker._start: argv[1] is its end of the socketpair
+    _conn = Connection(int(sys.argv[1]))
+    _worker_main(_conn, *_conn.recv())
@@ -0,0 +1,161 @@
+"""Content-addressed cache for sub-model responses
+
+Two tiers: a bounded in-memory LRU in front of an optional SQLite store under
+DATASET_CACHE_DIR. Entries are keyed on (model_id, prompt hash, inference
+params), so byte-identical prompts from reruns are served without a Bedrock call.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Mapping
+
+CACHE_DIR = Path(os.environ.get("RESPONSE_CACHE_DIR", os.environ.get("DATASET_CACHE_DIR", "/tmp/rlm_datasets")))
+# "off" (default), "memory" or "disk"; a payload can still opt in per run
+CACHE_MODE = os.environ.get("RESPONSE_CACHE", "off").lower()
+MEMORY_MAX_ENTRIES = int(os.environ.get("RESPONSE_CACHE_MEMORY_ENTRIES", "2048"))
+MEMORY_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_MEMORY_BYTES", str(64 * 1024 * 1024)))
+DISK_MAX_BYTES = int(os.environ.get("RESPONSE_CACHE_DISK_BYTES", str(1024 * 1024 * 1024)))
+
+
+def cache_key(model_id: str, prompt: str, params: Mapping[str, Any] | None = None) -> str:
+    """Stable key for a sub-model request"""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8", "surrogatepass")).hexdigest()
+    material = json.dumps(
+        {"model": model_id, "prompt": prompt_hash, "params": dict(params or {})},
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Thread-safe two-tier (memory LRU + SQLite) response cache"""
+
+    def __init__(
+        self,
+        memory_max_entries: int = MEMORY_MAX_ENTRIES,
+        memory_max_bytes: int = MEMORY_MAX_BYTES,
+        disk_path: Path | None = None,
+        disk_max_bytes: int = DISK_MAX_BYTES,
+    ):
+        self.memory_max_entries = memory_max_entries
+        self.memory_max_bytes = memory_max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: OrderedDict[str, str] = OrderedDict()
+        self._memory_bytes = 0
+        self._lock = threading.Lock()
+        self.stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "writes": 0, "evictions": 0}
+
+        self._db: sqlite3.Connection | None = None
+        self._disk_bytes = 0
+        if disk_path is not None:
+            disk_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(disk_path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, size INTEGER NOT NULL, accessed REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses(accessed)")
+            self._disk_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            value = self._memory.get(key)
+            if value is not None:
+                self._memory.move_to_end(key)
+                self.stats["memory_hits"] += 1
+                return value
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (time.time(), key))
+                    self.stats["disk_hits"] += 1
+                    self._remember(key, row[0])
+                    return row[0]
+            self.stats["misses"] += 1
+            return None
+
+    def put(self, key: str, value: str) -> None:
+        with self._lock:
+            self.stats["writes"] += 1
+            self._remember(key, value)
+            if self._db is None:
+                return
+            size = len(value.encode("utf-8", "surrogatepass"))
+            if size > self.disk_max_bytes:
+                return
+            previous = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, accessed) VALUES (?, ?, ?, ?)",
+                (key, value, size, time.time()),
+            )
+            self._disk_bytes += size - (previous[0] if previous else 0)
+            self._evict_disk()
+
+    def _remember(self, key: str, value: str) -> None:
+        """Insert into the memory tier and evict LRU entries; caller holds the lock"""
+        size = len(value)
+        if size > self.memory_max_bytes:
+            return
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self._memory_bytes -= len(old)
+        self._memory[key] = value
+        self._memory_bytes += size
+        while self._memory and (
+            len(self._memory) > self.memory_max_entries or self._memory_bytes > self.memory_max_bytes
+        ):
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.stats["evictions"] += 1
+
+    def _evict_disk(self) -> None:
+        """Drop least recently used rows until the store fits its budget; caller holds the lock"""
+        while self._disk_bytes > self.disk_max_bytes:
+            rows = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY accessed LIMIT 64"
+            ).fetchall()
+            if not rows:
+                self._disk_bytes = 0
+                return
+            for key, size in rows:
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._disk_bytes -= size
+                self.stats["evictions"] += 1
+                if self._disk_bytes <= self.disk_max_bytes:
+                    break
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "disk_bytes": self._disk_bytes if self._db is not None else None,
+            }
+
+
+_shared_cache: ResponseCache | None = None
+_shared_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache; the SQLite tier is used unless RESPONSE_CACHE=memory"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            disk_path = None if CACHE_MODE == "memory" else CACHE_DIR / "response_cache.sqlite3"
+            _shared_cache = ResponseCache(disk_path=disk_path)
+        return _shared_cache
+
+
+def cache_enabled_by_default() -> bool:
+    return CACHE_MODE in ("memory", "disk")
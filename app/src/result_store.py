@@ -0,0 +1,265 @@
+"""Bounded store for benchmark task state and results
+
+Replaces the unbounded `benchmark_results` dict. Entries are keyed by task_id
+(with a per-session index for clients that only know their session):
+
+- queued/running entries hold live objects (progress log, cancel event) and are
+  never evicted
+- readers get shallow copies and every change goes through `put`/`update`
+  under the store lock, so an entry can be rendered while its task updates it
+- finished entries are rendered to plain JSON-able dicts, expire after a TTL,
+  and are evicted oldest-first once the tier exceeds its byte budget
+- evicted entries move to an optional SQLite spillover tier with its own TTL
+  and byte budget, so recent results survive memory pressure
+"""
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+STORE_DIR = Path(os.environ.get("RESULT_STORE_DIR", os.environ.get("DATASET_CACHE_DIR", "/tmp/rlm_datasets")))
+TTL_SECONDS = float(os.environ.get("RESULT_TTL_SECONDS", "3600"))
+MAX_BYTES = int(os.environ.get("RESULT_STORE_MAX_MB", "256")) * 1024 * 1024
+# "true" to keep evicted results in SQLite under RESULT_STORE_DIR
+SPILL_ENABLED = os.environ.get("RESULT_SPILL", "false").lower() in ("1", "true", "yes")
+SPILL_TTL_SECONDS = float(os.environ.get("RESULT_SPILL_TTL_SECONDS", str(7 * 24 * 3600)))
+SPILL_MAX_BYTES = int(os.environ.get("RESULT_SPILL_MAX_MB", "1024")) * 1024 * 1024
+# TTL scans run at most this often; the byte caps are enforced on every write
+SWEEP_INTERVAL_SECONDS = 1.0
+
+ACTIVE_STATUSES = ("queued", "running")
+
+
+class _Record:
+    __slots__ = ("session_id", "entry", "size", "finished_at")
+
+    def __init__(self, session_id: str, entry: Dict[str, Any], size: int, finished_at: float | None):
+        self.session_id = session_id
+        self.entry = entry
+        self.size = size
+        self.finished_at = finished_at
+
+
+class ResultStore:
+    """Thread-safe task store: memory tier with TTL and byte cap, optional SQLite spillover"""
+
+    def __init__(
+        self,
+        render: Callable[[Dict[str, Any]], Dict[str, Any]],
+        ttl_seconds: float = TTL_SECONDS,
+        max_bytes: int = MAX_BYTES,
+        spill_path: Path | None = None,
+        spill_ttl_seconds: float = SPILL_TTL_SECONDS,
+        spill_max_bytes: int = SPILL_MAX_BYTES,
+    ):
+        self._render = render
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.spill_ttl_seconds = spill_ttl_seconds
+        self.spill_max_bytes = spill_max_bytes
+        self._records: OrderedDict[Any, _Record] = OrderedDict()
+        self._sessions: Dict[str, Any] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        # Notified on every put/update/notify; long-polling status checks wait on it
+        self._changed = threading.Condition(self._lock)
+        self._last_sweep = 0.0
+        self.stats = {"puts": 0, "memory_hits": 0, "spill_hits": 0, "misses": 0, "expired": 0, "spilled": 0}
+
+        self._db: sqlite3.Connection | None = None
+        self._spill_bytes = 0
+        if spill_path is not None:
+            spill_path.parent.mkdir(parents=True, exist_ok=True)
+            self._db = sqlite3.connect(str(spill_path), check_same_thread=False, isolation_level=None)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                "task_id TEXT PRIMARY KEY, session_id TEXT NOT NULL, value TEXT NOT NULL, "
+                "size INTEGER NOT NULL, finished REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_session ON results(session_id, finished)")
+            self._db.execute("CREATE INDEX IF NOT EXISTS results_finished ON results(finished)")
+            self._spill_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+
+    def put(self, task_id: Any, session_id: str, entry: Dict[str, Any]) -> None:
+        """Insert or replace a task (the store keeps its own copy); finished entries are rendered and sized"""
+        finished = entry.get("status") not in ACTIVE_STATUSES
+        size = 0
+        if finished:
+            entry = self._render(entry)
+            size = len(json.dumps(entry, default=str))
+        else:
+            entry = dict(entry)
+        with self._lock:
+            self.stats["puts"] += 1
+            old = self._records.pop(task_id, None)
+            if old is not None:
+                self._bytes -= old.size
+            self._records[task_id] = _Record(session_id, entry, size, time.time() if finished else None)
+            self._bytes += size
+            self._sessions[session_id] = task_id
+            self._sweep()
+            self._bump()
+
+    def get(self, task_id: Any) -> Dict[str, Any] | None:
+        """Shallow copy of a stored task, from memory or the spill tier"""
+        with self._lock:
+            self._sweep()
+            record = self._records.get(task_id)
+            if record is not None:
+                self.stats["memory_hits"] += 1
+                return dict(record.entry)
+            if self._db is not None:
+                row = self._db.execute("SELECT value FROM results WHERE task_id = ?", (str(task_id),)).fetchone()
+                if row is not None:
+                    self.stats["spill_hits"] += 1
+                    return json.loads(row[0])
+            self.stats["misses"] += 1
+            return None
+
+    def update(self, task_id: Any, **fields: Any) -> bool:
+        """Set fields on a stored task (in memory or spilled); False if it is gone"""
+        with self._lock:
+            record = self._records.get(task_id)
+            if record is not None:
+                record.entry.update(fields)
+                if record.finished_at is not None:
+                    grown = len(json.dumps(fields, default=str))
+                    record.size += grown
+                    self._bytes += grown
+                self._bump()
+                return True
+            if self._db is not None:
+                row = self._db.execute("SELECT value, size FROM results WHERE task_id = ?", (str(task_id),)).fetchone()
+                if row is not None:
+                    value = json.dumps({**json.loads(row[0]), **fields}, default=str)
+                    self._db.execute(
+                        "UPDATE results SET value = ?, size = ? WHERE task_id = ?", (value, len(value), str(task_id))
+                    )
+                    self._spill_bytes += len(value) - row[1]
+                    return True
+            return False
+
+    def notify(self) -> None:
+        """Wake waiters after a change made outside the store (e.g. a new progress event)"""
+        with self._lock:
+            self._bump()
+
+    def _bump(self) -> None:
+        self._changed.notify_all()
+
+    def wait(self, task_id: Any, changed: Callable[[Dict[str, Any]], bool], timeout: float) -> Dict[str, Any] | None:
+        """Block until `changed(entry)` holds for an in-memory task, or the timeout; returns a copy of the entry"""
+        deadline = time.monotonic() + timeout
+        with self._lock:
+            while True:
+                record = self._records.get(task_id)
+                if record is None or changed(record.entry):
+                    return None if record is None else dict(record.entry)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return dict(record.entry)
+                self._changed.wait(remaining)
+
+    def latest(self, session_id: str) -> Any:
+        """task_id of the most recent task of a session, if still stored"""
+        with self._lock:
+            task_id = self._sessions.get(session_id)
+            if task_id is not None and task_id in self._records:
+                return task_id
+            if self._db is not None:
+                row = self._db.execute(
+                    "SELECT task_id FROM results WHERE session_id = ? ORDER BY finished DESC LIMIT 1", (session_id,)
+                ).fetchone()
+                if row is not None:
+                    return int(row[0]) if row[0].isdigit() else row[0]
+            return None
+
+    def discard(self, task_id: Any) -> None:
+        """Forget a task (e.g. rejected at submission); its session falls back to its previous task"""
+        with self._lock:
+            record = self._records.pop(task_id, None)
+            if record is None:
+                return
+            self._bytes -= record.size
+            if self._sessions.get(record.session_id) == task_id:
+                del self._sessions[record.session_id]
+                for other_id, other in reversed(self._records.items()):
+                    if other.session_id == record.session_id:
+                        self._sessions[record.session_id] = other_id
+                        break
+
+    def _sweep(self) -> None:
+        """Expire (at most once per SWEEP_INTERVAL_SECONDS) and evict finished entries; caller holds the lock"""
+        now = time.time()
+        expire = now - self._last_sweep >= SWEEP_INTERVAL_SECONDS
+        if expire:
+            self._last_sweep = now
+            for task_id, record in list(self._records.items()):
+                if record.finished_at is None:
+                    continue
+                if now - record.finished_at > self.ttl_seconds:
+                    self._evict(task_id)
+                    self.stats["expired"] += 1
+        if self._bytes > self.max_bytes:
+            for task_id, record in list(self._records.items()):
+                if self._bytes <= self.max_bytes:
+                    break
+                if record.finished_at is not None:
+                    self._evict(task_id)
+        if self._db is not None:
+            self._prune_spill(now, expire)
+
+    def _evict(self, task_id: Any) -> None:
+        record = self._records.pop(task_id)
+        self._bytes -= record.size
+        if self._sessions.get(record.session_id) == task_id:
+            del self._sessions[record.session_id]
+        if self._db is None or record.size > self.spill_max_bytes:
+            return
+        previous = self._db.execute("SELECT size FROM results WHERE task_id = ?", (str(task_id),)).fetchone()
+        self._db.execute(
+            "INSERT OR REPLACE INTO results (task_id, session_id, value, size, finished) VALUES (?, ?, ?, ?, ?)",
+            (str(task_id), record.session_id, json.dumps(record.entry, default=str), record.size, record.finished_at),
+        )
+        self._spill_bytes += record.size - (previous[0] if previous else 0)
+        self.stats["spilled"] += 1
+
+    def _prune_spill(self, now: float, expire: bool) -> None:
+        if expire:
+            expired = self._db.execute(
+                "SELECT COALESCE(SUM(size), 0), COUNT(*) FROM results WHERE finished < ?", (now - self.spill_ttl_seconds,)
+            ).fetchone()
+            if expired[1]:
+                self._db.execute("DELETE FROM results WHERE finished < ?", (now - self.spill_ttl_seconds,))
+                self._spill_bytes -= expired[0]
+        while self._spill_bytes > self.spill_max_bytes:
+            rows = self._db.execute("SELECT task_id, size FROM results ORDER BY finished LIMIT 64").fetchall()
+            if not rows:
+                self._spill_bytes = 0
+                return
+            for task_id, size in rows:
+                self._db.execute("DELETE FROM results WHERE task_id = ?", (task_id,))
+                self._spill_bytes -= size
+                if self._spill_bytes <= self.spill_max_bytes:
+                    break
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                **self.stats,
+                "entries": len(self._records),
+                "bytes": self._bytes,
+                "spill_bytes": self._spill_bytes if self._db is not None else None,
+            }
+
+
+def spill_path_from_env() -> Path | None:
+    return STORE_DIR / "results.sqlite3" if SPILL_ENABLED else None
+
@@ -0,0 +1,193 @@
+"""Background, batched S3 uploads of benchmark results
+
+`save_result_to_s3` used to `put_object` a pretty-printed JSON file on the
+worker thread at the end of every run, so a slow or failing S3 call delayed
+marking the run complete. `ResultUploader` takes results off the worker thread:
+
+- results are serialized when submitted and queued in memory
+- a background thread flushes a batch every `interval` seconds, or as soon as
+  `batch_size` results are waiting
+- each batch is written as one gzip-compressed JSON-lines object per
+  (experiment, session): `results/{experiment}/{session_id}/{ts}-{n}.jsonl.gz`
+- failed puts are retried with capped exponential backoff and jitter
+- `close()` (registered with atexit) drains the queue before shutdown
+"""
+from __future__ import annotations
+
+import gzip
+import itertools
+import json
+import os
+import random
+import threading
+import time
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Tuple
+
+BATCH_SIZE = int(os.environ.get("RESULT_UPLOAD_BATCH", "16"))
+INTERVAL_SECONDS = float(os.environ.get("RESULT_UPLOAD_INTERVAL_SECONDS", "2"))
+MAX_ATTEMPTS = int(os.environ.get("RESULT_UPLOAD_ATTEMPTS", "5"))
+BACKOFF_SECONDS = float(os.environ.get("RESULT_UPLOAD_BACKOFF_SECONDS", "0.5"))
+MAX_BACKOFF_SECONDS = 30.0
+FLUSH_TIMEOUT_SECONDS = float(os.environ.get("RESULT_UPLOAD_FLUSH_SECONDS", "30"))
+
+# Called once per result with (s3_key, None) after upload or (None, error) after the last retry
+UploadCallback = Callable[[str | None, str | None], None]
+
+
+@dataclass
+class _Upload:
+    experiment: str
+    session_id: str
+    line: str
+    on_done: UploadCallback | None = None
+    queued_at: float = field(default_factory=time.time)
+
+
+def read_results(body: bytes, key: str) -> List[Dict[str, Any]]:
+    """Results stored in an uploaded object: a batch (`.jsonl.gz`) or a single legacy `.json`"""
+    if key.endswith(".gz"):
+        body = gzip.decompress(body)
+    if key.endswith((".jsonl", ".jsonl.gz")):
+        return [json.loads(line) for line in body.decode("utf-8").splitlines() if line.strip()]
+    return [json.loads(body)]
+
+
+class ResultUploader:
+    """Queue of results written to S3 in compressed batches by a background thread"""
+
+    def __init__(
+        self,
+        client: Any,
+        bucket: str,
+        prefix: str = "results",
+        batch_size: int = BATCH_SIZE,
+        interval: float = INTERVAL_SECONDS,
+        max_attempts: int = MAX_ATTEMPTS,
+        backoff: float = BACKOFF_SECONDS,
+    ):
+        self.client = client
+        self.bucket = bucket
+        self.prefix = prefix
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self._pending: List[_Upload] = []
+        self._inflight = 0
+        self._flushing = 0
+        self._closed = False
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread: threading.Thread | None = None
+        self.stats = {"queued": 0, "uploaded": 0, "objects": 0, "bytes": 0, "retries": 0, "failed": 0}
+
+    def submit(self, result: Dict[str, Any], session_id: str, on_done: UploadCallback | None = None) -> None:
+        """Queue a result; it is serialized now, so later changes to `result` are not uploaded"""
+        upload = _Upload(result.get("experiment", "unknown"), session_id, json.dumps(result, default=str), on_done)
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("ResultUploader is closed")
+            self._pending.append(upload)
+            self.stats["queued"] += 1
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._worker, name="result-uploader", daemon=True)
+                self._thread.start()
+            self._cond.notify_all()
+
+    def _ready(self) -> bool:
+        if not self._pending:
+            return False
+        if self._closed or self._flushing or len(self._pending) >= self.batch_size:
+            return True
+        return time.time() - self._pending[0].queued_at >= self.interval
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._ready():
+                    if self._closed and not self._pending:
+                        return
+                    timeout = None
+                    if self._pending:
+                        timeout = max(0.0, self._pending[0].queued_at + self.interval - time.time())
+                    self._cond.wait(timeout)
+                batch, self._pending = self._pending[:self.batch_size], self._pending[self.batch_size:]
+                self._inflight = len(batch)
+            try:
+                self._upload_batch(batch)
+            finally:
+                with self._cond:
+                    self._inflight = 0
+                    self._cond.notify_all()
+
+    def _upload_batch(self, batch: List[_Upload]) -> None:
+        groups: Dict[Tuple[str, str], List[_Upload]] = defaultdict(list)
+        for upload in batch:
+            groups[(upload.experiment, upload.session_id)].append(upload)
+        for (experiment, session_id), uploads in groups.items():
+            key = f"{self.prefix}/{experiment}/{session_id}/{int(time.time())}-{next(self._seq)}.jsonl.gz"
+            body = gzip.compress("".join(u.line + "\n" for u in uploads).encode("utf-8"), compresslevel=6)
+            error = self._put(key, body)
+            with self._cond:
+                if error is None:
+                    self.stats["uploaded"] += len(uploads)
+                    self.stats["objects"] += 1
+                    self.stats["bytes"] += len(body)
+                else:
+                    self.stats["failed"] += len(uploads)
+            if error is not None:
+                print(f"[Uploader] Giving up on s3://{self.bucket}/{key}: {error}")
+            for upload in uploads:
+                if upload.on_done is not None:
+                    try:
+                        upload.on_done(key if error is None else None, error)
+                    except Exception as exc:  # pylint: disable=broad-except
+                        print(f"[Uploader] Callback failed for {key}: {type(exc).__name__}: {exc}")
+
+    def _put(self, key: str, body: bytes) -> str | None:
+        """put_object with retries; returns None on success or the last error"""
+        for attempt in range(1, self.max_attempts + 1):
+            try:
+                self.client.put_object(Bucket=self.bucket, Key=key, Body=body, ContentType="application/gzip")
+                return None
+            except Exception as exc:  # pylint: disable=broad-except
+                if attempt == self.max_attempts:
+                    return f"{type(exc).__name__}: {exc}"
+                with self._cond:
+                    self.stats["retries"] += 1
+                delay = min(self.backoff * 2 ** (attempt - 1), MAX_BACKOFF_SECONDS)
+                time.sleep(delay * random.uniform(0.5, 1.0))
+        return None
+
+    def flush(self, timeout: float | None = None) -> bool:
+        """Upload everything queued so far; False if the timeout expired first"""
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            self._flushing += 1
+            self._cond.notify_all()
+            try:
+                while self._pending or self._inflight:
+                    remaining = None if deadline is None else deadline - time.time()
+                    if remaining is not None and remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._flushing -= 1
+
+    def close(self, timeout: float = FLUSH_TIMEOUT_SECONDS) -> bool:
+        """Stop accepting results and drain the queue"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+            return not thread.is_alive()
+        return True
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._cond:
+            return {**self.stats, "pending": len(self._pending) + self._inflight}
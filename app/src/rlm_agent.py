@@ -1,14 +1,41 @@
 """RLM Agent using Strands native tools and agent loop."""
 from __future__ import annotations
 
+import itertools
+import queue
 import textwrap
-from typing import Any, Dict, Mapping, Sequence, Union
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Sequence, Union
 
-from botocore.config import Config as BotocoreConfig
 from strands import Agent, tool
-from strands.models import BedrockModel
 
-ContextType = Union[str, Sequence[Any], Mapping[str, Any]]
+try:
+    from src.budget import BudgetExceeded, BudgetLimits, SubCallBudget
+    from src.context_index import ContextIndex
+    from src.context_profile import ContextProfile, profile_context
+    from src.mapped_context import MappedText
+    from src.repl_output import BoundedOutput, capture_stdout, repl_print
+    from src.repl_worker import DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT, ReplWorker, WorkerFailure
+    from src.model_pool import SUB_CALL_POOL_SIZE, get_bedrock_model, get_sub_call_executor
+    from src.response_cache import ResponseCache, cache_key
+except ImportError:
+    from budget import BudgetExceeded, BudgetLimits, SubCallBudget
+    from context_index import ContextIndex
+    from context_profile import ContextProfile, profile_context
+    from mapped_context import MappedText
+    from repl_output import BoundedOutput, capture_stdout, repl_print
+    from repl_worker import DEFAULT_MAX_MEMORY_MB, DEFAULT_TIMEOUT, ReplWorker, WorkerFailure
+    from model_pool import SUB_CALL_POOL_SIZE, get_bedrock_model, get_sub_call_executor
+    from response_cache import ResponseCache, cache_key
+
+ContextType = Union[str, MappedText, Sequence[Any], Mapping[str, Any]]
+EventSink = Callable[[Dict[str, Any]], None]
+
+
+class RunCancelled(RuntimeError):
+    """Raised inside the agent loop after RLMAgent.cancel() is called"""
 
 
 class RLMAgent:
@@ -20,32 +47,73 @@ class RLMAgent:
         sub_model_name: str = "us.amazon.nova-micro-v1:0",
         max_retries: int = 3,
         max_sub_calls: int = 50,
+        max_batch_concurrency: int = 8,
+        max_sub_input_tokens: int | None = None,
+        max_sub_output_tokens: int | None = None,
+        max_sub_cost_usd: float | None = None,
+        response_cache: ResponseCache | None = None,
+        sub_call_pool_size: int = SUB_CALL_POOL_SIZE,
+        on_event: EventSink | None = None,
+        cancel_event: threading.Event | None = None,
+        build_index: bool = False,
+        sandbox: bool = False,
+        sandbox_timeout: float = DEFAULT_TIMEOUT,
+        sandbox_max_memory_mb: int | None = DEFAULT_MAX_MEMORY_MB,
     ):
         self.root_model_name = model_name
         self.sub_model_name = sub_model_name
         self.max_sub_calls = max_sub_calls
-        self.sub_call_count = 0
+        self.max_batch_concurrency = max_batch_concurrency
+        self.budget = SubCallBudget(
+            sub_model_name,
+            BudgetLimits(
+                max_calls=max_sub_calls,
+                max_input_tokens=max_sub_input_tokens,
+                max_output_tokens=max_sub_output_tokens,
+                max_cost_usd=max_sub_cost_usd,
+            ),
+        )
+        self.root_usage: Dict[str, int] = {}
+        self.response_cache = response_cache
         self.repl_globals: Dict[str, Any] | None = None
+        # Output sink of the execution in progress, for prints from threads the code starts
+        self._repl_output: BoundedOutput | None = None
         self.context: ContextType | None = None
+        self.on_event = on_event
+        self.build_index = build_index
+        self.context_index: ContextIndex | None = None
+        self.sandbox = sandbox
+        self.sandbox_timeout = sandbox_timeout
+        self.sandbox_max_memory_mb = sandbox_max_memory_mb
+        self.repl_worker: ReplWorker | None = None
+        # Sandbox worker restarts (timeouts, memory cap, crashes) in the current run
+        self.repl_restarts = 0
+        # An externally owned event lets a caller cancel a run it cannot reach directly
+        self._owns_cancel_event = cancel_event is None
+        self._cancelled = cancel_event or threading.Event()
+        self._sub_call_ids = itertools.count(1)
         
-        boto_config = BotocoreConfig(
-            retries={"max_attempts": max_retries, "mode": "standard"},
-            connect_timeout=10,
-            read_timeout=300,
-        )
-        self.root_model = BedrockModel(
-            model_id=self.root_model_name,
-            boto_client_config=boto_config,
-        )
-        self.sub_model = BedrockModel(
-            model_id=self.sub_model_name,
-            boto_client_config=boto_config,
+        # Models and sub-call agents are shared across runs in this process
+        self.root_model = get_bedrock_model(self.root_model_name, max_retries=max_retries)
+        self.sub_executor = get_sub_call_executor(
+            self.sub_model_name,
+            pool_size=sub_call_pool_size,
+            max_retries=max_retries,
         )
+        self.sub_model = self.sub_executor.model
+        # In-flight sub-calls hold their maximum output against the output and cost limits
+        self.budget.output_reserve = self.sub_model.get_config().get("max_tokens") or self.budget.output_reserve
     
-    def __call__(self, user_query: str, context: ContextType) -> str:
-        """Execute RLM with user query and long context."""
-        self._reset_environment(context)
-        context_summary = self._describe_context(context)
+    def __call__(
+        self,
+        user_query: str,
+        context: ContextType,
+        profile: ContextProfile | None = None,
+        index: ContextIndex | None = None,
+    ) -> str:
+        """Execute RLM with user query and long context; `index` is a prebuilt ctx_index for it."""
+        self._reset_environment(context, index)
+        context_summary = self._describe_context(context, profile)
         system_prompt = self._build_system_prompt(context_summary)
         
         python_repl = self._create_python_repl_tool()
@@ -55,50 +123,169 @@ class RLMAgent:
             model=self.root_model,
             system_prompt=system_prompt,
             tools=[python_repl, llm_query_tool],
+            callback_handler=self._root_callback,
         )
-        response = agent(user_query)
-        return self._extract_response_text(response)
+        self._emit("run_start", query=user_query, context_type=context_summary["type"])
+        try:
+            response = agent(user_query)
+        finally:
+            self._close_worker()
+        self.root_usage = self._extract_usage(response)
+        output = self._extract_response_text(response)
+        self._emit("run_end", output_chars=len(output), sub_calls=self.budget.calls)
+        return output
     
-    def _reset_environment(self, context: ContextType) -> None:
+    def stream(self, user_query: str, context: ContextType) -> Iterator[Dict[str, Any]]:
+        """Run the RLM in a background thread, yielding events as they happen.
+        
+        The last event is `final` (with `output`) or `error`. Any `on_event`
+        sink set on the agent still receives every event.
+        """
+        events: "queue.Queue[Dict[str, Any] | None]" = queue.Queue()
+        downstream = self.on_event
+        
+        def _sink(event: Dict[str, Any]) -> None:
+            events.put(event)
+            if downstream is not None:
+                downstream(event)
+        
+        def _run() -> None:
+            try:
+                output = self(user_query, context)
+                events.put({"type": "final", "t": time.time(), "output": output})
+            except Exception as exc:  # pylint: disable=broad-except
+                events.put({"type": "error", "t": time.time(), "error": f"{type(exc).__name__}: {exc}"})
+            finally:
+                events.put(None)
+        
+        self.on_event = _sink
+        worker = threading.Thread(target=_run, name="rlm-stream", daemon=True)
+        worker.start()
+        try:
+            while True:
+                event = events.get()
+                if event is None:
+                    break
+                yield event
+        finally:
+            # Abandoning the generator stops the run at its next checkpoint
+            if worker.is_alive():
+                self.cancel()
+            worker.join()
+            self.on_event = downstream
+    
+    def cancel(self) -> None:
+        """Stop the current run at the next token, tool call or sub-call"""
+        self._cancelled.set()
+    
+    @property
+    def sub_call_count(self) -> int:
+        return self.budget.calls
+    
+    def _emit(self, kind: str, **data: Any) -> None:
+        if self.on_event is not None:
+            self.on_event({"type": kind, "t": time.time(), **data})
+    
+    def _check_cancelled(self) -> None:
+        if self._cancelled.is_set():
+            raise RunCancelled("Run cancelled")
+    
+    def _root_callback(self, **kwargs: Any) -> None:
+        """Strands callback handler for the root agent: streams tokens and honours cancel()"""
+        self._check_cancelled()
+        text = kwargs.get("data")
+        if text:
+            self._emit("root_token", text=text)
+    
+    def _reset_environment(self, context: ContextType, index: ContextIndex | None = None) -> None:
         self.context = context
-        self.sub_call_count = 0
+        self.budget.reset()
+        self.root_usage = {}
+        if self._owns_cancel_event:
+            self._cancelled.clear()
         self.repl_globals = {
             "__builtins__": __builtins__,
             "context": self.context,
             "llm_query": self._repl_llm_query,
+            "llm_query_batch": self._repl_llm_query_batch,
+            "print": repl_print(lambda: self._repl_output),
         }
+        self._close_worker()
+        self.repl_restarts = 0
+        if self.sandbox:
+            # The worker builds its own ctx_index next to its copy of the REPL state
+            self.context_index = None
+            self.repl_worker = ReplWorker(
+                context,
+                llm_query=self._repl_llm_query,
+                llm_query_batch=self._repl_llm_query_batch,
+                timeout=self.sandbox_timeout,
+                max_memory_mb=self.sandbox_max_memory_mb,
+                build_index=self.build_index,
+                cancelled=self._cancelled,
+            )
+            return
+        if self.build_index:
+            self.context_index = index if index is not None else ContextIndex(context)
+        else:
+            self.context_index = None
+        if self.context_index is not None:
+            self.repl_globals["ctx_index"] = self.context_index
+    
+    def _close_worker(self) -> None:
+        if self.repl_worker is not None:
+            self.repl_restarts += self.repl_worker.restarts
+            self.repl_worker.close()
+            self.repl_worker = None
     
     def _create_python_repl_tool(self):
         """Create Python REPL tool with persistent globals."""
         @tool
         def execute_python(code: str) -> str:
-            import io
-            from contextlib import redirect_stdout
-            
             if self.repl_globals is None:
                 return "Error: REPL environment is not initialized."
+            self._check_cancelled()
+            self._emit("tool_call", tool="execute_python", code=code)
             
-            buffer = io.StringIO()
-            try:
-                with redirect_stdout(buffer):
-                    exec(code, self.repl_globals)
-            except Exception as exc:  # pylint: disable=broad-except
-                return f"Error: {type(exc).__name__}: {exc}"
+            output, stats, error = self._run_code(code)
+            if error is not None:
+                result = f"Error: {error}"
+                self._emit("repl_output", output=result, error=True, output_stats=stats)
+                return result
             
-            output = buffer.getvalue().rstrip()
-            if not output:
-                return "Code executed successfully (no output). Use print() to view state."
-            lines = output.splitlines()
-            if len(lines) > 100:
-                return "\n".join(lines[-100:])
-            return output
+            result = output or "Code executed successfully (no output). Use print() to view state."
+            self._emit("repl_output", output=result, error=False, output_stats=stats)
+            return result
         
         return execute_python
     
+    def _run_code(self, code: str) -> tuple[str, Dict[str, Any], str | None]:
+        """Execute REPL code in the sandbox worker or in-process; returns (stdout, output stats, error)"""
+        if self.repl_worker is not None:
+            try:
+                return self.repl_worker.execute(code)
+            except WorkerFailure as exc:
+                self._check_cancelled()
+                return "", {}, str(exc)
+        
+        output = self._repl_output = BoundedOutput()
+        try:
+            with capture_stdout(output):
+                exec(code, self.repl_globals)
+        except RunCancelled:
+            raise
+        except Exception as exc:  # pylint: disable=broad-except
+            return output.render(), output.stats(), f"{type(exc).__name__}: {exc}"
+        finally:
+            self._repl_output = None
+        return output.render(), output.stats(), None
+    
     def _create_llm_query_tool(self):
         """Expose llm_query as a native Strands tool."""
         @tool
         def llm_query(prompt: str) -> str:
+            self._check_cancelled()
+            self._emit("tool_call", tool="llm_query", prompt_chars=len(prompt))
             return self._invoke_sub_model(prompt)
         
         return llm_query
@@ -107,14 +294,84 @@ class RLMAgent:
         """Callable injected into the REPL globals."""
         return self._invoke_sub_model(prompt)
     
+    def _repl_llm_query_batch(
+        self,
+        prompts: Sequence[str],
+        max_concurrency: int | None = None,
+    ) -> List[str]:
+        """Run several sub-LLM queries concurrently, returning answers in input order."""
+        prompts = list(prompts)
+        if not prompts:
+            return []
+        workers = max_concurrency or self.max_batch_concurrency
+        workers = max(1, min(workers, self.max_batch_concurrency, len(prompts)))
+        
+        def _query(prompt: str) -> str:
+            # One failed sub-call should not discard the answers of the others
+            try:
+                return self._invoke_sub_model(prompt)
+            except Exception as exc:  # pylint: disable=broad-except
+                return f"Error: {type(exc).__name__}: {exc}"
+        
+        if workers == 1:
+            return [_query(prompt) for prompt in prompts]
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-query") as pool:
+            return list(pool.map(_query, prompts))
+    
     def _invoke_sub_model(self, prompt: str) -> str:
-        if self.sub_call_count >= self.max_sub_calls:
-            return f"Error: Max sub-calls ({self.max_sub_calls}) reached"
-        self.sub_call_count += 1
+        if self._cancelled.is_set():
+            return "Error: Run cancelled"
+        if not isinstance(prompt, str):
+            # e.g. a MappedText view passed straight from the REPL
+            prompt = str(prompt)
+        call_id = next(self._sub_call_ids)
+        started = time.time()
+        self._emit("sub_call_start", id=call_id, prompt_chars=len(prompt))
         
-        sub_agent = Agent(model=self.sub_model)
-        response = sub_agent(prompt)
-        return self._extract_response_text(response)
+        key = None
+        if self.response_cache is not None:
+            key = cache_key(self.sub_model_name, prompt, self.sub_model.get_config())
+            cached = self.response_cache.get(key)
+            self.budget.record_cache_lookup(cached is not None)
+            if cached is not None:
+                self._emit("sub_call_end", id=call_id, cached=True, output_chars=len(cached), elapsed=0.0)
+                return cached
+        
+        try:
+            reserved = self.budget.reserve(prompt)
+        except BudgetExceeded as exc:
+            self._emit("sub_call_end", id=call_id, error=str(exc), elapsed=0.0)
+            return f"Error: {exc}"
+        
+        usage: Dict[str, int] = {}
+        try:
+            response = self.sub_executor.invoke(prompt)
+            usage = self._extract_usage(response)
+        except Exception as exc:
+            self._emit("sub_call_end", id=call_id, error=f"{type(exc).__name__}: {exc}",
+                       elapsed=round(time.time() - started, 2))
+            raise
+        finally:
+            self.budget.record(reserved, usage.get("inputTokens"), usage.get("outputTokens"))
+        text = self._extract_response_text(response)
+        if key is not None:
+            self.response_cache.put(key, text)
+        self._emit("sub_call_end", id=call_id, cached=False, output_chars=len(text),
+                   elapsed=round(time.time() - started, 2), **usage)
+        return text
+    
+    @staticmethod
+    def _extract_usage(response: Any) -> Dict[str, int]:
+        """Token usage reported by a Strands agent result, if any"""
+        metrics = getattr(response, "metrics", None)
+        usage = getattr(metrics, "accumulated_usage", None)
+        if not usage:
+            return {}
+        return {
+            key: int(usage[key])
+            for key in ("inputTokens", "outputTokens", "totalTokens")
+            if key in usage
+        }
     
     @staticmethod
     def _extract_response_text(response: Any) -> str:
@@ -132,44 +389,24 @@ class RLMAgent:
                 return str(content)
         return str(response)
     
-    def _describe_context(self, context: ContextType) -> Dict[str, Any]:
-        def _length(value: Any) -> int:
-            if isinstance(value, str):
-                return len(value)
-            return len(str(value))
-        
-        if isinstance(context, str):
-            lengths = [len(context)]
-            context_type = "string"
-        elif isinstance(context, Mapping):
-            lengths = [_length(v) for v in context.values()]
-            context_type = f"mapping[{len(context)}]"
-        elif isinstance(context, Sequence):
-            lengths = [_length(item) for item in context]
-            context_type = f"sequence[{len(context)}]"
-        else:
-            as_str = str(context)
-            lengths = [len(as_str)]
-            context_type = type(context).__name__
-        
-        total = sum(lengths)
-        sample_count = min(len(lengths), 20)
-        sample_lengths = ", ".join(f"{lengths[i]:,}" for i in range(sample_count))
-        if len(lengths) > sample_count:
-            sample_lengths += ", ..."
-        
-        return {
-            "type": context_type,
-            "total": total,
-            "chunk_lengths": sample_lengths or "n/a",
-            "num_chunks": len(lengths),
-        }
+    def _describe_context(self, context: ContextType, profile: ContextProfile | None = None) -> Dict[str, Any]:
+        summary = (profile or profile_context(context)).prompt_summary()
+        summary["indexed"] = self.build_index
+        return summary
     
     def _build_system_prompt(self, summary: Mapping[str, Any]) -> str:
         chunks_line = summary["chunk_lengths"]
         total_length = summary["total"]
         context_type = summary["type"]
         num_chunks = summary["num_chunks"]
+        index_item = ""
+        if summary.get("indexed"):
+            index_item = (
+                "\n5. A `ctx_index` object with a precomputed index of `context`: `ctx_index.search(term)` returns "
+                "hits (line, chunk, offset, snippet) for a word or phrase, `ctx_index.lines(a, b)` returns lines "
+                "a..b-1, and `ctx_index.doc(docid)` returns a document by its `Document ID:` header or line ID "
+                "(e.g. Q0001). Lookups are instant and free, so use them before scanning or calling a sub-LLM."
+            )
         
         prompt = f"""
 You are tasked with answering a query with associated context. You can access, transform, and analyze this context interactively in a REPL environment that can recursively query sub-LLMs, which you are strongly encouraged to use as much as needed.
@@ -179,17 +416,19 @@ Your context is a {context_type} with {total_length:,} total characters and {num
 The REPL environment is initialized with:
 1. A `context` variable that contains the entire input. Inspect the context before answering.
 2. An `llm_query(prompt)` function that lets you call a powerful sub-LLM capable of ~500K characters. Batch information into each call to keep the trajectory efficient.
-3. Standard Python with persistent state across executions. Always use print() to view intermediate values.
+3. An `llm_query_batch(prompts, max_concurrency=None)` function that runs a list of independent sub-LLM queries in parallel and returns their answers as a list in the same order. Prefer it over calling `llm_query` in a loop. Every prompt counts toward the sub-call budget.
+4. Standard Python with persistent state across executions. Always use print() to view intermediate values.{index_item}
 
 You will only see truncated REPL outputs, so send buffers to `llm_query()` when you need semantic understanding. Build up buffers as you examine the context, and query the sub-LLM over those buffers to synthesize final answers.
 
 When you execute Python code, wrap it inside triple backticks marked with `repl`. Example:
 ```repl
 chunk_size = max(100000, len(context) // 20)
-for start in range(0, len(context), chunk_size):
-    chunk = context[start:start+chunk_size]
-    answer = llm_query(f"Search for the target number inside this chunk:\\n{{{{chunk}}}}")
-    print(f"Chunk {{{{start//chunk_size}}}}: {{{{answer}}}}")
+starts = range(0, len(context), chunk_size)
+prompts = [f"Search for the target number inside this chunk:\\n{{{{context[start:start+chunk_size]}}}}" for start in starts]
+buffers = llm_query_batch(prompts)
+for i, answer in enumerate(buffers):
+    print(f"Chunk {{{{i}}}}: {{{{answer}}}}")
 ```
 
 After processing individual chunks, call `llm_query` again to aggregate:
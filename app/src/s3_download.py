@@ -0,0 +1,176 @@
+"""Resumable, verified S3 object downloads
+
+`download_object` never exposes a partial file under the final name:
+
+- the object is fetched into `<dest>.part` with ranged GETs (in parallel for
+  large objects), each range pinned to the ETag seen at the start with IfMatch
+- completed ranges are recorded in `<dest>.part.json`, so a download cut short
+  by a container kill resumes with only the missing ranges
+- the finished file is checked against the object's size and ETag (plain MD5
+  ETags and multipart `md5-of-md5s` ETags) before being renamed into place;
+  SSE-KMS and SSE-C objects have ETags that are not MD5s and are only
+  size-checked
+
+`gunzip_file` decompresses a downloaded `.gz` asset the same way: into a
+temporary file that is renamed atomically.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+
+RANGE_SIZE = int(os.environ.get("DATASET_RANGE_SIZE_MB", "16")) * 1024 * 1024
+DOWNLOAD_WORKERS = int(os.environ.get("DATASET_DOWNLOAD_WORKERS", "8"))
+READ_SIZE = 1024 * 1024
+
+
+class IntegrityError(RuntimeError):
+    """Downloaded bytes do not match the object's size or ETag"""
+
+
+def is_missing(exc: Exception) -> bool:
+    """True if a botocore ClientError means the object does not exist"""
+    response = getattr(exc, "response", None) or {}
+    code = str(response.get("Error", {}).get("Code", ""))
+    return code in ("404", "NoSuchKey", "NotFound")
+
+
+def _ranges(size: int, range_size: int) -> List[Tuple[int, int]]:
+    """Inclusive (first, last) byte ranges covering an object"""
+    return [(lo, min(lo + range_size, size) - 1) for lo in range(0, size, range_size)]
+
+
+def _load_manifest(path: Path, etag: str, size: int) -> List[int]:
+    """Completed range indices of an earlier attempt at the same object version"""
+    try:
+        state = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return []
+    if state.get("etag") != etag or state.get("size") != size:
+        return []
+    return list(state.get("done", []))
+
+
+def _part_md5s(path: Path, part_size: int) -> Tuple[Any, int]:
+    """MD5 over the concatenated MD5 digests of each `part_size` block, and the block count"""
+    combined = hashlib.md5()
+    parts = 0
+    with path.open("rb") as handle:
+        while True:
+            block = handle.read(part_size)
+            if not block:
+                break
+            combined.update(hashlib.md5(block).digest())
+            parts += 1
+    return combined, parts
+
+
+def verify_etag(client: Any, bucket: str, key: str, path: Path, etag: str, head: Dict[str, Any] | None = None) -> bool:
+    """Check a file against an S3 ETag; returns False when the ETag cannot be checked (e.g. SSE-KMS)"""
+    if head is None:
+        head = client.head_object(Bucket=bucket, Key=key)
+    if str(head.get("ServerSideEncryption", "")).startswith("aws:kms") or head.get("SSECustomerAlgorithm"):
+        # The ETag of an SSE-KMS / SSE-C object is not an MD5 of its bytes
+        return False
+    if "-" not in etag:
+        if len(etag) != 32:
+            return False
+        digest = hashlib.md5()
+        with path.open("rb") as handle:
+            for block in iter(lambda: handle.read(READ_SIZE), b""):
+                digest.update(block)
+        if digest.hexdigest() != etag:
+            raise IntegrityError(f"ETag mismatch for s3://{bucket}/{key}")
+        return True
+    # Multipart ETag: the upload's part size is the size of part 1
+    _, expected_parts = etag.rsplit("-", 1)
+    try:
+        part_size = client.head_object(Bucket=bucket, Key=key, PartNumber=1)["ContentLength"]
+    except Exception:  # pylint: disable=broad-except
+        return False
+    combined, parts = _part_md5s(path, part_size)
+    if f"{combined.hexdigest()}-{parts}" != etag or str(parts) != expected_parts:
+        raise IntegrityError(f"Multipart ETag mismatch for s3://{bucket}/{key}")
+    return True
+
+
+def download_object(
+    client: Any,
+    bucket: str,
+    key: str,
+    dest: Path,
+    workers: int = DOWNLOAD_WORKERS,
+    range_size: int = RANGE_SIZE,
+) -> Dict[str, Any]:
+    """Download s3://bucket/key to dest atomically; returns {size, etag, verified, resumed_ranges}"""
+    dest = Path(dest)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    head = client.head_object(Bucket=bucket, Key=key)
+    size = head["ContentLength"]
+    etag = head["ETag"].strip('"')
+
+    part_path = dest.with_name(dest.name + ".part")
+    manifest_path = dest.with_name(dest.name + ".part.json")
+    ranges = _ranges(size, range_size)
+    done = set(_load_manifest(manifest_path, etag, size)) if part_path.exists() else set()
+    if not done:
+        with part_path.open("wb") as handle:
+            handle.truncate(size)
+    resumed = len(done)
+    lock = threading.Lock()
+
+    fd = os.open(part_path, os.O_RDWR)
+    try:
+        def fetch(index: int) -> None:
+            first, last = ranges[index]
+            response = client.get_object(Bucket=bucket, Key=key, Range=f"bytes={first}-{last}", IfMatch=head["ETag"])
+            offset = first
+            for block in response["Body"].iter_chunks(READ_SIZE):
+                os.pwrite(fd, block, offset)
+                offset += len(block)
+            if offset != last + 1:
+                raise IntegrityError(f"Short read for bytes {first}-{last} of s3://{bucket}/{key}")
+            with lock:
+                done.add(index)
+                manifest_path.write_text(json.dumps({"etag": etag, "size": size, "done": sorted(done)}))
+
+        missing = [i for i in range(len(ranges)) if i not in done]
+        if len(missing) > 1 and workers > 1:
+            with ThreadPoolExecutor(max_workers=min(workers, len(missing)), thread_name_prefix="s3-range") as pool:
+                list(pool.map(fetch, missing))
+        else:
+            for index in missing:
+                fetch(index)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+    actual = part_path.stat().st_size
+    if actual != size:
+        raise IntegrityError(f"Size mismatch for s3://{bucket}/{key}: {actual} != {size}")
+    try:
+        verified = verify_etag(client, bucket, key, part_path, etag, head)
+    except IntegrityError:
+        # Corrupt bytes: start from scratch next time
+        part_path.unlink(missing_ok=True)
+        manifest_path.unlink(missing_ok=True)
+        raise
+    os.replace(part_path, dest)
+    manifest_path.unlink(missing_ok=True)
+    return {"size": size, "etag": etag, "verified": verified, "resumed_ranges": resumed}
+
+
+def gunzip_file(source: Path, dest: Path) -> Path:
+    """Decompress source into dest via a temporary file and an atomic rename"""
+    tmp_path = dest.with_name(dest.name + ".gunzip")
+    with gzip.open(source, "rb") as compressed, tmp_path.open("wb") as out:
+        shutil.copyfileobj(compressed, out, READ_SIZE)
+    os.replace(tmp_path, dest)
+    return dest
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Test benchmark_handler task bookkeeping without running any model"""
+import os
+import sys
+from pathlib import Path
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+import benchmark_agent
+
+class _PoppedScheduler:
+    """Scheduler whose worker has already taken every job off the queue when cancel() arrives"""
+
+    def __init__(self):
+        self.jobs = []
+
+    def submit(self, task_id, run, estimated_bytes=0, priority=0):
+        self.jobs.append(run)
+
+    def cancel(self, task_id):
+        return False
+
+    def position(self, task_id):
+        return None
+
+    def snapshot(self):
+        return {}
+
+def _handle(payload):
+    return benchmark_agent.benchmark_handler({"experiment": "oolong", **payload})
+
+def test_cancel_between_pop_and_run_finishes_the_task(monkeypatch):
+    scheduler = _PoppedScheduler()
+    monkeypatch.setattr(benchmark_agent, "scheduler", scheduler)
+    monkeypatch.setattr(benchmark_agent, "execute_benchmark", _must_not_run)
+
+    started = _handle({"session_id": "cancel-race"})
+    task_id = started["task_id"]
+    cancelled = _handle({"cancel": True, "session_id": "cancel-race", "task_id": task_id})
+    assert cancelled["status"] == "cancelling"
+
+    # The worker now runs the job it popped before the cancel arrived
+    scheduler.jobs[0]()
+
+    status = _handle({"check_status": True, "session_id": "cancel-race", "task_id": task_id})
+    assert status["status"] == "cancelled"
+    assert "cancel_event" not in status
+
+def test_status_check_accepts_null_and_rejects_malformed_events_since(monkeypatch):
+    monkeypatch.setattr(benchmark_agent, "scheduler", _PoppedScheduler())
+    task_id = _handle({"session_id": "events-since"})["task_id"]
+    check = {"check_status": True, "session_id": "events-since", "task_id": task_id}
+
+    assert _handle({**check, "events_since": None})["status"] == "queued"
+    assert _handle({**check, "events_since": "3"})["status"] == "queued"
+    rejected = _handle({**check, "events_since": "latest"})
+    assert rejected["status_code"] == 400 and "events_since" in rejected["error"]
+    assert _handle({**check, "wait_seconds": [1]})["status_code"] == 400
+
+def _must_not_run(*args, **kwargs):
+    raise AssertionError("a cancelled job must not run the benchmark")
+
+if __name__ == "__main__":
+    import pytest
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Test the size-bounded LRU cache and its single-flight loading"""
+import sys
+import threading
+from pathlib import Path
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+from bounded_cache import BoundedCache, SingleFlight
+
+def _concurrently(func, threads=8):
+    """Run func from several threads released together; returns results and errors"""
+    start = threading.Barrier(threads)
+    results, errors = [], []
+    lock = threading.Lock()
+
+    def _run():
+        start.wait()
+        try:
+            value = func()
+        except Exception as exc:  # pylint: disable=broad-except
+            with lock:
+                errors.append(exc)
+        else:
+            with lock:
+                results.append(value)
+
+    workers = [threading.Thread(target=_run) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return results, errors
+
+def test_least_recently_used_entries_are_evicted_by_size():
+    cache = BoundedCache("test", max_bytes=100, sizeof=len)
+    cache.put("a", "x" * 40)
+    cache.put("b", "y" * 40)
+    assert cache.get("a") == "x" * 40
+    cache.put("c", "z" * 40)
+
+    assert "b" not in cache
+    assert "a" in cache and "c" in cache
+    snapshot = cache.snapshot()
+    assert snapshot["bytes"] == 80 and snapshot["evictions"] == 1
+
+def test_replacing_a_key_replaces_its_size():
+    cache = BoundedCache("test", max_bytes=100, sizeof=len)
+    cache.put("a", "x" * 60)
+    cache.put("a", "y" * 10)
+
+    assert cache.snapshot()["bytes"] == 10
+    assert cache.snapshot()["entries"] == 1
+
+def test_value_larger_than_the_budget_is_served_but_not_kept():
+    cache = BoundedCache("test", max_bytes=10, sizeof=len)
+    cache.put("small", "x" * 5)
+
+    assert cache.get_or_load("big", lambda: "y" * 20) == "y" * 20
+    assert "big" not in cache and "small" in cache
+
+def test_concurrent_misses_load_once():
+    cache = BoundedCache("test", max_bytes=1000)
+    calls = []
+    release = threading.Event()
+
+    def _load():
+        calls.append(1)
+        release.wait(5)
+        return "value"
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results, errors = _concurrently(lambda: cache.get_or_load("key", _load))
+
+    assert results == ["value"] * 8 and not errors
+    assert len(calls) == 1
+    snapshot = cache.snapshot()
+    assert snapshot["misses"] + snapshot["hits"] == 8
+    assert snapshot["waits"] >= 1
+
+def test_loader_errors_reach_every_waiter_and_are_not_cached():
+    cache = BoundedCache("test", max_bytes=1000)
+    release = threading.Event()
+
+    def _fail():
+        release.wait(5)
+        raise OSError("download failed")
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results, errors = _concurrently(lambda: cache.get_or_load("key", _fail), threads=4)
+
+    assert not results and len(errors) == 4
+    assert all(isinstance(e, OSError) for e in errors)
+    assert "key" not in cache
+    assert cache.get_or_load("key", lambda: "retried") == "retried"
+
+def test_size_callback_overrides_the_estimate():
+    cache = BoundedCache("test", max_bytes=1000)
+    cache.get_or_load("key", lambda: "x", size=lambda value: 600)
+
+    assert cache.snapshot()["bytes"] == 600
+
+def test_single_flight_reports_shared_results():
+    flight = SingleFlight()
+    release = threading.Event()
+
+    def _work():
+        release.wait(5)
+        return 42
+
+    timer = threading.Timer(0.2, release.set)
+    timer.start()
+    results, _ = _concurrently(lambda: flight.do("key", _work), threads=4)
+
+    assert sorted(results) == [(42, False)] + [(42, True)] * 3
+    # Finished flights are forgotten, so the next call runs again
+    assert flight.do("key", lambda: 43) == (43, False)
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+"""Test sub-call budget reservations and limits"""
+import sys
+import threading
+from pathlib import Path
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+from budget import BudgetExceeded, BudgetLimits, SubCallBudget, model_pricing
+
+def _reserve_concurrently(budget, prompt, threads=32):
+    """Reserve from many threads at once; returns the successful reservations"""
+    start = threading.Barrier(threads)
+    reserved = []
+    lock = threading.Lock()
+
+    def _reserve():
+        start.wait()
+        try:
+            reservation = budget.reserve(prompt)
+        except BudgetExceeded:
+            return
+        with lock:
+            reserved.append(reservation)
+
+    workers = [threading.Thread(target=_reserve) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return reserved
+
+def test_concurrent_reservations_never_exceed_max_calls():
+    budget = SubCallBudget("us.amazon.nova-micro-v1:0", BudgetLimits(max_calls=10))
+
+    reserved = _reserve_concurrently(budget, "hello")
+
+    assert len(reserved) == 10
+    assert budget.calls == 10 and budget.in_flight == 10
+    assert budget.rejected == 22
+
+def test_in_flight_reservations_hold_the_output_budget():
+    """Nothing is recorded yet, so only the reservations stop an overshoot"""
+    budget = SubCallBudget("model", BudgetLimits(max_calls=None, max_output_tokens=1000), output_reserve=100)
+
+    reserved = _reserve_concurrently(budget, "x" * 40)
+
+    assert len(reserved) == 10
+    assert budget.output_tokens == 0
+
+def test_record_settles_the_reservation():
+    budget = SubCallBudget("model", BudgetLimits(max_calls=None, max_output_tokens=300), output_reserve=100)
+    reservations = [budget.reserve("x" * 40) for _ in range(3)]
+    try:
+        budget.reserve("x")
+    except BudgetExceeded:
+        pass
+    else:
+        raise AssertionError("a fourth reservation should not fit")
+
+    budget.record(reservations[0], input_tokens=12, output_tokens=20)
+    budget.record(reservations[1], input_tokens=None, output_tokens=None)
+
+    assert budget.in_flight == 1
+    assert budget.input_tokens == 12 + 10
+    assert budget.output_tokens == 20
+    # 20 used + 100 still reserved leaves room for one more reservation
+    budget.reserve("x")
+
+def test_exhausted_limits_name_the_limit():
+    cases = [
+        (BudgetLimits(max_calls=0), "Max sub-calls (0)"),
+        (BudgetLimits(max_input_tokens=5), "input token budget (5)"),
+        (BudgetLimits(max_cost_usd=0.000001), "cost budget ($1e-06)"),
+    ]
+    for limits, message in cases:
+        budget = SubCallBudget("us.amazon.nova-pro-v1:0", limits)
+        try:
+            budget.reserve("x" * 400)
+        except BudgetExceeded as exc:
+            assert message in str(exc), str(exc)
+        else:
+            raise AssertionError(f"{limits} should reject the call")
+        assert budget.rejected == 1 and budget.calls == 0
+
+def test_small_output_limit_still_admits_one_call():
+    budget = SubCallBudget("model", BudgetLimits(max_output_tokens=10), output_reserve=4096)
+
+    assert budget.reserve("x") == (1, 10)
+
+def test_reset_clears_usage_and_reservations():
+    budget = SubCallBudget("model", BudgetLimits(max_calls=1))
+    budget.record(budget.reserve("x" * 40), input_tokens=10, output_tokens=5)
+    budget.record_cache_lookup(hit=True)
+
+    budget.reset()
+
+    assert budget.snapshot()["calls"] == 0 and budget.snapshot()["cache_hits"] == 0
+    budget.reserve("x")
+
+def test_pricing_ignores_the_region_prefix():
+    assert model_pricing("us.amazon.nova-pro-v1:0") == model_pricing("amazon.nova-pro-v1:0") == (0.0008, 0.0032)
+    assert model_pricing("unknown.model") == (0.0, 0.0)
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""Test the pre-parsed, memory-mapped dataset cache"""
+import json
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+import dataset_cache
+from dataset_cache import CACHE_SUFFIX, EntryStore, cached_entries
+
+ENTRIES = [{"id": i, "text": "x" * i, "tags": ["a", "b"][: i % 3]} for i in range(50)]
+
+class _CountingParse:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, source):
+        self.calls += 1
+        # Yield one at a time, as the streaming parsers do
+        yield from json.loads(source.read_text())
+
+def _source(tmp_path):
+    source = tmp_path / "dataset.json"
+    source.write_text(json.dumps(ENTRIES))
+    return source
+
+def test_build_round_trips_entries(tmp_path):
+    store = EntryStore.build(tmp_path / "data.entries", iter(ENTRIES))
+
+    assert len(store) == len(ENTRIES)
+    assert store[0] == ENTRIES[0] and store[-1] == ENTRIES[-1]
+    assert store[10:13] == ENTRIES[10:13]
+    assert list(store) == ENTRIES
+    with pytest.raises(IndexError):
+        store[len(ENTRIES)]
+    assert [p.name for p in tmp_path.iterdir()] == ["data.entries"]
+    store.close()
+
+def test_empty_dataset_builds_an_empty_store(tmp_path):
+    store = EntryStore.build(tmp_path / "empty.entries", [])
+
+    assert len(store) == 0 and list(store) == []
+    store.close()
+
+def test_cache_is_built_once_and_reused(tmp_path):
+    source = _source(tmp_path)
+    parse = _CountingParse()
+
+    first = cached_entries(source, parse)
+    second = cached_entries(source, parse)
+
+    assert parse.calls == 1
+    assert isinstance(second, EntryStore) and list(second) == ENTRIES
+    assert (tmp_path / ("dataset.json" + CACHE_SUFFIX)).exists()
+    first.close()
+    second.close()
+
+def test_changed_source_invalidates_the_cache(tmp_path):
+    source = _source(tmp_path)
+    parse = _CountingParse()
+    cached_entries(source, parse).close()
+
+    source.write_text(json.dumps(ENTRIES[:3]))
+    stat = source.stat()
+    os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+    store = cached_entries(source, parse)
+
+    assert parse.calls == 2
+    assert list(store) == ENTRIES[:3]
+    store.close()
+
+def test_corrupt_cache_file_is_rebuilt(tmp_path):
+    source = _source(tmp_path)
+    cache_path = tmp_path / ("dataset.json" + CACHE_SUFFIX)
+    cache_path.write_bytes(b"not a dataset cache file at all")
+
+    assert EntryStore.open(cache_path, source) is None
+    store = cached_entries(source, _CountingParse())
+
+    assert list(store) == ENTRIES
+    store.close()
+
+def test_disabled_cache_parses_without_writing(tmp_path, monkeypatch):
+    monkeypatch.setattr(dataset_cache, "CACHE_ENABLED", False)
+    source = _source(tmp_path)
+
+    assert cached_entries(source, _CountingParse()) == ENTRIES
+    assert cached_entries(source, _CountingParse(), uncached=lambda path: ["raw"]) == ["raw"]
+    assert [p.name for p in tmp_path.iterdir()] == ["dataset.json"]
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
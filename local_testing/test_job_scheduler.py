@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Test benchmark job ordering, memory admission and cancellation"""
+import sys
+import threading
+import time
+from pathlib import Path
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+from job_scheduler import JobScheduler, QueueFull
+
+class _Gate:
+    """Job that signals when it starts and blocks until released"""
+
+    def __init__(self, name=None, log=None):
+        self.name = name
+        self.log = log
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self):
+        self.started.set()
+        if self.log is not None:
+            self.log.append(self.name)
+        assert self.release.wait(5), "job was never released"
+
+def _wait_for(condition, timeout=5):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "condition not reached"
+        time.sleep(0.01)
+
+def test_queue_runs_by_priority_then_submission_order():
+    scheduler = JobScheduler(workers=1)
+    blocker = _Gate()
+    scheduler.submit("blocker", blocker)
+    assert blocker.started.wait(5)
+
+    log = []
+    jobs = {}
+    for name, priority in [("low-1", 0), ("high", 5), ("low-2", 0), ("mid", 1)]:
+        jobs[name] = _Gate(name, log)
+        jobs[name].release.set()
+        scheduler.submit(name, jobs[name], priority=priority)
+
+    assert [scheduler.position(name) for name in ("high", "mid", "low-1", "low-2")] == [1, 2, 3, 4]
+    blocker.release.set()
+    _wait_for(lambda: scheduler.snapshot()["completed"] == 5)
+
+    assert log == ["high", "mid", "low-1", "low-2"]
+    assert scheduler.position("high") is None
+
+def test_job_waits_for_memory_held_by_running_jobs():
+    scheduler = JobScheduler(workers=2, memory_budget_bytes=100)
+    first, second = _Gate(), _Gate()
+    scheduler.submit("first", first, estimated_bytes=60)
+    assert first.started.wait(5)
+    scheduler.submit("second", second, estimated_bytes=60)
+
+    # A worker is free, but the two jobs together exceed the budget
+    assert not second.started.wait(0.3)
+    assert scheduler.snapshot()["running"] == 1 and scheduler.snapshot()["queued"] == 1
+
+    first.release.set()
+    assert second.started.wait(5)
+    second.release.set()
+    _wait_for(lambda: scheduler.snapshot()["completed"] == 2)
+    assert scheduler.snapshot()["running_mb"] == 0
+
+def test_job_larger_than_the_budget_runs_alone():
+    scheduler = JobScheduler(workers=2, memory_budget_bytes=100)
+    huge, small = _Gate(), _Gate()
+    scheduler.submit("huge", huge, estimated_bytes=500)
+    assert huge.started.wait(5)
+    scheduler.submit("small", small, estimated_bytes=1)
+
+    assert not small.started.wait(0.3)
+    huge.release.set()
+    assert small.started.wait(5)
+    small.release.set()
+
+def test_cancel_drops_only_queued_jobs():
+    scheduler = JobScheduler(workers=1)
+    running, queued, after = _Gate(), _Gate(), _Gate()
+    scheduler.submit("running", running)
+    assert running.started.wait(5)
+    scheduler.submit("queued", queued)
+    scheduler.submit("after", after)
+
+    assert scheduler.cancel("queued")
+    assert not scheduler.cancel("queued")
+    assert not scheduler.cancel("running")
+    assert scheduler.position("after") == 1
+
+    after.release.set()
+    running.release.set()
+    _wait_for(lambda: scheduler.snapshot()["completed"] == 2)
+    assert not queued.started.is_set()
+
+def test_full_queue_rejects_submissions():
+    scheduler = JobScheduler(workers=1, max_queued=1)
+    running = _Gate()
+    scheduler.submit("running", running)
+    assert running.started.wait(5)
+    scheduler.submit("queued", _Gate())
+
+    try:
+        scheduler.submit("rejected", _Gate())
+    except QueueFull:
+        pass
+    else:
+        raise AssertionError("a third job should not fit")
+    assert scheduler.cancel("queued")
+    running.release.set()
+
+def test_failing_job_does_not_stop_its_worker():
+    scheduler = JobScheduler(workers=1)
+    done = threading.Event()
+
+    def _fail():
+        raise RuntimeError("boom")
+
+    scheduler.submit("fails", _fail)
+    scheduler.submit("next", done.set)
+
+    assert done.wait(5)
+    _wait_for(lambda: scheduler.snapshot()["completed"] == 2)
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Test per-entry access to JSON array files"""
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+from json_entries import JsonArrayEntries, iter_json_entries, scan_entry_spans
+
+ENTRIES = [
+    {"id": 1, "text": "brackets ] } [ { inside a string"},
+    {"id": 2, "text": 'escaped \\" quote and \\\\ backslash', "nested": {"list": [1, [2, 3]]}},
+    [4, {"five": 5}],
+    {"id": "é", "unicode": "日本語"},
+]
+
+# Removed when the test process exits
+_TMP = tempfile.TemporaryDirectory()
+
+def _write(text):
+    path = Path(_TMP.name) / f"{len(list(Path(_TMP.name).iterdir()))}.json"
+    path.write_text(text, encoding="utf-8")
+    return path
+
+def test_entries_match_json_load():
+    path = _write(json.dumps(ENTRIES, indent=2, ensure_ascii=False))
+    entries = JsonArrayEntries(path)
+
+    assert len(entries) == len(ENTRIES)
+    assert list(entries) == ENTRIES
+    assert entries[-1] == ENTRIES[-1]
+    assert entries[1:3] == ENTRIES[1:3]
+    entries.close()
+
+def test_spans_are_byte_offsets_of_each_entry():
+    raw = json.dumps(ENTRIES, ensure_ascii=False).encode("utf-8")
+    spans = scan_entry_spans(raw)
+
+    pieces = [raw[spans[i]:spans[i + 1]] for i in range(0, len(spans), 2)]
+    assert [json.loads(p) for p in pieces] == ENTRIES
+    path = _write(raw.decode("utf-8"))
+    entries = JsonArrayEntries(path)
+    assert entries.span(3) == (spans[6], spans[7])
+    assert raw[slice(*entries.span(0))].startswith(b'{"id": 1')
+    entries.close()
+
+def test_empty_file_and_empty_array_have_no_entries():
+    for text in ("", "[]", "  [ ]\n"):
+        entries = JsonArrayEntries(_write(text))
+        assert len(entries) == 0 and list(entries) == []
+        entries.close()
+
+def test_single_top_level_object_is_one_entry():
+    entries = JsonArrayEntries(_write(json.dumps({"id": 7, "items": [{"a": 1}]})))
+
+    assert len(entries) == 1
+    assert entries[0] == {"id": 7, "items": [{"a": 1}]}
+    entries.close()
+
+def test_out_of_range_index_raises():
+    entries = JsonArrayEntries(_write(json.dumps(ENTRIES)))
+    try:
+        entries[len(ENTRIES)]
+    except IndexError:
+        pass
+    else:
+        raise AssertionError("indexing past the end should raise IndexError")
+    entries.close()
+
+def test_unbalanced_document_is_rejected():
+    try:
+        scan_entry_spans(b'[{"id": 1}, {"id": 2}')
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("a truncated document should raise ValueError")
+
+def test_iter_json_entries_yields_every_entry():
+    assert list(iter_json_entries(_write(json.dumps(ENTRIES)))) == ENTRIES
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
@@ -72,7 +72,8 @@ if __name__ == "__main__":
     import argparse
     parser = argparse.ArgumentParser()
     parser.add_argument("experiment", nargs="?", default="oolong", 
-                       choices=["oolong", "oolong-pairs", "browsecomp-1k", "codeqa"])
+                       choices=["oolong", "oolong-pairs", "browsecomp-1k", "codeqa",
+                                "s-niah-50k", "s-niah-200k", "s-niah-1m", "s-niah-10m"])
     args = parser.parse_args()
     
     if args.experiment == "oolong":
@@ -88,6 +89,8 @@ if __name__ == "__main__":
             session_id="test-session"
         )
         print(f"Passed: {result['passed']}")
+        if 'scaling' in result:
+            print(f"Scaling: {result['scaling']}")
         if not result['passed']:
             if 'validation_reason' in result:
                 print(f"Reason: {result['validation_reason']}")
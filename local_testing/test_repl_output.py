@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Regression tests for the bounded REPL output capture"""
+import sys
+import threading
+from pathlib import Path
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+from repl_output import BoundedOutput, capture_stdout, repl_print
+
+def test_huge_print_keeps_its_tail():
+    """print() of more than max_chars arrives as the text, then "\\n"; the tail must survive"""
+    output = BoundedOutput(max_chars=50000)
+    output.write("y" * 60000)
+    output.write("\n")
+
+    assert output.kept_chars == 50000
+    assert output.getvalue() == "y" * 49999 + "\n"
+    assert output.truncated
+
+def test_huge_print_in_one_write_keeps_its_tail():
+    output = BoundedOutput(max_chars=50000)
+    output.write("y" * 60000 + "\n")
+
+    assert output.getvalue() == "y" * 49998 + "\n"
+
+def test_chunked_writes_keep_the_newest_chars():
+    output = BoundedOutput(max_chars=50000)
+    output.write("a" * 30000)
+    output.write("b" * 30000)
+    output.write("\n")
+
+    value = output.getvalue()
+    assert output.kept_chars == 50000
+    assert value.endswith("b" * 30000 + "\n")
+    assert value.startswith("a")
+
+def test_line_and_char_limits_keep_the_tail():
+    output = BoundedOutput(max_lines=3, max_chars=50000)
+    for i in range(10):
+        output.write(f"line {i}\n")
+
+    assert output.getvalue() == "line 7\nline 8\nline 9\n"
+    assert output.stats()["total_lines"] == 10
+
+def test_prints_from_threads_started_by_repl_code_are_captured():
+    output = BoundedOutput()
+    active = {"output": output}
+    repl_globals = {"print": repl_print(lambda: active["output"])}
+    code = (
+        "import threading\n"
+        "worker = threading.Thread(target=lambda: print('from worker'))\n"
+        "worker.start(); worker.join()\n"
+        "print('from main')\n"
+    )
+    with capture_stdout(output):
+        exec(code, repl_globals)
+
+    assert output.getvalue() == "from worker\nfrom main\n"
+
+def test_concurrent_writes_are_all_counted():
+    output = BoundedOutput(max_lines=10000)
+
+    def _write():
+        for _ in range(500):
+            output.write("x\n")
+
+    threads = [threading.Thread(target=_write) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert output.total_lines == 4000
+    assert output.getvalue() == "x\n" * 4000
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
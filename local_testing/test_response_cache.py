@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Test the two-tier sub-model response cache"""
+import itertools
+import sys
+from pathlib import Path
+
+import pytest
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+import response_cache
+from response_cache import ResponseCache, cache_key
+
+class _Clock:
+    """Stand-in for the time module so access times are strictly increasing"""
+
+    def __init__(self):
+        self._ticks = itertools.count(1)
+
+    def time(self):
+        return float(next(self._ticks))
+
+@pytest.fixture(autouse=True)
+def _clock(monkeypatch):
+    monkeypatch.setattr(response_cache, "time", _Clock())
+
+def test_key_depends_on_model_prompt_and_params():
+    key = cache_key("model-a", "prompt", {"temperature": 0})
+
+    assert key == cache_key("model-a", "prompt", {"temperature": 0})
+    assert key != cache_key("model-b", "prompt", {"temperature": 0})
+    assert key != cache_key("model-a", "prompt!", {"temperature": 0})
+    assert key != cache_key("model-a", "prompt", {"temperature": 1})
+
+def test_memory_tier_evicts_least_recently_used_by_count():
+    cache = ResponseCache(memory_max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.snapshot()["evictions"] == 1
+
+def test_memory_tier_evicts_by_bytes_and_skips_oversized_values():
+    cache = ResponseCache(memory_max_bytes=10)
+    cache.put("a", "x" * 6)
+    cache.put("b", "y" * 6)
+    cache.put("huge", "z" * 11)
+
+    snapshot = cache.snapshot()
+    assert snapshot["memory_entries"] == 1 and snapshot["memory_bytes"] == 6
+    assert cache.get("b") == "y" * 6
+    assert cache.get("huge") is None
+
+def test_replacing_a_key_does_not_double_count_its_bytes(tmp_path):
+    cache = ResponseCache(disk_path=tmp_path / "cache.sqlite3")
+    cache.put("a", "x" * 100)
+    cache.put("a", "y" * 40)
+
+    snapshot = cache.snapshot()
+    assert snapshot["memory_bytes"] == 40
+    assert snapshot["disk_bytes"] == 40
+    assert cache.get("a") == "y" * 40
+
+def test_disk_tier_serves_values_the_memory_tier_dropped(tmp_path):
+    cache = ResponseCache(memory_max_entries=1, disk_path=tmp_path / "cache.sqlite3")
+    cache.put("a", "1")
+    cache.put("b", "2")
+
+    assert cache.get("a") == "1"
+    assert cache.snapshot()["disk_hits"] == 1
+    # The disk hit was promoted back into memory
+    assert cache.get("a") == "1"
+    assert cache.snapshot()["memory_hits"] == 1
+
+def test_disk_tier_evicts_least_recently_accessed_rows(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ResponseCache(memory_max_entries=1, disk_path=path, disk_max_bytes=30)
+    cache.put("a", "a" * 10)
+    cache.put("b", "b" * 10)
+    cache.put("c", "c" * 10)
+    assert cache.get("a") == "a" * 10
+    cache.put("d", "d" * 10)
+
+    assert cache.snapshot()["disk_bytes"] == 30
+    assert cache.get("b") is None
+    assert [cache.get(k) for k in "acd"] == ["a" * 10, "c" * 10, "d" * 10]
+
+def test_disk_usage_is_restored_on_reopen(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    cache = ResponseCache(disk_path=path)
+    cache.put("a", "é" * 10)
+
+    reopened = ResponseCache(disk_path=path)
+
+    assert reopened.snapshot()["disk_bytes"] == 20
+    assert reopened.get("a") == "é" * 10
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
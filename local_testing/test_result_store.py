@@ -0,0 +1,149 @@
+#!/usr/bin/env python3
+"""Test the bounded task store: TTL expiry, byte cap and SQLite spillover"""
+import json
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+import result_store
+from result_store import ResultStore
+
+class _Clock:
+    """Stand-in for the time module that only moves when told to"""
+
+    def __init__(self):
+        self.now = 1_000_000.0
+
+    def time(self):
+        return self.now
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = _Clock()
+    monkeypatch.setattr(result_store, "time", clock)
+    return clock
+
+def _render(entry):
+    return {k: v for k, v in entry.items() if k != "live"}
+
+def _finished(n, text="x" * 100):
+    return {"status": "completed", "run": n, "output": text, "live": object()}
+
+def _size(entry):
+    return len(json.dumps(_render(entry)))
+
+def test_finished_entries_are_rendered_and_copied(clock):
+    store = ResultStore(_render)
+    store.put(1, "s", _finished(1))
+
+    entry = store.get(1)
+    assert "live" not in entry and entry["run"] == 1
+    entry["run"] = 99
+    assert store.get(1)["run"] == 1
+
+def test_finished_entries_expire_after_the_ttl(clock):
+    store = ResultStore(_render, ttl_seconds=60)
+    store.put(1, "s", _finished(1))
+    store.put(2, "s", {"status": "running"})
+
+    clock.now += 61
+    assert store.get(1) is None
+    assert store.get(2) == {"status": "running"}
+    assert store.snapshot()["expired"] == 1
+    assert store.snapshot()["bytes"] == 0
+
+def test_running_entries_are_never_evicted(clock):
+    store = ResultStore(_render, ttl_seconds=1, max_bytes=10)
+    store.put(1, "s", {"status": "running", "live": "kept"})
+
+    clock.now += 3600
+    store.put(2, "s", _finished(2))
+
+    assert store.get(1) == {"status": "running", "live": "kept"}
+    assert store.get(2) is None
+
+def test_byte_cap_spills_the_oldest_results(clock, tmp_path):
+    size = _size(_finished(1))
+    store = ResultStore(_render, max_bytes=2 * size, spill_path=tmp_path / "results.sqlite3")
+    for n in range(1, 4):
+        store.put(n, f"session-{n}", _finished(n))
+        clock.now += 1
+
+    snapshot = store.snapshot()
+    assert snapshot["entries"] == 2 and snapshot["bytes"] == 2 * size
+    assert snapshot["spilled"] == 1 and snapshot["spill_bytes"] == size
+    assert store.get(1)["run"] == 1
+    assert store.snapshot()["spill_hits"] == 1
+    assert store.latest("session-1") == 1
+
+def test_spilled_results_survive_a_restart(clock, tmp_path):
+    path = tmp_path / "results.sqlite3"
+    store = ResultStore(_render, max_bytes=0, spill_path=path)
+    store.put("task-a", "s", _finished(1))
+
+    reopened = ResultStore(_render, spill_path=path)
+
+    assert reopened.snapshot()["spill_bytes"] == _size(_finished(1))
+    assert reopened.get("task-a")["run"] == 1
+    assert reopened.latest("s") == "task-a"
+
+def test_update_on_a_spilled_row_rewrites_it_and_its_size(clock, tmp_path):
+    store = ResultStore(_render, max_bytes=0, spill_path=tmp_path / "results.sqlite3")
+    store.put(1, "s", _finished(1))
+    before = store.snapshot()["spill_bytes"]
+
+    assert store.update(1, s3_key="results/oolong/s/1.jsonl.gz")
+
+    entry = store.get(1)
+    assert entry["s3_key"] == "results/oolong/s/1.jsonl.gz"
+    assert store.snapshot()["spill_bytes"] == len(json.dumps(entry)) > before
+    assert not store.update(2, s3_key="missing")
+
+def test_spill_tier_expires_and_respects_its_budget(clock, tmp_path):
+    size = _size(_finished(1))
+    store = ResultStore(
+        _render, max_bytes=0, spill_path=tmp_path / "results.sqlite3", spill_ttl_seconds=60, spill_max_bytes=2 * size
+    )
+    for n in range(1, 4):
+        store.put(n, "s", _finished(n))
+        clock.now += 1
+
+    assert store.get(1) is None
+    assert store.snapshot()["spill_bytes"] == 2 * size
+
+    clock.now += 120
+    assert store.get(3) is None
+    assert store.snapshot()["spill_bytes"] == 0
+
+def test_discard_restores_the_previous_session_task(clock):
+    store = ResultStore(_render)
+    store.put(1, "s", _finished(1))
+    store.put(2, "s", {"status": "queued"})
+
+    store.discard(2)
+
+    assert store.latest("s") == 1
+    assert store.get(2) is None
+
+def test_wait_returns_once_the_entry_changes():
+    store = ResultStore(_render)
+    store.put(1, "s", {"status": "queued"})
+    timer = threading.Timer(0.1, store.update, args=(1,), kwargs={"status": "running"})
+    timer.start()
+
+    entry = store.wait(1, lambda current: current["status"] != "queued", timeout=5)
+
+    assert entry["status"] == "running"
+    assert store.wait(1, lambda current: False, timeout=0.05)["status"] == "running"
+    assert store.wait(2, lambda current: True, timeout=0.05) is None
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Test batched S3 result uploads against a local S3 stand-in (moto)"""
+import os
+import sys
+import threading
+from pathlib import Path
+
+import boto3
+from moto import mock_aws
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+from result_uploader import ResultUploader, read_results
+
+BUCKET = "rlm-results-test"
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+def _s3():
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    return client
+
+def _stored(client):
+    """Results per uploaded key"""
+    listing = client.list_objects_v2(Bucket=BUCKET).get("Contents", [])
+    return {
+        item["Key"]: read_results(client.get_object(Bucket=BUCKET, Key=item["Key"])["Body"].read(), item["Key"])
+        for item in listing
+    }
+
+class _Callbacks:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.calls = []
+
+    def __call__(self, key, error):
+        with self.lock:
+            self.calls.append((key, error))
+
+class _FailingPuts:
+    """S3 client whose first `failures` put_object calls raise"""
+
+    def __init__(self, client, failures):
+        self.client = client
+        self.failures = failures
+        self.attempts = 0
+
+    def put_object(self, **kwargs):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise ConnectionError("simulated S3 outage")
+        return self.client.put_object(**kwargs)
+
+@mock_aws
+def test_results_are_batched_per_experiment_and_session():
+    client = _s3()
+    done = _Callbacks()
+    uploader = ResultUploader(client, BUCKET, batch_size=16, interval=60)
+    for i in range(3):
+        uploader.submit({"experiment": "oolong", "run": i}, "session-a", done)
+    uploader.submit({"experiment": "codeqa", "run": 3}, "session-b", done)
+
+    assert uploader.flush(timeout=10)
+    stored = _stored(client)
+
+    assert len(stored) == 2
+    by_prefix = {key.rsplit("/", 1)[0]: results for key, results in stored.items()}
+    assert [r["run"] for r in by_prefix["results/oolong/session-a"]] == [0, 1, 2]
+    assert [r["run"] for r in by_prefix["results/codeqa/session-b"]] == [3]
+    assert all(key.endswith(".jsonl.gz") for key in stored)
+    assert sorted(key for key, _ in done.calls) == sorted([k for k in stored for _ in stored[k]])
+    assert all(error is None for _, error in done.calls)
+    assert uploader.snapshot()["objects"] == 2
+    uploader.close()
+
+@mock_aws
+def test_full_batch_is_uploaded_without_waiting_for_the_interval():
+    client = _s3()
+    uploader = ResultUploader(client, BUCKET, batch_size=2, interval=60)
+    done = threading.Event()
+    uploader.submit({"experiment": "oolong", "run": 0}, "s", None)
+    uploader.submit({"experiment": "oolong", "run": 1}, "s", lambda key, error: done.set())
+
+    assert done.wait(10)
+    assert sum(len(results) for results in _stored(client).values()) == 2
+    uploader.close()
+
+@mock_aws
+def test_transient_failures_are_retried():
+    flaky = _FailingPuts(_s3(), failures=2)
+    done = _Callbacks()
+    uploader = ResultUploader(flaky, BUCKET, interval=60, max_attempts=5, backoff=0.01)
+    uploader.submit({"experiment": "oolong"}, "s", done)
+
+    assert uploader.flush(timeout=10)
+    assert flaky.attempts == 3
+    assert done.calls[0][0] is not None and done.calls[0][1] is None
+    assert uploader.snapshot()["retries"] == 2
+
+@mock_aws
+def test_exhausted_retries_report_the_error():
+    flaky = _FailingPuts(_s3(), failures=10)
+    done = _Callbacks()
+    uploader = ResultUploader(flaky, BUCKET, interval=60, max_attempts=3, backoff=0.01)
+    uploader.submit({"experiment": "oolong"}, "s", done)
+    uploader.submit({"experiment": "oolong"}, "s", done)
+
+    assert uploader.flush(timeout=10)
+    assert flaky.attempts == 3
+    assert len(done.calls) == 2
+    assert all(key is None and "simulated S3 outage" in error for key, error in done.calls)
+    assert uploader.snapshot()["failed"] == 2
+    assert _stored(flaky.client) == {}
+
+@mock_aws
+def test_close_drains_the_queue():
+    client = _s3()
+    done = _Callbacks()
+    uploader = ResultUploader(client, BUCKET, batch_size=4, interval=60)
+    for i in range(10):
+        uploader.submit({"experiment": "oolong", "run": i}, "s", done)
+
+    assert uploader.close(timeout=10)
+    assert len(done.calls) == 10
+    runs = sorted(r["run"] for results in _stored(client).values() for r in results)
+    assert runs == list(range(10))
+    assert uploader.snapshot()["pending"] == 0
+    try:
+        uploader.submit({"experiment": "oolong"}, "s")
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("submit after close() should fail")
+
+if __name__ == "__main__":
+    for name, func in list(globals().items()):
+        if name.startswith("test_"):
+            func()
+            print(f"✅ {name}")
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Test verified dataset downloads against a local S3 stand-in (moto)"""
+import gzip
+import io
+import os
+import sys
+from pathlib import Path
+
+import boto3
+import pytest
+from botocore.response import StreamingBody
+from moto import mock_aws
+
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+os.environ.setdefault("AWS_ACCESS_KEY_ID", "testing")
+os.environ.setdefault("AWS_SECRET_ACCESS_KEY", "testing")
+
+# Add app/src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "app" / "src"))
+
+import datasets
+from s3_download import IntegrityError, download_object
+
+BUCKET = "rlm-datasets-test"
+PART_SIZE = 5 * 1024 * 1024
+
+def _s3():
+    client = boto3.client("s3", region_name="us-east-1")
+    client.create_bucket(Bucket=BUCKET)
+    return client
+
+def _payload(size):
+    return bytes(i % 251 for i in range(size))
+
+class _Corrupting:
+    """S3 client whose ranged reads come back with their first byte flipped"""
+
+    def __init__(self, client):
+        self.client = client
+
+    def head_object(self, **kwargs):
+        return self.client.head_object(**kwargs)
+
+    def get_object(self, **kwargs):
+        response = self.client.get_object(**kwargs)
+        data = bytearray(response["Body"].read())
+        data[0] ^= 0xFF
+        return {**response, "Body": StreamingBody(io.BytesIO(bytes(data)), len(data))}
+
+@mock_aws
+def test_single_part_object_is_downloaded_in_ranges_and_verified(tmp_path):
+    client = _s3()
+    data = _payload(10_000)
+    client.put_object(Bucket=BUCKET, Key="data.bin", Body=data)
+
+    info = download_object(client, BUCKET, "data.bin", tmp_path / "data.bin", workers=4, range_size=1024)
+
+    assert (tmp_path / "data.bin").read_bytes() == data
+    assert info["verified"] and info["size"] == len(data)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["data.bin"]
+
+@mock_aws
+def test_multipart_object_is_verified_against_its_md5_of_md5s(tmp_path):
+    client = _s3()
+    data = _payload(PART_SIZE + 1234)
+    upload = client.create_multipart_upload(Bucket=BUCKET, Key="big.bin")
+    parts = []
+    for number, chunk in enumerate((data[:PART_SIZE], data[PART_SIZE:]), 1):
+        part = client.upload_part(Bucket=BUCKET, Key="big.bin", UploadId=upload["UploadId"], PartNumber=number, Body=chunk)
+        parts.append({"PartNumber": number, "ETag": part["ETag"]})
+    client.complete_multipart_upload(
+        Bucket=BUCKET, Key="big.bin", UploadId=upload["UploadId"], MultipartUpload={"Parts": parts}
+    )
+
+    info = download_object(client, BUCKET, "big.bin", tmp_path / "big.bin", range_size=2 * 1024 * 1024)
+
+    assert info["etag"].endswith("-2")
+    assert info["verified"]
+    assert (tmp_path / "big.bin").read_bytes() == data
+
+@mock_aws
+def test_corrupted_download_raises_and_leaves_no_files(tmp_path):
+    client = _s3()
+    client.put_object(Bucket=BUCKET, Key="data.bin", Body=_payload(4096))
+
+    with pytest.raises(IntegrityError):
+        download_object(_Corrupting(client), BUCKET, "data.bin", tmp_path / "data.bin", range_size=1024)
+
+    assert list(tmp_path.iterdir()) == []
+
+@mock_aws
+def test_kms_encrypted_object_is_size_checked_only(tmp_path):
+    client = _s3()
+    data = _payload(4096)
+    key_id = boto3.client("kms", region_name="us-east-1").create_key()["KeyMetadata"]["KeyId"]
+    client.put_object(Bucket=BUCKET, Key="data.bin", Body=data, ServerSideEncryption="aws:kms", SSEKMSKeyId=key_id)
+
+    # On S3 a single-part SSE-KMS ETag is 32 hex characters but not the MD5 of the bytes
+    info = download_object(client, BUCKET, "data.bin", tmp_path / "data.bin")
+
+    assert not info["verified"]
+    assert (tmp_path / "data.bin").read_bytes() == data
+
+@mock_aws
+def test_dataset_path_prefers_and_unpacks_the_gz_object(tmp_path, monkeypatch):
+    client = _s3()
+    monkeypatch.setattr(datasets, "S3_BUCKET", BUCKET)
+    monkeypatch.setattr(datasets, "LOCAL_DATASET_DIR", tmp_path)
+    text = b'[{"id": 1}, {"id": 2}]'
+    client.put_object(Bucket=BUCKET, Key="datasets/sample.json.gz", Body=gzip.compress(text))
+    client.put_object(Bucket=BUCKET, Key="datasets/plain.json", Body=text)
+
+    path = datasets.get_dataset_path("sample.json", client)
+    plain = datasets.get_dataset_path("plain.json", client)
+
+    assert path == tmp_path / "sample.json" and path.read_bytes() == text
+    assert plain.read_bytes() == text
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["plain.json", "sample.json"]
+
+if __name__ == "__main__":
+    sys.exit(pytest.main([__file__, "-q"]))
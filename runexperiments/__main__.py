@@ -1,5 +1,6 @@
 """RLM Benchmark Runner - Main entry point"""
+import sys
 from .cli import main
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
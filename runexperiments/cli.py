@@ -1,13 +1,29 @@
-"""Command-line interface with interactive menus"""
+"""Command-line interface: interactive menus, or scriptable subcommands
+
+With no arguments the arrow-key menus run. Subcommands (run, run-all, sweep,
+status, results) run unattended and exit with:
+  0  every run passed
+  1  a run failed, timed out or was not found
+  2  usage or configuration error
+  3  the task is still queued or running (status only)
+"""
+import argparse
+import contextlib
+import csv
+import json
 import sys
-from .config import EXPERIMENTS, MODELS
+import requests
+from botocore.exceptions import BotoCoreError, ClientError
+from .config import EXPERIMENTS, MODELS, SIZE_SWEEP, DEFAULT_PARALLELISM, SWEEP_SEEDS, SWEEP_REPETITIONS
+from .client import BenchmarkClient
 from .runner import BenchmarkRunner
+from .sweep import MatrixSweep, run_record
 from .deploy import load_config, deploy_agentcore, start_local_docker, stop_local_docker
 from .display import print_error, print_info, print_success, Colors
 from .menu import Menu
 
-def main():
-    """Main entry point with interactive menus"""
+def interactive():
+    """Interactive menus (used when no subcommand is given)"""
     try:
         # Check if already deployed
         config = load_config()
@@ -61,7 +77,7 @@ def main():
                 else:
                     print_error("Deployment failed. Please check errors above.")
                     input("\nPress Enter to continue...")
-                return main()  # Return to main menu
+                return interactive()  # Return to main menu
                 
             elif deploy_choice == "Run Local Docker":
                 if start_local_docker():
@@ -70,15 +86,15 @@ def main():
                 else:
                     print_error("Docker start failed. Please check errors above.")
                     input("\nPress Enter to continue...")
-                return main()  # Return to main menu
+                return interactive()  # Return to main menu
             else:
-                return main()  # Back
+                return interactive()  # Back
         
         # Handle stop docker
         if choice == "Stop Local Docker":
             stop_local_docker()
             input("\nPress Enter to continue...")
-            return main()
+            return interactive()
         
         # Handle view config
         if choice == "View Configuration":
@@ -89,14 +105,17 @@ def main():
             else:
                 print(f"Endpoint: {config.get('local_endpoint')}")
             input("\nPress Enter to continue...")
-            return main()
+            return interactive()
         
         # Run benchmarks flow
         if "Run Benchmarks" in choice:
             # Benchmark type menu
             benchmark_options = [
                 "Run All Benchmarks",
+                "Run All Benchmarks (Parallel)",
                 "Run Single Experiment",
+                "Run S-NIAH Size Sweep",
+                "Run Model x Experiment Sweep",
                 "Back"
             ]
             
@@ -108,7 +127,21 @@ def main():
             benchmark_choice = benchmark_menu.display()
             
             if benchmark_choice == "Back" or benchmark_choice is None:
-                return main()
+                return interactive()
+            
+            # The matrix sweep covers every model, so it skips model selection
+            if benchmark_choice == "Run Model x Experiment Sweep":
+                try:
+                    sweep = MatrixSweep()
+                except ValueError as e:
+                    print_error(str(e))
+                    input("\nPress Enter to continue...")
+                    return interactive()
+                answer = input(f"\nRun {len(sweep.jobs())} benchmark invocations? [y/N] ")
+                if answer.strip().lower() == "y":
+                    sweep.run()
+                    input("\nPress Enter to continue...")
+                return interactive()
             
             # Model selection menu
             model_options = list(MODELS.keys())
@@ -123,7 +156,7 @@ def main():
             model_key = model_menu.display()
             
             if model_key is None:
-                return main()
+                return interactive()
             
             # Create runner
             try:
@@ -131,12 +164,15 @@ def main():
             except ValueError as e:
                 print_error(str(e))
                 input("\nPress Enter to continue...")
-                return main()
+                return interactive()
             
             # Execute based on choice
             if benchmark_choice == "Run All Benchmarks":
                 runner.run_all()
                 input("\nPress Enter to continue...")
+            elif benchmark_choice == "Run All Benchmarks (Parallel)":
+                runner.run_all(parallelism=DEFAULT_PARALLELISM)
+                input("\nPress Enter to continue...")
             elif benchmark_choice == "Run Single Experiment":
                 # Experiment selection menu
                 exp_options = list(EXPERIMENTS.keys())
@@ -151,12 +187,15 @@ def main():
                 experiment = exp_menu.display()
                 
                 if experiment is None:
-                    return main()
+                    return interactive()
                 
                 runner.run_single(experiment)
                 input("\nPress Enter to continue...")
+            elif benchmark_choice == "Run S-NIAH Size Sweep":
+                runner.run_size_sweep()
+                input("\nPress Enter to continue...")
             
-            return main()  # Return to main menu
+            return interactive()  # Return to main menu
             
     except KeyboardInterrupt:
         print(f"\n\n{Colors.YELLOW}Interrupted by user{Colors.END}\n")
@@ -166,7 +205,188 @@ def main():
         import traceback
         traceback.print_exc()
         input("\nPress Enter to continue...")
-        return main()
+        return interactive()
+
+# ============================================================================
+# Scriptable subcommands
+# ============================================================================
 
-if __name__ == "__main__":
-    main()
+EXIT_PASSED = 0
+EXIT_FAILED = 1
+EXIT_ERROR = 2
+EXIT_RUNNING = 3
+
+ALL_EXPERIMENTS = list(EXPERIMENTS) + [exp_id for exp_id in SIZE_SWEEP if exp_id not in EXPERIMENTS]
+
+def build_parser():
+    """argparse parser with the run, run-all, sweep, status and results subcommands"""
+    parser = argparse.ArgumentParser(
+        prog="python -m runexperiments",
+        description="Run RLM benchmarks. Without a subcommand, the interactive menus start.",
+        epilog="Exit codes: 0 all passed, 1 a run failed, 2 usage/config error, 3 still running (status)."
+    )
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    
+    output = argparse.ArgumentParser(add_help=False)
+    output.add_argument("--format", choices=["text", "json", "csv"], default="text",
+                        help="Output format (json/csv go to stdout or --output; progress goes to stderr)")
+    output.add_argument("--output", "-o", help="Write json/csv output to this file (requires --format json/csv)")
+    
+    timed = argparse.ArgumentParser(add_help=False)
+    timed.add_argument("--timeout", type=float, help="Seconds per experiment before it is cancelled and failed")
+    
+    model = argparse.ArgumentParser(add_help=False)
+    model.add_argument("--model", "-m", choices=list(MODELS), default="nova-pro", metavar="MODEL",
+                       help="Model configuration")
+    
+    run = subparsers.add_parser("run", parents=[output, timed, model], help="Run one experiment")
+    run.add_argument("experiment", choices=ALL_EXPERIMENTS, metavar="EXPERIMENT", help=", ".join(ALL_EXPERIMENTS))
+    run.add_argument("--seed", type=int, help="Dataset/haystack seed (default: derived from the session)")
+    run.set_defaults(handler=cmd_run)
+    
+    run_all = subparsers.add_parser("run-all", parents=[output, timed, model], help="Run the benchmark suite")
+    run_all.add_argument("--experiments", "-e", nargs="+", choices=ALL_EXPERIMENTS, metavar="EXPERIMENT",
+                         help="Subset of experiments")
+    run_all.add_argument("--parallel", "-j", type=int, default=1, help="Experiments in flight at once")
+    run_all.set_defaults(handler=cmd_run_all)
+    
+    sweep = subparsers.add_parser("sweep", parents=[output, timed], help="Run a model x experiment matrix")
+    sweep.add_argument("--models", nargs="+", choices=list(MODELS), metavar="MODEL", help="Models (default: all)")
+    sweep.add_argument("--experiments", "-e", nargs="+", choices=ALL_EXPERIMENTS, metavar="EXPERIMENT",
+                       help="Experiments (default: suite)")
+    sweep.add_argument("--seeds", nargs="+", type=int, default=SWEEP_SEEDS, help="Seeds per cell")
+    sweep.add_argument("--repetitions", "-k", type=int, default=SWEEP_REPETITIONS, help="Runs per cell and seed")
+    sweep.add_argument("--parallel", "-j", type=int, default=DEFAULT_PARALLELISM, help="Runs in flight at once")
+    sweep.add_argument("--report", help="Sweep report path (default: sweep-<timestamp>.json)")
+    sweep.add_argument("--min-pass-rate", type=float, default=1.0,
+                       help="Exit 1 if any cell passes less often than this (0-1)")
+    sweep.set_defaults(handler=cmd_sweep)
+    
+    task = argparse.ArgumentParser(add_help=False)
+    task.add_argument("--experiment", "-e", required=True, choices=ALL_EXPERIMENTS, metavar="EXPERIMENT")
+    task.add_argument("--session-id", "-s", required=True)
+    task.add_argument("--task-id", "-t", help="Task ID (default: the latest task of the session)")
+    
+    status = subparsers.add_parser("status", parents=[output, task], help="Check a task's status once")
+    status.add_argument("--wait", type=float, default=0, help="Long-poll up to this many seconds for a change")
+    status.set_defaults(handler=cmd_status)
+    
+    results = subparsers.add_parser("results", parents=[output, timed, task], help="Wait for and print a task's result")
+    results.set_defaults(handler=cmd_results)
+    
+    return parser
+
+def main(argv=None):
+    """Entry point: interactive menus without arguments, otherwise a subcommand; returns the exit code"""
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv:
+        interactive()
+        return EXIT_PASSED
+    
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if args.output and args.format == "text":
+        parser.error("--output requires --format json or csv")
+    try:
+        return args.handler(args)
+    except ValueError as e:
+        # e.g. no deployment configured, unknown model/experiment
+        print_error(str(e), file=sys.stderr)
+        return EXIT_ERROR
+    except (requests.RequestException, BotoCoreError, ClientError) as e:
+        # Agent unreachable, AgentCore/S3 API errors
+        print_error(f"Request to the benchmark agent failed: {e}", file=sys.stderr)
+        return EXIT_ERROR
+
+def _quiet(args):
+    """Send progress output to stderr when stdout carries machine-readable output"""
+    if args.format != "text" and not args.output:
+        return contextlib.redirect_stdout(sys.stderr)
+    return contextlib.nullcontext()
+
+def _emit(args, data, rows):
+    """Write `data` as JSON or `rows` as CSV to --output or stdout (text format prints nothing extra)"""
+    if args.format == "text":
+        return
+    with open(args.output, "w", newline="") if args.output else contextlib.nullcontext(sys.stdout) as out:
+        if args.format == "json":
+            json.dump(data, out, indent=2, default=str)
+            out.write("\n")
+        else:
+            writer = csv.DictWriter(out, fieldnames=list(rows[0]) if rows else ["experiment"])
+            writer.writeheader()
+            writer.writerows(rows)
+    if args.output:
+        print_success(f"Wrote {args.format} output to {args.output}", file=sys.stderr)
+
+def _row(result, model_key=None):
+    return run_record(model_key or result.get("model"), result.get("experiment"), result.get("seed"), 0, result)
+
+def _exit_code(results):
+    return EXIT_PASSED if results and all(r.get("passed") for r in results) else EXIT_FAILED
+
+def cmd_run(args):
+    with _quiet(args):
+        runner = BenchmarkRunner(model_key=args.model, timeout=args.timeout)
+        result = runner.run_single(args.experiment, seed=args.seed)
+    _emit(args, result, [_row(result, args.model)])
+    return _exit_code([result])
+
+def cmd_run_all(args):
+    with _quiet(args):
+        runner = BenchmarkRunner(model_key=args.model, timeout=args.timeout)
+        results = runner.run_all(parallelism=args.parallel, experiments=args.experiments)
+    _emit(args, results, [_row(r, args.model) for r in results])
+    return _exit_code(results)
+
+def cmd_sweep(args):
+    with _quiet(args):
+        sweep = MatrixSweep(
+            models=args.models, experiments=args.experiments, seeds=args.seeds,
+            repetitions=args.repetitions, parallelism=args.parallel, timeout=args.timeout
+        )
+        report = sweep.run(args.report)
+    _emit(args, report, report["runs"])
+    below = [cell for cell in report["cells"] if cell["stats"]["pass_rate"] < args.min_pass_rate]
+    for cell in below:
+        print_error(
+            f"{cell['model']} / {cell['experiment']}: pass rate {cell['stats']['pass_rate']:.0%} "
+            f"< {args.min_pass_rate:.0%}",
+            file=sys.stderr
+        )
+    return EXIT_FAILED if below else EXIT_PASSED
+
+def _task_exit_code(result):
+    if result.get("status") in ("queued", "running"):
+        return EXIT_RUNNING
+    return EXIT_PASSED if result.get("passed") else EXIT_FAILED
+
+def _print_task(result, session_id):
+    status = result.get("status", "unknown")
+    print_info(f"Status: {Colors.BOLD}{status}{Colors.END}  (session {session_id}, task {result.get('task_id')})")
+    if status == "queued":
+        print_info(f"Queue position: {result.get('queue_position')}")
+    elif status not in ("running", "not_found"):
+        if result.get("passed"):
+            print_success(f"PASSED in {result.get('elapsed_seconds', 0)}s")
+        else:
+            print_error(f"FAILED: {result.get('error') or result.get('validation_reason') or status}")
+        if result.get("s3_key"):
+            print_info(f"S3: {result['s3_key']}")
+
+def cmd_status(args):
+    result = BenchmarkClient().check_status(args.experiment, args.session_id, args.task_id, wait_seconds=args.wait)
+    if args.format == "text":
+        _print_task(result, args.session_id)
+    _emit(args, result, [_row(result)])
+    return _task_exit_code(result)
+
+def cmd_results(args):
+    with _quiet(args):
+        result = BenchmarkClient().wait_for_result(
+            args.experiment, args.session_id, args.task_id, timeout=args.timeout, on_status=lambda status: None
+        )
+        if args.format == "text":
+            _print_task(result, args.session_id)
+    _emit(args, result, [_row(result)])
+    return _task_exit_code(result)
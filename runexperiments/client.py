@@ -3,23 +3,61 @@ import boto3
 import json
 import time
 import requests
+from botocore.config import Config
+from requests.adapters import HTTPAdapter
 from .deploy import load_config
 
+# check_status blocks server-side up to this long waiting for a state change
+LONG_POLL_SECONDS = 20
+# Fallback polling (deployments without long-poll support): exponential backoff between these bounds
+MIN_POLL_INTERVAL = 0.5
+MAX_POLL_INTERVAL = 10
+ACTIVE_STATUSES = ("queued", "running")
+# Keep-alive connections per pool: one per concurrent run plus headroom for cancels,
+# never below the requests/botocore default of 10
+MIN_POOL_SIZE = 10
+POOL_HEADROOM = 4
+
 class BenchmarkClient:
-    def __init__(self):
+    def __init__(self, concurrency=1):
         self.config = load_config()
         self.target = self.config.get('target')
         
         if not self.target:
             raise ValueError("No deployment found. Please run Setup & Deploy first.")
         
+        self.pool_size = 0
         if self.target == 'agentcore':
-            self.client = boto3.client('bedrock-agentcore', region_name='us-east-1')
             self.runtime_arn = self.config.get('runtime_arn')
         else:
             self.local_endpoint = self.config.get('local_endpoint')
+            # Shared keep-alive session: submits and polls reuse pooled connections
+            self.session = requests.Session()
+            self.session.headers["Content-Type"] = "application/json"
+        self.resize(concurrency)
+    
+    def resize(self, concurrency):
+        """Size the connection pools for `concurrency` runs in flight (pools only grow)"""
+        pool_size = max(MIN_POOL_SIZE, concurrency + POOL_HEADROOM)
+        if pool_size <= self.pool_size:
+            return
+        self.pool_size = pool_size
+        if self.target == 'agentcore':
+            self.client = boto3.client(
+                'bedrock-agentcore',
+                region_name='us-east-1',
+                config=Config(
+                    max_pool_connections=pool_size,
+                    tcp_keepalive=True,
+                    read_timeout=LONG_POLL_SECONDS + 40,
+                )
+            )
+        else:
+            adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+            self.session.mount("http://", adapter)
+            self.session.mount("https://", adapter)
     
-    def invoke_experiment(self, experiment_id, model_config, session_id):
+    def invoke_experiment(self, experiment_id, model_config, session_id, on_status=None, seed=None, timeout=None):
         """
         Invoke a benchmark experiment via AgentCore or local Docker (always async).
         
@@ -27,6 +65,11 @@ class BenchmarkClient:
             experiment_id: Experiment identifier (e.g., "oolong")
             model_config: Dict with "root" and "sub" model names
             session_id: Session ID for tracking
+            on_status: Optional callback receiving each start/status response
+                instead of the progress lines printed here
+            seed: Optional dataset/haystack seed (default: derived from session_id)
+            timeout: Optional seconds to wait for the result; on expiry the task
+                is cancelled and a failed result with "timed_out" is returned
             
         Returns:
             Dict with experiment results
@@ -37,36 +80,24 @@ class BenchmarkClient:
             "sub_model_name": model_config["sub"],
             "session_id": session_id  # Pass session_id to handler
         }
+        if seed is not None:
+            payload["seed"] = seed
         
         start_time = time.time()
         
         try:
             # Start the task
-            if self.target == 'local':
-                response = requests.post(
-                    self.local_endpoint,
-                    json=payload,
-                    headers={"Content-Type": "application/json"},
-                    timeout=30
-                )
-                result = response.json()
-            else:
-                response = self.client.invoke_agent_runtime(
-                    agentRuntimeArn=self.runtime_arn,
-                    runtimeSessionId=session_id,
-                    payload=json.dumps(payload).encode(),
-                    qualifier="DEFAULT"
-                )
-                
-                content = []
-                for chunk in response.get("response", []):
-                    content.append(chunk.decode('utf-8'))
-                result = json.loads(''.join(content))
+            result = self._invoke(payload, session_id)
             
             # Poll for completion (always async)
             if result.get("status") == "started":
-                print(f"  Task started (ID: {result.get('task_id')}), polling for results...")
-                result = self._poll_async_result(experiment_id, session_id, start_time)
+                if on_status:
+                    on_status(result)
+                else:
+                    print(f"  Task started (ID: {result.get('task_id')}), polling for results...")
+                result = self._poll_async_result(
+                    experiment_id, session_id, start_time, result.get('task_id'), on_status=on_status, timeout=timeout
+                )
             
             # Add elapsed time
             if "elapsed_seconds" not in result:
@@ -82,51 +113,123 @@ class BenchmarkClient:
                 "elapsed_seconds": round(time.time() - start_time, 1)
             }
     
-    def _poll_async_result(self, experiment_id, session_id, start_time, poll_interval=10):
-        """Poll for async task completion"""
+    def _invoke(self, payload, session_id, timeout=30):
+        """Send one payload to the local endpoint or AgentCore runtime and decode the JSON reply"""
+        if self.target == 'local':
+            response = self.session.post(self.local_endpoint, json=payload, timeout=timeout)
+            return response.json()
+        
+        response = self.client.invoke_agent_runtime(
+            agentRuntimeArn=self.runtime_arn,
+            runtimeSessionId=session_id,
+            payload=json.dumps(payload).encode(),
+            qualifier="DEFAULT"
+        )
+        
+        content = []
+        for chunk in response.get("response", []):
+            content.append(chunk.decode('utf-8'))
+        return json.loads(''.join(content))
+    
+    def check_status(self, experiment_id, session_id, task_id=None, wait_seconds=0):
+        """One check_status call; with wait_seconds, long-polls for the next state change"""
+        payload = {
+            "experiment": experiment_id,
+            "check_status": True,
+            "session_id": session_id,
+            "task_id": task_id,
+            "wait_seconds": wait_seconds
+        }
+        return self._invoke(payload, session_id, timeout=wait_seconds + 30)
+    
+    def cancel(self, experiment_id, session_id, task_id=None):
+        """Cancel a queued or running task"""
+        payload = {"experiment": experiment_id, "cancel": True, "session_id": session_id, "task_id": task_id}
+        return self._invoke(payload, session_id)
+    
+    def wait_for_result(self, experiment_id, session_id, task_id=None, timeout=None, on_status=None):
+        """Block until an already started task finishes (or the timeout expires); request errors propagate"""
+        return self._poll_async_result(
+            experiment_id, session_id, time.time(), task_id, on_status=on_status, timeout=timeout, raise_errors=True
+        )
+    
+    def _poll_async_result(self, experiment_id, session_id, start_time, task_id=None,
+                           wait_seconds=LONG_POLL_SECONDS, on_status=None, timeout=None, raise_errors=False):
+        """
+        Long-poll for async task completion.
+        
+        Each check_status call blocks on the server for up to `wait_seconds` until
+        the task leaves its last known status. A call that returns early with no
+        change (a deployment without long-poll support) falls back to polling
+        with exponential backoff. With `timeout`, the task is cancelled once that
+        many seconds have passed since `start_time`. Request errors end the
+        wait with a failed result, or propagate with `raise_errors`.
+        """
         status_payload = {
             "experiment": experiment_id,
             "check_status": True,
-            "session_id": session_id  # CRITICAL: Must pass session_id to retrieve result
+            "session_id": session_id,  # CRITICAL: Must pass session_id to retrieve result
+            "task_id": task_id,
+            "wait_seconds": wait_seconds
         }
+        last_status = None
+        interval = MIN_POLL_INTERVAL
         
         while True:
-            time.sleep(poll_interval)
-            
             try:
-                if self.target == 'local':
-                    response = requests.post(
-                        self.local_endpoint,
-                        json=status_payload,
-                        headers={"Content-Type": "application/json"},
-                        timeout=30
-                    )
-                    result = response.json()
-                else:
-                    response = self.client.invoke_agent_runtime(
-                        agentRuntimeArn=self.runtime_arn,
-                        runtimeSessionId=session_id,
-                        payload=json.dumps(status_payload).encode(),
-                        qualifier="DEFAULT"
-                    )
-                    
-                    content = []
-                    for chunk in response.get("response", []):
-                        content.append(chunk.decode('utf-8'))
-                    result = json.loads(''.join(content))
+                if timeout is not None:
+                    remaining = start_time + timeout - time.time()
+                    if remaining <= 0:
+                        return self._timed_out(experiment_id, session_id, task_id, start_time, timeout)
+                    status_payload["wait_seconds"] = min(wait_seconds, max(1, int(remaining)))
+                if last_status:
+                    status_payload["known_status"] = last_status
+                call_started = time.time()
+                result = self._invoke(status_payload, session_id, timeout=status_payload["wait_seconds"] + 30)
+                status = result.get("status")
                 
                 # Check if completed
-                if result.get("status") != "running":
+                if status not in ACTIVE_STATUSES:
                     result["elapsed_seconds"] = round(time.time() - start_time, 1)
                     return result
                     
                 elapsed = round(time.time() - start_time, 1)
-                print(f"  Still running... ({elapsed}s elapsed)")
+                if on_status:
+                    on_status(result)
+                elif status == "queued":
+                    print(f"  Queued at position {result.get('queue_position')}... ({elapsed}s elapsed)")
+                else:
+                    print(f"  Still running... ({elapsed}s elapsed)")
+                
+                if status == last_status and time.time() - call_started < status_payload["wait_seconds"] / 2:
+                    time.sleep(interval)
+                    interval = min(interval * 2, MAX_POLL_INTERVAL)
+                else:
+                    interval = MIN_POLL_INTERVAL
+                last_status = status
                 
             except Exception as e:
+                if raise_errors:
+                    raise
                 return {
                     "experiment": experiment_id,
                     "error": f"Polling error: {str(e)}",
                     "passed": False,
                     "elapsed_seconds": round(time.time() - start_time, 1)
                 }
+    
+    def _timed_out(self, experiment_id, session_id, task_id, start_time, timeout):
+        """Cancel a task that exceeded the client timeout (best effort) and report it as failed"""
+        try:
+            self.cancel(experiment_id, session_id, task_id)
+        except Exception:
+            pass
+        return {
+            "experiment": experiment_id,
+            "session_id": session_id,
+            "task_id": task_id,
+            "error": f"Timed out after {timeout}s (task cancelled)",
+            "timed_out": True,
+            "passed": False,
+            "elapsed_seconds": round(time.time() - start_time, 1)
+        }
@@ -60,5 +60,35 @@ EXPERIMENTS = {
     "codeqa": {
         "name": "LongBench CodeQA",
         "description": "LongBench-v2 code repository multiple-choice question"
+    },
+    "s-niah-50k": {
+        "name": "S-NIAH (50K tokens)",
+        "description": "Single needle in a 50K-token synthetic haystack"
+    }
+}
+
+# Experiments submitted at once by "Run All Benchmarks (Parallel)", each in its own session
+DEFAULT_PARALLELISM = 4
+
+# Model x experiment sweep defaults: every cell runs once per seed, `SWEEP_REPETITIONS` times
+SWEEP_SEEDS = [1, 2, 3]
+SWEEP_REPETITIONS = 1
+
+# S-NIAH context sizes for the scaling sweep, smallest first
+SIZE_SWEEP = {
+    "s-niah-50k": {
+        "name": "S-NIAH (50K tokens)",
+        "tokens": 50_000,
+        "description": "Single needle in a 50K-token synthetic haystack"
+    },
+    "s-niah-1m": {
+        "name": "S-NIAH (1M tokens)",
+        "tokens": 1_000_000,
+        "description": "Single needle in a 1M-token synthetic haystack"
+    },
+    "s-niah-10m": {
+        "name": "S-NIAH (10M tokens)",
+        "tokens": 10_000_000,
+        "description": "Single needle in a 10M-token memory-mapped haystack"
     }
 }
@@ -1,4 +1,7 @@
 """Terminal display utilities"""
+import sys
+import threading
+import time
 
 class Colors:
     HEADER = '\033[95m'
@@ -19,14 +22,14 @@ def print_header(text):
 def print_progress(text):
     print(f"{Colors.BLUE}▶{Colors.END} {text}")
 
-def print_success(text):
-    print(f"{Colors.GREEN}✓{Colors.END} {text}")
+def print_success(text, file=None):
+    print(f"{Colors.GREEN}✓{Colors.END} {text}", file=file)
 
-def print_error(text):
-    print(f"{Colors.RED}✗{Colors.END} {text}")
+def print_error(text, file=None):
+    print(f"{Colors.RED}✗{Colors.END} {text}", file=file)
 
-def print_info(text):
-    print(f"{Colors.YELLOW}ℹ{Colors.END} {text}")
+def print_info(text, file=None):
+    print(f"{Colors.YELLOW}ℹ{Colors.END} {text}", file=file)
 
 def print_divider():
     print(f"{Colors.CYAN}{'─'*70}{Colors.END}")
@@ -49,3 +52,80 @@ def format_pass_rate(passed, total):
         color = Colors.RED
     
     return f"{color}{passed}/{total} passed ({rate:.0f}%){Colors.END}"
+
+class LiveTable:
+    """Multi-row status table redrawn in place as rows change (one line per change when not a TTY)"""
+    
+    STATUS_COLORS = {
+        "pending": Colors.CYAN,
+        "queued": Colors.YELLOW,
+        "running": Colors.BLUE,
+        "passed": Colors.GREEN,
+        "failed": Colors.RED,
+    }
+    
+    def __init__(self, row_ids, labels=None, refresh_seconds=1.0):
+        self.row_ids = list(row_ids)
+        self.labels = labels or {}
+        self.refresh_seconds = refresh_seconds
+        self.rows = {row_id: {"status": "pending", "detail": "", "started": None, "elapsed": None} for row_id in self.row_ids}
+        self.interactive = sys.stdout.isatty()
+        self._lock = threading.Lock()
+        self._drawn = 0
+        self._stop = threading.Event()
+        self._ticker = None
+    
+    def __enter__(self):
+        self._draw()
+        if self.interactive:
+            self._ticker = threading.Thread(target=self._tick, daemon=True)
+            self._ticker.start()
+        return self
+    
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._ticker is not None:
+            self._ticker.join()
+        self._draw()
+        return False
+    
+    def _tick(self):
+        # Keeps elapsed times moving while polls are blocked
+        while not self._stop.wait(self.refresh_seconds):
+            self._draw()
+    
+    def update(self, row_id, status, detail="", elapsed=None):
+        """Set a row's status; rows start their clock on the first non-pending update"""
+        with self._lock:
+            row = self.rows[row_id]
+            changed = (row["status"], row["detail"]) != (status, detail)
+            if row["started"] is None and status != "pending":
+                row["started"] = time.time()
+            row.update(status=status, detail=detail)
+            if elapsed is not None:
+                row["elapsed"] = elapsed
+            if changed and not self.interactive:
+                print(self._format(row_id))
+        self._draw()
+    
+    def _format(self, row_id):
+        row = self.rows[row_id]
+        elapsed = row["elapsed"]
+        if elapsed is None and row["started"] is not None:
+            elapsed = time.time() - row["started"]
+        elapsed = f"{elapsed:.0f}s" if elapsed is not None else "-"
+        color = self.STATUS_COLORS.get(row["status"], "")
+        label = self.labels.get(row_id, row_id)
+        return f"{label:<28} {color}{row['status']:<10}{Colors.END} {elapsed:>7}  {row['detail'][:30]}"
+    
+    def _draw(self):
+        if not self.interactive:
+            return
+        with self._lock:
+            lines = [f"{Colors.BOLD}{'Test':<28} {'Status':<10} {'Elapsed':>7}  Detail{Colors.END}"]
+            lines += [self._format(row_id) for row_id in self.row_ids]
+            # Move back over the previous frame and clear each line before rewriting it
+            prefix = f"\033[{self._drawn}F" if self._drawn else ""
+            sys.stdout.write(prefix + "".join(f"\033[2K{line}\n" for line in lines))
+            sys.stdout.flush()
+            self._drawn = len(lines)
@@ -1,30 +1,32 @@
 """Benchmark runner orchestration"""
 import uuid
 import time
-from .config import EXPERIMENTS, MODELS
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .config import EXPERIMENTS, MODELS, SIZE_SWEEP
 from .client import BenchmarkClient
 from .deploy import load_config
 from .display import (
     print_header, print_progress, print_success, print_error, 
-    print_info, print_divider, format_status, format_pass_rate, Colors
+    print_info, print_divider, format_status, format_pass_rate, Colors, LiveTable
 )
 
 class BenchmarkRunner:
-    def __init__(self, model_key="nova-pro"):
+    def __init__(self, model_key="nova-pro", timeout=None):
         self.client = BenchmarkClient()
+        self.timeout = timeout  # Per-experiment seconds before the run is cancelled and failed
         self.model_key = model_key
         self.model_config = MODELS[model_key]
         self.config = load_config()
         self.target = self.config.get('target', 'unknown')
     
-    def run_single(self, experiment_id):
+    def run_single(self, experiment_id, seed=None):
         """Run a single experiment (always async)"""
-        if experiment_id not in EXPERIMENTS:
+        exp = EXPERIMENTS.get(experiment_id) or SIZE_SWEEP.get(experiment_id)
+        if exp is None:
             print_error(f"Unknown experiment: {experiment_id}")
             print_info(f"Available: {', '.join(EXPERIMENTS.keys())}")
             return None
         
-        exp = EXPERIMENTS[experiment_id]
         session_id = str(uuid.uuid4())
         
         print_header("RLM SINGLE EXPERIMENT")
@@ -41,7 +43,9 @@ class BenchmarkRunner:
         result = self.client.invoke_experiment(
             experiment_id, 
             self.model_config, 
-            session_id
+            session_id,
+            seed=seed,
+            timeout=self.timeout
         )
         
         # Display result
@@ -68,62 +72,171 @@ class BenchmarkRunner:
         print()
         return result
     
-    def run_all(self):
-        """Run all experiments (always async)"""
+    def run_all(self, parallelism=1, experiments=None):
+        """Run all experiments (or the given subset, always async); with parallelism > 1, that many run at once"""
+        if experiments:
+            experiments = {exp_id: EXPERIMENTS.get(exp_id) or SIZE_SWEEP[exp_id] for exp_id in experiments}
+        else:
+            experiments = EXPERIMENTS
+        if parallelism > 1:
+            self.client.resize(parallelism)
+            return self._run_all_parallel(parallelism, experiments)
+        
         session_id = str(uuid.uuid4())
         results = []
         
         print_header("RLM BENCHMARK SUITE")
-        print_info(f"Running {len(EXPERIMENTS)} experiments")
-        print_info(f"Model: {Colors.BOLD}{self.model_config['description']}{Colors.END}")
-        print_info(f"Target: {Colors.BOLD}{'Local Docker' if self.target == 'local' else 'AgentCore'}{Colors.END}")
-        if self.target == 'agentcore' and self.config.get('s3_bucket'):
-            print_info(f"S3 Bucket: {Colors.BOLD}{self.config.get('s3_bucket')}{Colors.END}")
+        print_info(f"Running {len(experiments)} experiments")
+        self._print_target()
         print_info(f"Session: {Colors.BOLD}{session_id[:8]}...{Colors.END}\n")
         
-        for i, (exp_id, exp_info) in enumerate(EXPERIMENTS.items(), 1):
-            print(f"\n{Colors.BOLD}[{i}/{len(EXPERIMENTS)}]{Colors.END} {exp_info['name']}")
+        for i, (exp_id, exp_info) in enumerate(experiments.items(), 1):
+            print(f"\n{Colors.BOLD}[{i}/{len(experiments)}]{Colors.END} {exp_info['name']}")
             print_divider()
             print_progress(f"Starting {exp_id}")
             
             result = self.client.invoke_experiment(
                 exp_id,
                 self.model_config,
-                session_id
+                session_id,
+                timeout=self.timeout
             )
             results.append(result)
+            self._print_result(result)
+            
+            time.sleep(1)  # Brief pause between tests
+        
+        # Summary
+        self._print_summary(results)
+        return results
+    
+    def _run_all_parallel(self, parallelism, experiments):
+        """Submit experiments `parallelism` at a time, each in its own session, with a live status table"""
+        print_header("RLM BENCHMARK SUITE")
+        print_info(f"Running {len(experiments)} experiments, {parallelism} at a time")
+        self._print_target()
+        print()
+        
+        results = {}
+        labels = {exp_id: exp_info["name"] for exp_id, exp_info in experiments.items()}
+        
+        with LiveTable(experiments, labels) as table, ThreadPoolExecutor(max_workers=parallelism) as pool:
+            def run(exp_id):
+                session_id = str(uuid.uuid4())
+                
+                def on_status(status):
+                    if status.get("status") == "running":
+                        table.update(exp_id, "running", f"session {session_id[:8]}")
+                    else:
+                        position = status.get("queue_position")
+                        table.update(exp_id, "queued", f"position {position}" if position else "")
+                
+                table.update(exp_id, "queued", "submitting")
+                result = self.client.invoke_experiment(
+                    exp_id, self.model_config, session_id, on_status=on_status, timeout=self.timeout
+                )
+                result.setdefault("experiment", exp_id)
+                result.setdefault("session_id", session_id)
+                return result
+            
+            futures = {pool.submit(run, exp_id): exp_id for exp_id in experiments}
+            # Collected in completion order; the report below keeps the suite order
+            for future in as_completed(futures):
+                exp_id = futures[future]
+                result = results[exp_id] = future.result()
+                detail = result.get("error") or result.get("validation_reason") or ""
+                table.update(exp_id, "passed" if result.get("passed") else "failed", detail, result.get("elapsed_seconds"))
+        
+        ordered = [results[exp_id] for exp_id in experiments]
+        for i, (exp_info, result) in enumerate(zip(experiments.values(), ordered), 1):
+            print(f"\n{Colors.BOLD}[{i}/{len(experiments)}]{Colors.END} {exp_info['name']}")
+            print_divider()
+            self._print_result(result)
+        
+        self._print_summary(ordered)
+        return ordered
+    
+    def _print_target(self):
+        print_info(f"Model: {Colors.BOLD}{self.model_config['description']}{Colors.END}")
+        print_info(f"Target: {Colors.BOLD}{'Local Docker' if self.target == 'local' else 'AgentCore'}{Colors.END}")
+        if self.target == 'agentcore' and self.config.get('s3_bucket'):
+            print_info(f"S3 Bucket: {Colors.BOLD}{self.config.get('s3_bucket')}{Colors.END}")
+    
+    def _print_result(self, result):
+        """Print pass/fail, reason, output and expected answer of one run"""
+        if result.get("passed"):
+            print_success(f"PASSED in {result.get('elapsed_seconds', 0)}s")
+            if result.get('validation_reason'):
+                print(f"  {Colors.GREEN}✓{Colors.END} {result.get('validation_reason')}")
+        else:
+            print_error(f"FAILED in {result.get('elapsed_seconds', 0)}s")
+            if result.get('validation_reason'):
+                print(f"  {Colors.RED}✗ Reason:{Colors.END} {result.get('validation_reason')}")
+            if result.get("error"):
+                print(f"  {Colors.RED}Error:{Colors.END} {result.get('error')}")
+        
+        # Debug: show what keys are in result
+        if not (result.get("output") or result.get("result")):
+            print(f"  {Colors.YELLOW}[Debug] Result keys:{Colors.END} {list(result.keys())}")
+        
+        # Always show full output and expected
+        output = result.get("output") or result.get("result")  # Try both keys
+        if output:
+            print(f"\n  {Colors.YELLOW}Output:{Colors.END}")
+            print(f"  {output}")
+        if result.get("expected"):
+            print(f"\n  {Colors.CYAN}Expected:{Colors.END}")
+            print(f"  {result.get('expected')}")
+    
+    def run_size_sweep(self):
+        """Run S-NIAH at increasing context sizes and report how cost scales"""
+        session_id = str(uuid.uuid4())
+        results = []
+        
+        print_header("RLM S-NIAH SIZE SWEEP")
+        print_info(f"Sizes: {', '.join(exp['name'] for exp in SIZE_SWEEP.values())}")
+        print_info(f"Model: {Colors.BOLD}{self.model_config['description']}{Colors.END}")
+        print_info(f"Target: {Colors.BOLD}{'Local Docker' if self.target == 'local' else 'AgentCore'}{Colors.END}")
+        print_info(f"Session: {Colors.BOLD}{session_id[:8]}...{Colors.END}\n")
+        
+        for i, (exp_id, exp_info) in enumerate(SIZE_SWEEP.items(), 1):
+            print(f"\n{Colors.BOLD}[{i}/{len(SIZE_SWEEP)}]{Colors.END} {exp_info['name']}")
+            print_divider()
+            print_progress(f"Starting {exp_id}")
+            
+            result = self.client.invoke_experiment(exp_id, self.model_config, session_id, timeout=self.timeout)
+            result["tokens"] = exp_info["tokens"]
+            results.append(result)
             
-            # Display result
             if result.get("passed"):
                 print_success(f"PASSED in {result.get('elapsed_seconds', 0)}s")
-                if result.get('validation_reason'):
-                    print(f"  {Colors.GREEN}✓{Colors.END} {result.get('validation_reason')}")
             else:
                 print_error(f"FAILED in {result.get('elapsed_seconds', 0)}s")
-                if result.get('validation_reason'):
-                    print(f"  {Colors.RED}✗ Reason:{Colors.END} {result.get('validation_reason')}")
                 if result.get("error"):
                     print(f"  {Colors.RED}Error:{Colors.END} {result.get('error')}")
             
-            # Debug: show what keys are in result
-            if not (result.get("output") or result.get("result")):
-                print(f"  {Colors.YELLOW}[Debug] Result keys:{Colors.END} {list(result.keys())}")
-            
-            # Always show full output and expected
-            output = result.get("output") or result.get("result")  # Try both keys
-            if output:
-                print(f"\n  {Colors.YELLOW}Output:{Colors.END}")
-                print(f"  {output}")
-            if result.get("expected"):
-                print(f"\n  {Colors.CYAN}Expected:{Colors.END}")
-                print(f"  {result.get('expected')}")
-            
             time.sleep(1)  # Brief pause between tests
         
-        # Summary
-        self._print_summary(results)
+        self._print_scaling(results)
         return results
     
+    def _print_scaling(self, results):
+        """Print latency, sub-calls and peak memory against context size"""
+        print_header("SCALING SUMMARY")
+        
+        print(f"\n{Colors.BOLD}{'Tokens':>12} {'Status':<20} {'Latency':>10} {'Sub-calls':>10} {'Peak RSS':>12}{Colors.END}")
+        print_divider()
+        
+        for r in results:
+            scaling = r.get("scaling", {})
+            status = format_status(r.get("passed"))
+            latency = f"{scaling.get('latency_seconds', r.get('elapsed_seconds', 0)):.1f}s"
+            sub_calls = scaling.get("sub_calls", "-")
+            peak = f"{scaling['peak_rss_mb']:,.0f} MB" if "peak_rss_mb" in scaling else "-"
+            print(f"{r['tokens']:>12,} {status:<30} {latency:>10} {sub_calls:>10} {peak:>12}")
+        
+        print_divider()
+    
     def _print_summary(self, results):
         """Print results summary table"""
         print_header("RESULTS SUMMARY")
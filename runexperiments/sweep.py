@@ -0,0 +1,206 @@
+"""Model x experiment matrix sweeps with repetitions and per-cell statistics"""
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from .config import EXPERIMENTS, MODELS, SIZE_SWEEP, DEFAULT_PARALLELISM, SWEEP_SEEDS, SWEEP_REPETITIONS
+from .client import BenchmarkClient
+from .deploy import load_config
+from .display import (
+    print_header, print_info, print_success, print_divider, format_pass_rate, Colors, LiveTable
+)
+
+def percentile(values, q):
+    """q-th percentile (0-100) with linear interpolation; None for no values"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * q / 100
+    low = int(rank)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+def run_record(model_key, experiment_id, seed, repetition, result):
+    """Flatten one run's result into the fields the sweep report keeps"""
+    sub_calls = result.get("sub_calls") or {}
+    root_usage = result.get("root_usage") or {}
+    scaling = result.get("scaling") or {}
+    return {
+        "model": model_key,
+        "experiment": experiment_id,
+        "seed": seed,
+        "repetition": repetition,
+        "session_id": result.get("session_id"),
+        "passed": bool(result.get("passed")),
+        "error": result.get("error"),
+        # Server-side model time when reported, else end-to-end client time
+        "latency_seconds": scaling.get("latency_seconds", result.get("elapsed_seconds")),
+        "elapsed_seconds": result.get("elapsed_seconds"),
+        "sub_calls": sub_calls.get("calls", scaling.get("sub_calls")),
+        "root_input_tokens": root_usage.get("inputTokens"),
+        "root_output_tokens": root_usage.get("outputTokens"),
+        "sub_input_tokens": sub_calls.get("input_tokens"),
+        "sub_output_tokens": sub_calls.get("output_tokens"),
+        "sub_cost_usd": sub_calls.get("estimated_cost_usd"),
+    }
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return round(sum(values) / len(values), 2) if values else None
+
+def summarize_cell(runs):
+    """Pass rate, latency percentiles, mean sub-calls and tokens over one cell's runs"""
+    passed = sum(1 for r in runs if r["passed"])
+    latencies = [r["latency_seconds"] for r in runs if r["latency_seconds"] is not None]
+    p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+    tokens = {
+        key: _mean([r[key] for r in runs])
+        for key in ("root_input_tokens", "root_output_tokens", "sub_input_tokens", "sub_output_tokens")
+    }
+    return {
+        "runs": len(runs),
+        "passed": passed,
+        "pass_rate": round(passed / len(runs), 3) if runs else 0.0,
+        "errors": sum(1 for r in runs if r["error"]),
+        "latency_p50": round(p50, 2) if p50 is not None else None,
+        "latency_p95": round(p95, 2) if p95 is not None else None,
+        "sub_calls_mean": _mean([r["sub_calls"] for r in runs]),
+        "tokens_mean": tokens,
+        "total_tokens_mean": round(sum(v for v in tokens.values() if v is not None), 2),
+    }
+
+def best_per_experiment(cells):
+    """Per experiment: the model with the highest pass rate, ties broken by p50 latency"""
+    best = {}
+    for cell in cells:
+        stats = cell["stats"]
+        key = (-stats["pass_rate"], stats["latency_p50"] if stats["latency_p50"] is not None else float("inf"))
+        current = best.get(cell["experiment"])
+        if current is None or key < current[0]:
+            best[cell["experiment"]] = (key, cell["model"])
+    return {experiment: model for experiment, (_, model) in best.items()}
+
+class MatrixSweep:
+    """Runs every (model, experiment) cell once per seed and repetition, `parallelism` runs at a time"""
+
+    def __init__(self, models=None, experiments=None, seeds=None, repetitions=SWEEP_REPETITIONS,
+                 parallelism=DEFAULT_PARALLELISM, client=None, timeout=None):
+        self.models = list(models or MODELS)
+        self.experiments = list(experiments or EXPERIMENTS)
+        self.seeds = list(seeds or SWEEP_SEEDS)
+        self.repetitions = repetitions
+        self.parallelism = parallelism
+        self.timeout = timeout
+        unknown = [m for m in self.models if m not in MODELS]
+        unknown += [e for e in self.experiments if e not in EXPERIMENTS and e not in SIZE_SWEEP]
+        if unknown:
+            raise ValueError(f"Unknown models/experiments: {', '.join(unknown)}")
+        self.client = client or BenchmarkClient(concurrency=parallelism)
+        self.target = load_config().get('target', 'unknown')
+
+    @property
+    def cells(self):
+        return [(model, experiment) for model in self.models for experiment in self.experiments]
+
+    def jobs(self):
+        """(model, experiment, seed, repetition) for every run, cell-major"""
+        return [
+            (model, experiment, seed, repetition)
+            for model, experiment in self.cells
+            for seed in self.seeds
+            for repetition in range(self.repetitions)
+        ]
+
+    def run(self, output_path=None):
+        """Run the sweep, print the per-cell report and write it as JSON; returns the report"""
+        jobs = self.jobs()
+        per_cell = len(self.seeds) * self.repetitions
+        started_at = datetime.now()
+
+        print_header("RLM MODEL x EXPERIMENT SWEEP")
+        print_info(f"Models: {Colors.BOLD}{', '.join(self.models)}{Colors.END}")
+        print_info(f"Experiments: {Colors.BOLD}{', '.join(self.experiments)}{Colors.END}")
+        print_info(f"Seeds: {self.seeds} x {self.repetitions} repetition(s) = {per_cell} runs per cell")
+        print_info(f"Total: {len(jobs)} runs, {self.parallelism} at a time\n")
+
+        runs = []
+        done = {cell: [] for cell in self.cells}
+        labels = {cell: f"{cell[0]} / {cell[1]}" for cell in self.cells}
+
+        with LiveTable(self.cells, labels) as table, ThreadPoolExecutor(max_workers=self.parallelism) as pool:
+            def run_one(model, experiment, seed, repetition):
+                table.update((model, experiment), "running", self._progress(done[(model, experiment)], per_cell))
+                result = self.client.invoke_experiment(
+                    experiment, MODELS[model], str(uuid.uuid4()), on_status=lambda status: None, seed=seed,
+                    timeout=self.timeout
+                )
+                return run_record(model, experiment, seed, repetition, result)
+
+            futures = {pool.submit(run_one, *job): job for job in jobs}
+            for future in as_completed(futures):
+                record = future.result()
+                cell = (record["model"], record["experiment"])
+                runs.append(record)
+                done[cell].append(record)
+                finished = len(done[cell]) == per_cell
+                status = ("passed" if all(r["passed"] for r in done[cell]) else "failed") if finished else "running"
+                table.update(cell, status, self._progress(done[cell], per_cell))
+
+        cells = [
+            {"model": model, "experiment": experiment, "root": MODELS[model]["root"], "sub": MODELS[model]["sub"],
+             "stats": summarize_cell(done[(model, experiment)])}
+            for model, experiment in self.cells
+        ]
+        report = {
+            "started_at": started_at.isoformat(timespec="seconds"),
+            "finished_at": datetime.now().isoformat(timespec="seconds"),
+            "target": self.target,
+            "config": {
+                "models": self.models,
+                "experiments": self.experiments,
+                "seeds": self.seeds,
+                "repetitions": self.repetitions,
+                "parallelism": self.parallelism,
+                "timeout": self.timeout,
+            },
+            "cells": cells,
+            "best": best_per_experiment(cells),
+            "runs": sorted(runs, key=lambda r: (r["model"], r["experiment"], r["seed"], r["repetition"])),
+        }
+
+        self._print_report(report)
+        path = Path(output_path or f"sweep-{started_at:%Y%m%d-%H%M%S}.json")
+        path.write_text(json.dumps(report, indent=2))
+        print_success(f"Sweep results written to {path}")
+        return report
+
+    @staticmethod
+    def _progress(runs, per_cell):
+        passed = sum(1 for r in runs if r["passed"])
+        return f"{len(runs)}/{per_cell} done, {passed} passed"
+
+    def _print_report(self, report):
+        print_header("SWEEP SUMMARY")
+
+        print(f"\n{Colors.BOLD}{'Model':<16} {'Experiment':<16} {'Pass':>7} {'p50':>8} {'p95':>8} {'Sub-calls':>10} {'Tokens':>10}{Colors.END}")
+        print_divider()
+
+        for cell in report["cells"]:
+            stats = cell["stats"]
+            p50 = f"{stats['latency_p50']:.1f}s" if stats["latency_p50"] is not None else "-"
+            p95 = f"{stats['latency_p95']:.1f}s" if stats["latency_p95"] is not None else "-"
+            sub_calls = f"{stats['sub_calls_mean']:.1f}" if stats["sub_calls_mean"] is not None else "-"
+            tokens = f"{stats['total_tokens_mean']:,.0f}" if stats["total_tokens_mean"] else "-"
+            rate = f"{stats['passed']}/{stats['runs']}"
+            print(f"{cell['model']:<16} {cell['experiment']:<16} {rate:>7} {p50:>8} {p95:>8} {sub_calls:>10} {tokens:>10}")
+
+        print_divider()
+
+        passed = sum(cell["stats"]["passed"] for cell in report["cells"])
+        total = sum(cell["stats"]["runs"] for cell in report["cells"])
+        print(f"\n{Colors.BOLD}Overall:{Colors.END} {format_pass_rate(passed, total)}")
+        print(f"\n{Colors.BOLD}Best model per experiment{Colors.END} (pass rate, then p50 latency):")
+        for experiment, model in report["best"].items():
+            print(f"  {experiment:<16} {model}")
+        print()